@@ -0,0 +1,38 @@
+"""Content-addressed storage for generated media.
+
+Revision ID: 002_content_addressed_storage
+Revises: 001_initial
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_content_addressed_storage'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create stored_objects table and track output hashes per generation."""
+    op.create_table(
+        'stored_objects',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_stored_objects_ref_count', 'stored_objects', ['ref_count'])
+
+    op.add_column('generations', sa.Column('output_hashes', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop stored_objects table and output hashes column."""
+    op.drop_column('generations', 'output_hashes')
+    op.drop_index('ix_stored_objects_ref_count', table_name='stored_objects')
+    op.drop_table('stored_objects')
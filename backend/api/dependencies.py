@@ -0,0 +1,39 @@
+"""Shared FastAPI dependencies."""
+
+import math
+
+from fastapi import HTTPException, Request, status
+
+from backend.core.client_identity import client_identity
+
+
+def get_client_id(request: Request) -> str:
+    """
+    Identify the client a request is scheduled and limited against.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Client identifier, see client_identity
+    """
+    return client_identity(request.scope)
+
+
+def too_many_requests(retry_after: float, detail: str) -> HTTPException:
+    """
+    Build a 429 response telling the client when to come back.
+
+    Args:
+        retry_after: Seconds until the request would be admitted
+        detail: Error message
+
+    Returns:
+        HTTPException with a Retry-After header
+    """
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
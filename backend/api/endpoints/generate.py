@@ -1,14 +1,19 @@
 """API endpoints for image and video generation."""
 
 import logging
+import uuid
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
 
+from backend.api.dependencies import get_client_id, too_many_requests
 from backend.api.schemas import (
     TextToImageRequest,
+    BatchGenerationRequest,
+    BatchGenerationResponse,
+    BatchStatusResponse,
     ImageToImageRequest,
     TextToVideoRequest,
     UpscaleRequest,
@@ -16,11 +21,16 @@ from backend.api.schemas import (
     GenerationListResponse,
     HistoryFilters,
     ErrorResponse,
+    ScheduleOptions,
 )
-from backend.models.database import get_db, Generation
-from backend.services.runware_service import runware_service
+from backend.core.config import settings
+from backend.models.database import Generation
+from backend.models.repository import generation_repository
+from backend.services.admission_service import admission_service
+from backend.services.batch_service import batch_service
 from backend.services.queue_service import queue_service
 from backend.services.cache_service import cache_service
+from backend.services.storage_service import storage_service
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +43,15 @@ router = APIRouter(prefix="/api", tags=["generation"])
     status_code=status.HTTP_202_ACCEPTED,
     responses={
         400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     },
 )
 async def generate_text_to_image(
     request: TextToImageRequest,
-    db: Session = Depends(get_db),
+    schedule: ScheduleOptions = Depends(),
+    client_id: str = Depends(get_client_id),
 ) -> GenerationResponse:
     """
     Generate image(s) from text prompt.
@@ -48,104 +61,23 @@ async def generate_text_to_image(
 
     Args:
         request: Text-to-image generation request
-        db: Database session
+        schedule: Optional run_at/delay query parameters
+        client_id: Client the generation is queued fairly against
 
     Returns:
-        GenerationResponse with generation ID (status: processing)
+        GenerationResponse with generation ID (status: pending)
+
+    Raises:
+        HTTPException: 429 if the client's generation budget is used up
     """
-    from backend.main import manager as ws_manager
+    await _admit(client_id, admission_service.generation_cost(request.model_dump()))
 
     # Create database record
-    generation = Generation(
-        generation_type="text-to-image",
-        prompt=request.prompt,
-        negative_prompt=request.negative_prompt,
-        parameters={
-            "width": request.width,
-            "height": request.height,
-            "steps": request.steps,
-            "guidance_scale": request.guidance_scale,
-            "seed": request.seed,
-            "model": request.model,
-            "num_images": request.num_images,
-        },
-        width=request.width,
-        height=request.height,
-        steps=request.steps,
-        guidance_scale=request.guidance_scale,
-        seed=request.seed,
-        model_name=request.model,
-        status="processing",
-        output_path="",
-    )
-    db.add(generation)
-    db.commit()
-    db.refresh(generation)
-
-    # Start generation in background
-    generation_id = generation.id
-
-    async def send_progress_updates(progress: float, message: str):
-        """Send progress via both WebSocket and Pub/Sub."""
-        await ws_manager.send_progress(generation_id, progress, message)
-        await cache_service.publish_progress(generation_id, progress, message)
-
-    async def run_generation():
-        try:
-            logger.info(f"Starting text-to-image generation (ID: {generation_id})")
-
-            # Send initial progress via both channels
-            await send_progress_updates(10.0, "Initializing...")
-
-            # Generate image using Runware service
-            results = await runware_service.text_to_image(
-                prompt=request.prompt,
-                negative_prompt=request.negative_prompt,
-                width=request.width,
-                height=request.height,
-                steps=request.steps,
-                guidance_scale=request.guidance_scale,
-                seed=request.seed,
-                model=request.model,
-                num_images=request.num_images,
-                progress_callback=lambda p, m: asyncio.create_task(send_progress_updates(p, m)),
-            )
-
-            # Send completion via both channels
-            first_result = results[0]
-
-            # Update database
-            generation.status = "completed"
-            generation.output_path = first_result["output_path"]
-            generation.output_url = first_result["image_url"]
-            generation.completed_at = datetime.utcnow()
-            generation.processing_time = first_result.get("processing_time", 0)
-            generation.seed = first_result["seed"]
-            db.commit()
-
-            completion_data = GenerationResponse.from_orm(generation).dict()
-            await ws_manager.send_complete(generation_id, completion_data)
-            await cache_service.publish_complete(generation_id, completion_data)
-
-            logger.info(f"Text-to-image generation completed (ID: {generation_id})")
-
-        except Exception as e:
-            logger.error(f"Text-to-image generation failed (ID: {generation_id}): {str(e)}")
-
-            # Update database with error
-            generation.status = "failed"
-            generation.error_message = str(e)
-            generation.completed_at = datetime.utcnow()
-            db.commit()
-
-            await ws_manager.send_error(generation_id, str(e))
-            await cache_service.publish_error(generation_id, str(e))
-
-    # Start background task
-    import asyncio
-    asyncio.create_task(run_generation())
-
-    logger.info(f"Text-to-image generation queued (ID: {generation_id})")
+    generation = await generation_repository.create(**_text_to_image_fields(request))
+
+    await _enqueue_generation(generation, request.model_dump(), client_id, schedule)
+
+    logger.info(f"Text-to-image generation queued (ID: {generation.id})")
 
     return GenerationResponse.from_orm(generation)
 
@@ -154,24 +86,36 @@ async def generate_text_to_image(
     "/generate/image-to-image",
     response_model=GenerationResponse,
     status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        429: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
 )
 async def generate_image_to_image(
     request: ImageToImageRequest,
-    db: Session = Depends(get_db),
+    schedule: ScheduleOptions = Depends(),
+    client_id: str = Depends(get_client_id),
 ) -> GenerationResponse:
     """
     Generate image from source image and text prompt.
 
+    Returns immediately with generation ID.
+    Result is sent via WebSocket when complete.
+
     Args:
         request: Image-to-image generation request
-        db: Database session
+        schedule: Optional run_at/delay query parameters
+        client_id: Client the generation is queued fairly against
 
     Returns:
-        GenerationResponse with generation details
+        GenerationResponse with generation ID (status: pending)
+
+    Raises:
+        HTTPException: 429 if the client's generation budget is used up
     """
-    from backend.main import manager as ws_manager
+    await _admit(client_id, admission_service.generation_cost(request.model_dump()))
 
-    generation = Generation(
+    generation = await generation_repository.create(
         generation_type="image-to-image",
         prompt=request.prompt,
         negative_prompt=request.negative_prompt,
@@ -187,80 +131,230 @@ async def generate_image_to_image(
         guidance_scale=request.guidance_scale,
         seed=request.seed,
         model_name=request.model,
-        status="processing",
+        status="pending",
         output_path="",
     )
-    db.add(generation)
-    db.commit()
-    db.refresh(generation)
-
-    generation_id = generation.id
-
-    async def send_progress_updates(progress: float, message: str):
-        """Send progress via both WebSocket and Pub/Sub."""
-        await ws_manager.send_progress(generation_id, progress, message)
-        await cache_service.publish_progress(generation_id, progress, message)
-
-    async def run_generation():
-        try:
-            logger.info(f"Starting image-to-image generation (ID: {generation_id})")
-
-            await send_progress_updates(10.0, "Initializing...")
-
-            result = await runware_service.image_to_image(
-                prompt=request.prompt,
-                image_url=request.image_url,
-                negative_prompt=request.negative_prompt,
-                strength=request.strength,
-                steps=request.steps,
-                guidance_scale=request.guidance_scale,
-                seed=request.seed,
-                model=request.model,
-                progress_callback=lambda p, m: asyncio.create_task(send_progress_updates(p, m)),
-            )
-
-            generation.status = "completed"
-            generation.output_path = result["output_path"]
-            generation.output_url = result["image_url"]
-            generation.completed_at = datetime.utcnow()
-            generation.processing_time = result.get("processing_time", 0)
-            generation.seed = result["seed"]
-            db.commit()
-
-            completion_data = GenerationResponse.from_orm(generation).dict()
-            await ws_manager.send_complete(generation_id, completion_data)
-            await cache_service.publish_complete(generation_id, completion_data)
-
-            logger.info(f"Image-to-image generation completed (ID: {generation_id})")
-
-        except Exception as e:
-            logger.error(f"Image-to-image generation failed (ID: {generation_id}): {str(e)}")
-            generation.status = "failed"
-            generation.error_message = str(e)
-            generation.completed_at = datetime.utcnow()
-            db.commit()
-
-            await ws_manager.send_error(generation_id, str(e))
-
-    import asyncio
-    asyncio.create_task(run_generation())
-
-    logger.info(f"Image-to-image generation queued (ID: {generation_id})")
+
+    await _enqueue_generation(generation, request.model_dump(), client_id, schedule)
+
+    logger.info(f"Image-to-image generation queued (ID: {generation.id})")
 
     return GenerationResponse.from_orm(generation)
 
 
+@router.post(
+    "/generate/batch",
+    response_model=BatchGenerationResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def generate_batch(
+    request: BatchGenerationRequest,
+    schedule: ScheduleOptions = Depends(),
+    client_id: str = Depends(get_client_id),
+) -> BatchGenerationResponse:
+    """
+    Queue a batch of text-to-image generations.
+
+    The batch expands to every combination of prompts, seeds and grid
+    values. All records are inserted in one transaction and queued in one
+    round trip; aggregate progress is published on batch:progress:{batch_id}.
+    The whole batch shares the client's fair share of the workers; use
+    run_at to hold it until off-peak hours.
+
+    Args:
+        request: Batch generation request
+        schedule: Optional run_at/delay query parameters
+        client_id: Client the batch is queued fairly against
+
+    Returns:
+        BatchGenerationResponse with batch ID and queued generations
+
+    Raises:
+        HTTPException: 429 if the batch's total cost exceeds the client's remaining budget
+    """
+    if request.size > settings.batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch expands to {request.size} generations (maximum {settings.batch_max_size})",
+        )
+
+    try:
+        items = request.expand()
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False),
+        ) from e
+
+    await _admit(client_id, sum(admission_service.generation_cost(item.model_dump()) for item in items))
+
+    batch_id = uuid.uuid4().hex
+    generations = await generation_repository.create_many([
+        _text_to_image_fields(item, batch_id=batch_id) for item in items
+    ])
+
+    registered = await batch_service.create(batch_id, len(generations))
+    enqueued = registered and await queue_service.enqueue_many([
+        (generation.id, "text-to-image", {**item.model_dump(), "batch_id": batch_id})
+        for generation, item in zip(generations, items, strict=True)
+    ], client_id=client_id, run_at=schedule.timestamp(), delay=schedule.delay)
+
+    if not enqueued:
+        await generation_repository.update_many(
+            [generation.id for generation in generations],
+            status="failed",
+            error_message="Generation queue is unavailable",
+            completed_at=datetime.utcnow(),
+        )
+
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation queue is unavailable, please retry later",
+        )
+
+    logger.info(f"Batch {batch_id} queued ({len(generations)} generations)")
+
+    return BatchGenerationResponse(
+        batch_id=batch_id,
+        total=len(generations),
+        items=[GenerationResponse.from_orm(generation) for generation in generations],
+    )
+
+
+@router.get("/generate/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(
+    batch_id: str,
+) -> BatchStatusResponse:
+    """
+    Get aggregate progress of a batch.
+
+    Args:
+        batch_id: Batch ID
+
+    Returns:
+        BatchStatusResponse
+    """
+    batch = await batch_service.get(batch_id)
+
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found",
+        )
+
+    return BatchStatusResponse(**batch)
+
+
+def _text_to_image_fields(request: TextToImageRequest, **extra_parameters: Any) -> Dict[str, Any]:
+    """
+    Build generation column values for a text-to-image request.
+
+    Args:
+        request: Text-to-image generation request
+        **extra_parameters: Additional values stored in the parameters column
+
+    Returns:
+        Column values for a pending generation
+    """
+    return {
+        "generation_type": "text-to-image",
+        "prompt": request.prompt,
+        "negative_prompt": request.negative_prompt,
+        "parameters": {
+            "width": request.width,
+            "height": request.height,
+            "steps": request.steps,
+            "guidance_scale": request.guidance_scale,
+            "seed": request.seed,
+            "model": request.model,
+            "num_images": request.num_images,
+            **extra_parameters,
+        },
+        "width": request.width,
+        "height": request.height,
+        "steps": request.steps,
+        "guidance_scale": request.guidance_scale,
+        "seed": request.seed,
+        "model_name": request.model,
+        "status": "pending",
+        "output_path": "",
+    }
+
+
+async def _admit(client_id: str, cost: float):
+    """
+    Charge a generation's cost to the client's budget.
+
+    Args:
+        client_id: Client identifier
+        cost: Estimated cost of the request
+
+    Raises:
+        HTTPException: 429 with Retry-After if the budget is used up
+    """
+    allowed, retry_after = await admission_service.admit_generation(client_id, cost)
+    if not allowed:
+        raise too_many_requests(
+            retry_after,
+            f"Generation budget exceeded (request costs {cost:g}), retry in {retry_after:.0f}s",
+        )
+
+
+async def _enqueue_generation(
+    generation: Generation,
+    params: Dict[str, Any],
+    client_id: str,
+    schedule: ScheduleOptions,
+):
+    """
+    Hand a freshly created generation over to the worker queue.
+
+    Args:
+        generation: Persisted generation record
+        params: Request parameters for the worker
+        client_id: Client the generation is queued fairly against
+        schedule: When the generation may start
+
+    Raises:
+        HTTPException: 503 if the queue is unavailable
+    """
+    enqueued = await queue_service.enqueue(
+        task_id=generation.id,
+        generation_type=generation.generation_type,
+        params=params,
+        client_id=client_id,
+        run_at=schedule.timestamp(),
+        delay=schedule.delay,
+    )
+
+    if not enqueued:
+        await generation_repository.update(
+            generation.id,
+            status="failed",
+            error_message="Generation queue is unavailable",
+            completed_at=datetime.utcnow(),
+        )
+
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation queue is unavailable, please retry later",
+        )
+
+
 @router.post("/upscale", response_model=GenerationResponse, status_code=status.HTTP_201_CREATED)
 async def upscale_image(
     request: UpscaleRequest,
-    db: Session = Depends(get_db),
 ) -> GenerationResponse:
     """
     Upscale an image.
 
     Args:
         request: Upscale request
-        db: Database session
 
     Returns:
         GenerationResponse with upscaled image details
@@ -274,44 +368,24 @@ async def upscale_image(
 @router.get("/history", response_model=GenerationListResponse)
 async def get_history(
     filters: HistoryFilters = Depends(),
-    db: Session = Depends(get_db),
 ) -> GenerationListResponse:
     """
     Get generation history with optional filters.
 
     Args:
         filters: Query filters
-        db: Database session
 
     Returns:
         List of generations with metadata
     """
-    query = db.query(Generation)
-
-    # Apply filters
-    if filters.generation_type:
-        query = query.filter(Generation.generation_type == filters.generation_type)
-
-    if filters.status:
-        query = query.filter(Generation.status == filters.status)
-
-    if filters.favorite is not None:
-        query = query.filter(Generation.favorite == filters.favorite)
-
-    if filters.search:
-        search_term = f"%{filters.search}%"
-        query = query.filter(
-            (Generation.prompt.ilike(search_term)) | (Generation.negative_prompt.ilike(search_term))
-        )
-
-    # Get total count
-    total = query.count()
-
-    # Apply pagination and ordering
-    query = query.order_by(Generation.created_at.desc())
-    query = query.offset(filters.offset).limit(filters.limit)
-
-    generations = query.all()
+    total, generations = await generation_repository.list_history(
+        generation_type=filters.generation_type,
+        status=filters.status,
+        favorite=filters.favorite,
+        search=filters.search,
+        limit=filters.limit,
+        offset=filters.offset,
+    )
 
     return GenerationListResponse(
         total=total,
@@ -322,19 +396,17 @@ async def get_history(
 @router.get("/history/{generation_id}", response_model=GenerationResponse)
 async def get_generation(
     generation_id: int,
-    db: Session = Depends(get_db),
 ) -> GenerationResponse:
     """
     Get a specific generation by ID.
 
     Args:
         generation_id: Generation ID
-        db: Database session
 
     Returns:
         GenerationResponse
     """
-    generation = db.query(Generation).filter(Generation.id == generation_id).first()
+    generation = await generation_repository.get(generation_id)
 
     if not generation:
         raise HTTPException(
@@ -348,26 +420,24 @@ async def get_generation(
 @router.delete("/history/{generation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_generation(
     generation_id: int,
-    db: Session = Depends(get_db),
 ):
     """
     Delete a generation from history.
 
+    Stored output files are removed once no other generation references them.
+
     Args:
         generation_id: Generation ID
-        db: Database session
     """
-    generation = db.query(Generation).filter(Generation.id == generation_id).first()
+    generation = await generation_repository.get(generation_id)
 
-    if not generation:
+    if not generation or not await generation_repository.delete(generation_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Generation {generation_id} not found",
         )
 
-    # Delete from database
-    db.delete(generation)
-    db.commit()
+    await storage_service.release_references(generation.output_hashes or [])
 
     logger.info(f"Deleted generation {generation_id}")
 
@@ -405,6 +475,58 @@ async def clear_queue(
     return {"removed": removed_count}
 
 
+@router.get("/queue/{task_id}")
+async def get_queued_task(
+    task_id: int,
+):
+    """
+    Get a queued generation's state and position.
+
+    Args:
+        task_id: Generation ID
+
+    Returns:
+        Dictionary with the task's state (queued, scheduled, processing or
+        dead) and, while queued, its estimated position
+    """
+    task = await queue_service.get_task(task_id)
+
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} is not in the queue",
+        )
+
+    return task
+
+
+@router.delete("/queue/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_queued_task(
+    task_id: int,
+):
+    """
+    Cancel a generation that is queued or scheduled but has not started.
+
+    Args:
+        task_id: Generation ID
+    """
+    if not await queue_service.remove_task(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} is not waiting in the queue",
+        )
+
+    generation = await generation_repository.update(
+        task_id,
+        status="cancelled",
+        completed_at=datetime.utcnow(),
+    )
+    if generation is not None and (generation.parameters or {}).get("batch_id"):
+        await batch_service.record(generation.parameters["batch_id"], generation.id, False)
+
+    logger.info(f"Cancelled queued generation {task_id}")
+
+
 @router.get("/cache/stats")
 async def get_cache_stats():
     """
@@ -426,12 +548,14 @@ async def get_cache_stats():
         return {
             "total_entries": len(keys),
             "status": "active",
+            "tiers": cache_service.get_stats(),
         }
     except Exception as e:
         return {
             "total_entries": 0,
             "status": "error",
             "error": str(e),
+            "tiers": cache_service.get_stats(),
         }
 
 
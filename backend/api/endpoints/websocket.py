@@ -0,0 +1,85 @@
+"""WebSocket endpoints for real-time generation progress."""
+
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from backend.services.websocket_hub import websocket_hub
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["websocket"])
+
+HEARTBEAT = {"type": "heartbeat", "message": "pong"}
+
+
+@router.websocket("/ws")
+async def websocket_hub_endpoint(websocket: WebSocket):
+    """
+    WebSocket endpoint following any number of generations.
+
+    Clients send ``{"action": "subscribe" | "unsubscribe", "generation_ids": [...]}``
+    and receive progress, complete and error messages for every followed
+    generation, each tagged with its ``generation_id``. Any other message
+    is answered with a heartbeat.
+
+    Args:
+        websocket: WebSocket connection
+    """
+    await websocket_hub.connect(websocket)
+    sender = asyncio.create_task(websocket_hub.serve(websocket))
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                request = json.loads(data)
+                action = request["action"]
+                generation_ids = [int(generation_id) for generation_id in request["generation_ids"]]
+            except (ValueError, TypeError, KeyError):
+                websocket_hub.send(websocket, HEARTBEAT)
+                continue
+
+            if action == "subscribe":
+                followed = [
+                    generation_id for generation_id in generation_ids
+                    if await websocket_hub.follow(websocket, generation_id)
+                ]
+                websocket_hub.send(websocket, {"type": "subscribed", "generation_ids": followed})
+            elif action == "unsubscribe":
+                for generation_id in generation_ids:
+                    await websocket_hub.unfollow(websocket, generation_id)
+                websocket_hub.send(websocket, {"type": "unsubscribed", "generation_ids": generation_ids})
+            else:
+                websocket_hub.send(websocket, HEARTBEAT)
+    except WebSocketDisconnect:
+        logger.info("Client disconnected from WebSocket hub")
+    finally:
+        sender.cancel()
+        await websocket_hub.disconnect(websocket)
+
+
+@router.websocket("/ws/generation/{generation_id}")
+async def websocket_endpoint(websocket: WebSocket, generation_id: int):
+    """
+    WebSocket endpoint for real-time generation progress updates.
+
+    Args:
+        websocket: WebSocket connection
+        generation_id: ID of generation to track
+    """
+    await websocket_hub.connect(websocket)
+    await websocket_hub.follow(websocket, generation_id)
+    sender = asyncio.create_task(websocket_hub.serve(websocket))
+    try:
+        while True:
+            # Keep connection alive, waiting for client messages
+            await websocket.receive_text()
+            # Echo back for heartbeat
+            websocket_hub.send(websocket, HEARTBEAT)
+    except WebSocketDisconnect:
+        logger.info(f"Client disconnected from generation {generation_id}")
+    finally:
+        sender.cancel()
+        await websocket_hub.disconnect(websocket)
@@ -1,7 +1,8 @@
 """Pydantic schemas for API request/response validation."""
 
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+import itertools
+from datetime import datetime, timezone
+from typing import ClassVar, Optional, Dict, Any, List, Tuple
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -20,6 +21,67 @@ class TextToImageRequest(BaseModel):
     num_images: int = Field(1, ge=1, le=4, description="Number of images to generate")
 
 
+class BatchGenerationRequest(BaseModel):
+    """
+    Request schema for batch text-to-image generation.
+
+    The batch is the cross product of prompts, seeds and every grid axis;
+    grid values override the shared parameters below.
+    """
+
+    GRID_PARAMETERS: ClassVar[Tuple[str, ...]] = ("negative_prompt", "width", "height", "steps", "guidance_scale", "model", "num_images")
+
+    prompts: List[str] = Field(..., min_length=1, description="Prompts to generate")
+    negative_prompt: Optional[str] = Field(None, max_length=2000, description="Negative prompt")
+    width: int = Field(512, ge=64, le=2048, description="Image width")
+    height: int = Field(512, ge=64, le=2048, description="Image height")
+    steps: int = Field(25, ge=1, le=150, description="Number of inference steps")
+    guidance_scale: float = Field(7.5, ge=1.0, le=20.0, description="Guidance scale")
+    model: Optional[str] = Field(None, description="Model name to use")
+    num_images: int = Field(1, ge=1, le=4, description="Number of images per generation")
+    seeds: List[Optional[int]] = Field([None], min_length=1, description="Seed sweep, one generation per seed")
+    grid: Dict[str, List[Any]] = Field({}, description="Parameter grid, e.g. {\"steps\": [20, 30]}")
+
+    @field_validator("grid")
+    @classmethod
+    def validate_grid(cls, grid: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+        """Only allow known parameters with at least one value."""
+        for name, values in grid.items():
+            if name not in cls.GRID_PARAMETERS:
+                raise ValueError(f"Unsupported grid parameter: {name}")
+            if not values:
+                raise ValueError(f"Grid parameter {name} needs at least one value")
+        return grid
+
+    @property
+    def size(self) -> int:
+        """Number of generations the batch expands to."""
+        size = len(self.prompts) * len(self.seeds)
+        for values in self.grid.values():
+            size *= len(values)
+        return size
+
+    def expand(self) -> List[TextToImageRequest]:
+        """
+        Expand the batch into individual validated requests.
+
+        Returns:
+            One TextToImageRequest per combination
+        """
+        shared = self.model_dump(include=set(self.GRID_PARAMETERS))
+        axes = list(self.grid)
+        return [
+            TextToImageRequest(
+                **{**shared, **dict(zip(axes, combination, strict=True))},
+                prompt=prompt,
+                seed=seed,
+            )
+            for prompt in self.prompts
+            for seed in self.seeds
+            for combination in itertools.product(*self.grid.values())
+        ]
+
+
 class ImageToImageRequest(BaseModel):
     """Request schema for image-to-image generation."""
 
@@ -81,6 +143,25 @@ class GenerationListResponse(BaseModel):
     items: List[GenerationResponse] = Field(..., description="List of generations")
 
 
+class BatchStatusResponse(BaseModel):
+    """Response schema for batch progress."""
+
+    batch_id: str = Field(..., description="Batch ID")
+    total: int = Field(..., description="Number of generations in the batch")
+    completed: int = Field(..., description="Generations completed successfully")
+    failed: int = Field(..., description="Generations that failed")
+    finished: int = Field(..., description="Generations completed or failed")
+    progress: float = Field(..., description="Finished percentage")
+
+
+class BatchGenerationResponse(BaseModel):
+    """Response schema for batch generation requests."""
+
+    batch_id: str = Field(..., description="Batch ID; progress is published on batch:progress:{batch_id}")
+    total: int = Field(..., description="Number of generations queued")
+    items: List[GenerationResponse] = Field(..., description="Queued generations")
+
+
 class HistoryFilters(BaseModel):
     """Filters for querying generation history."""
 
@@ -92,6 +173,20 @@ class HistoryFilters(BaseModel):
     offset: int = Field(0, ge=0, description="Results offset for pagination")
 
 
+class ScheduleOptions(BaseModel):
+    """Query parameters deferring a generation to a later time."""
+
+    run_at: Optional[datetime] = Field(None, description="Start no earlier than this time (UTC unless an offset is given)")
+    delay: Optional[float] = Field(None, ge=0, le=7 * 86400, description="Start no earlier than this many seconds from now")
+
+    def timestamp(self) -> Optional[float]:
+        """Unix time given by run_at, or None if not set."""
+        if self.run_at is None:
+            return None
+        run_at = self.run_at if self.run_at.tzinfo else self.run_at.replace(tzinfo=timezone.utc)
+        return run_at.timestamp()
+
+
 class WebSocketMessage(BaseModel):
     """WebSocket message schema for progress updates."""
 
@@ -0,0 +1 @@
+"""Performance benchmarks for the backend (run as modules, not collected by pytest)."""
@@ -0,0 +1,132 @@
+"""
+Benchmark bytes stored and encode/decode time for Redis payload codecs.
+
+Compares the previous ``json.dumps`` text encoding against each codec
+serializer/compression pair on a typical text-to-image cache entry, a
+queue task and a page of generation history.
+
+Usage:
+    python -m backend.benchmarks.bench_codec [--iterations 2000]
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("RUNWARE_API_KEY", "benchmark")
+
+from backend.core.codec import Codec  # noqa: E402
+
+
+def generation_result(num_images: int = 4) -> list[dict]:
+    """A cached text-to-image result."""
+    return [
+        {
+            "image_url": f"https://im.runware.ai/image/ws/2/ii/{i:08x}-6f2c-4b7e-9a1d-3c5e7f9b1d2a.png",
+            "output_path": f"/app/generated/objects/3f/a9/3fa9{i:060x}.png",
+            "sha256": f"3fa9{i:060x}",
+            "seed": 1234567 + i,
+            "width": 1024,
+            "height": 1024,
+            "steps": 30,
+            "guidance_scale": 7.5,
+        }
+        for i in range(num_images)
+    ]
+
+
+def queue_task() -> dict:
+    """A queued generation task."""
+    return {
+        "task_id": 18342,
+        "generation_type": "text-to-image",
+        "priority": "normal",
+        "params": {
+            "prompt": "a lighthouse on a cliff at dusk, volumetric light, 35mm photo",
+            "negative_prompt": "blurry, low quality",
+            "width": 1024,
+            "height": 1024,
+            "steps": 30,
+            "guidance_scale": 7.5,
+            "seed": None,
+            "model": "runware:100@1",
+            "num_images": 4,
+        },
+    }
+
+
+def history_page(size: int = 50) -> dict:
+    """A page of generation history as returned by /api/history."""
+    now = datetime(2026, 1, 2, 12, 0, 0).isoformat()
+    item = {
+        "generation_type": "text-to-image",
+        "prompt": "a lighthouse on a cliff at dusk, volumetric light, 35mm photo",
+        "negative_prompt": "blurry, low quality",
+        "model": "runware:100@1",
+        "width": 1024,
+        "height": 1024,
+        "steps": 30,
+        "guidance_scale": 7.5,
+        "seed": 1234567,
+        "status": "completed",
+        "output_path": "/app/generated/objects/3f/a9/3fa9.png",
+        "output_url": "https://im.runware.ai/image/ws/2/ii/3fa9.png",
+        "processing_time": 4.2,
+        "is_favorite": False,
+        "tags": ["landscape", "photo"],
+        "created_at": now,
+        "completed_at": now,
+    }
+    return {"total": 1000, "items": [{"id": i, **item} for i in range(size)]}
+
+
+def measure(codec: Codec, payload, iterations: int) -> tuple[int, float, float]:
+    """Return encoded size and mean encode/decode time in microseconds."""
+    encoded = codec.encode(payload)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.encode(payload)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(encoded)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return len(encoded), encode_us, decode_us
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = {
+        "result": generation_result(),
+        "task": queue_task(),
+        "history": history_page(),
+    }
+    codecs = [("legacy", "none")] + [
+        (serializer, compression)
+        for serializer in ("json", "msgpack")
+        for compression in ("none", "zlib", "zstd", "lz4")
+    ]
+
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        baseline = None
+        for serializer, compression in codecs:
+            codec = Codec(serializer=serializer, compression=compression, compress_threshold=1024)
+            size, encode_us, decode_us = measure(codec, payload, args.iterations)
+            baseline = baseline or size
+            print(
+                f"  {serializer:<8}{compression:<6} bytes={size:7d} ({size / baseline:5.0%}) "
+                f"encode={encode_us:8.1f}us decode={decode_us:8.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark peak memory and loop lag when downloading video-sized payloads.
+
+Serves a large body from a local aiohttp server and compares the previous
+``f.write(await response.read())`` approach against the streaming
+DownloadManager. Peak memory is measured with tracemalloc.
+
+Usage:
+    python -m backend.benchmarks.bench_download_memory [--size-mb 256] [--parallel 4]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_download_")
+os.environ.setdefault("RUNWARE_API_KEY", "benchmark")
+os.environ.setdefault("STORAGE_PATH", _tmpdir)
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from backend.services.download_manager import DownloadManager  # noqa: E402
+
+CHUNK = b"\0" * (1024 * 1024)
+
+
+async def start_server(size_mb: int) -> tuple[web.AppRunner, str]:
+    """Start a local server streaming size_mb megabytes per request."""
+
+    async def handler(request):
+        response = web.StreamResponse()
+        response.content_length = size_mb * len(CHUNK)
+        await response.prepare(request)
+        for _ in range(size_mb):
+            await response.write(CHUNK)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def legacy_download(url: str, output_path: Path):
+    """The previous implementation: new session, full buffer, blocking write."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            with open(output_path, "wb") as f:
+                f.write(await response.read())
+
+
+async def measure(name: str, downloads) -> None:
+    """Run downloads and print wall time, peak traced memory and max loop lag."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    async def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append((time.perf_counter() - start - 0.005) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*downloads)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop.set()
+    await probe_task
+
+    print(
+        f"{name:<10} time={elapsed:6.2f}s peak={peak / 1024 / 1024:8.1f} MiB "
+        f"max_loop_lag={max(lags, default=0):7.1f}ms"
+    )
+
+
+async def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=4)
+    args = parser.parse_args()
+
+    runner, base_url = await start_server(args.size_mb)
+    out = Path(_tmpdir)
+    print(f"payload={args.size_mb} MiB x {args.parallel} parallel downloads")
+
+    try:
+        await measure("legacy", [
+            legacy_download(f"{base_url}/legacy{i}", out / f"legacy{i}.bin")
+            for i in range(args.parallel)
+        ])
+
+        manager = DownloadManager(max_concurrent=args.parallel)
+        await measure("streaming", [
+            manager.download(f"{base_url}/stream{i}", out / f"stream{i}.bin")
+            for i in range(args.parallel)
+        ])
+        await manager.close()
+    finally:
+        await runner.cleanup()
+        for path in out.glob("*.bin"):
+            path.unlink()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,205 @@
+"""
+Benchmark fairness and throughput of the generation queue with skewed tenants.
+
+One heavy tenant submits a large backlog before several light tenants
+submit a handful of tasks each, and a low-priority tenant queues work
+behind a steady stream of high-priority tasks. The tasks are drained one
+by one through the previous single-list FIFO and through the fair
+scheduler. Reported per scheduler:
+
+- when light tenants get served (dequeue slot of their first and last task)
+- Jain's fairness index over the slots where every tenant had work queued
+- when the low-priority tenant first runs (aging)
+- enqueue and dequeue throughput
+
+Runs against REDIS_URL, or an in-memory server with --fake (needs
+fakeredis[lua]; absolute throughput is then not representative).
+
+Usage:
+    python -m backend.benchmarks.bench_fair_queue [--heavy 2000] [--light 9] [--fake]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("RUNWARE_API_KEY", "benchmark")
+
+import redis.asyncio as aioredis  # noqa: E402
+
+from backend.core.codec import codec  # noqa: E402
+from backend.core.config import settings  # noqa: E402
+from backend.core.redis_client import redis_client  # noqa: E402
+from backend.services.queue_service import QueueService  # noqa: E402
+
+PARAMS = {"prompt": "a lighthouse on a cliff at dusk", "width": 512, "height": 512, "steps": 25}
+FIFO_PREFIX = "bench:fifo"
+
+
+def workload(heavy: int, light: int, per_light: int) -> List[Tuple[str, str, List[int]]]:
+    """(client_id, priority, task_ids) submissions in arrival order."""
+    submissions = [("heavy", "normal", list(range(heavy)))]
+    next_id = heavy
+    for index in range(light):
+        submissions.append((f"light-{index}", "normal", list(range(next_id, next_id + per_light))))
+        next_id += per_light
+    submissions.append(("background", "low", list(range(next_id, next_id + per_light))))
+    next_id += per_light
+    submissions.append(("interactive", "high", list(range(next_id, next_id + heavy // 4))))
+    return submissions
+
+
+class FifoQueue:
+    """The previous queue: one list per priority drained with LPOP."""
+
+    def __init__(self, client: aioredis.Redis):
+        self.client = client
+
+    async def enqueue_many(self, tasks, priority, client_id):
+        await self.client.rpush(f"{FIFO_PREFIX}:{priority}", *(
+            codec.encode({"task_id": task_id, "params": params, "client_id": client_id})
+            for task_id, _, params in tasks
+        ))
+
+    async def start(self):
+        pass
+
+    async def dequeue(self):
+        for priority in ("high", "normal", "low"):
+            raw = await self.client.lpop(f"{FIFO_PREFIX}:{priority}")
+            if raw is not None:
+                return codec.decode(raw)
+        return None
+
+
+class FairQueue:
+    """Adapter over QueueService with the same interface as FifoQueue."""
+
+    def __init__(self, service: QueueService):
+        self.service = service
+
+    async def enqueue_many(self, tasks, priority, client_id):
+        assert await self.service.enqueue_many(tasks, priority, client_id)
+
+    async def start(self):
+        # Start the aging clock when draining begins so slow enqueueing
+        # in this synthetic run does not count as waiting
+        now = time.time()
+        for priority in self.service._priorities():
+            await redis_client.client.set(f"{self.service.QUEUE_PREFIX}:{priority}:served", now)
+
+    async def dequeue(self):
+        return await self.service.dequeue(timeout=0)
+
+
+def jain_index(shares: List[float]) -> float:
+    """Jain's fairness index: 1.0 when every share is equal."""
+    if not shares or not any(shares):
+        return 0.0
+    return sum(shares) ** 2 / (len(shares) * sum(share * share for share in shares))
+
+
+async def run(queue, submissions) -> Dict[str, object]:
+    """Submit the workload, drain it and collect metrics."""
+    total = sum(len(task_ids) for _, _, task_ids in submissions)
+
+    start = time.perf_counter()
+    for client_id, priority, task_ids in submissions:
+        for offset in range(0, len(task_ids), 100):
+            chunk = task_ids[offset:offset + 100]
+            await queue.enqueue_many([(task_id, "text-to-image", PARAMS) for task_id in chunk], priority, client_id)
+    enqueue_seconds = time.perf_counter() - start
+
+    order: List[str] = []
+    first_low_at = None
+    await queue.start()
+    start = time.perf_counter()
+    while True:
+        task = await queue.dequeue()
+        if task is None:
+            break
+        order.append(task["client_id"])
+        if task["client_id"] == "background" and first_low_at is None:
+            first_low_at = (len(order), time.perf_counter() - start)
+    dequeue_seconds = time.perf_counter() - start
+    assert len(order) == total, f"drained {len(order)} of {total}"
+
+    slots: Dict[str, List[int]] = defaultdict(list)
+    for slot, client_id in enumerate(order, start=1):
+        slots[client_id].append(slot)
+
+    # Fairness among normal-priority tenants while all of them still had work
+    normal = [client_id for client_id, priority, _ in submissions if priority == "normal"]
+    window_end = min(slots[client_id][-1] for client_id in normal)
+    served = Counter(client_id for client_id in order[:window_end] if client_id in normal)
+
+    light = [client_id for client_id in normal if client_id != "heavy"]
+    return {
+        "light_first": statistics.mean(slots[client_id][0] for client_id in light),
+        "light_last": statistics.mean(slots[client_id][-1] for client_id in light),
+        "heavy_last": slots["heavy"][-1],
+        "jain": jain_index([served[client_id] for client_id in normal]),
+        "first_low": first_low_at,
+        "enqueue_rate": total / enqueue_seconds,
+        "dequeue_rate": total / dequeue_seconds,
+    }
+
+
+def report(name: str, metrics: Dict[str, object], total: int):
+    """Print one scheduler's results."""
+    low_slot, low_seconds = metrics["first_low"]
+    print(f"\n{name}")
+    print(f"  light tenants first served at slot   {metrics['light_first']:>8.1f} / {total}")
+    print(f"  light tenants finished at slot       {metrics['light_last']:>8.1f} / {total}")
+    print(f"  heavy tenant finished at slot        {metrics['heavy_last']:>8d} / {total}")
+    print(f"  Jain fairness (normal, backlogged)   {metrics['jain']:>8.3f}")
+    print(f"  low priority first served at slot    {low_slot:>8d}  ({low_seconds * 1000:.0f} ms)")
+    print(f"  enqueue throughput                   {metrics['enqueue_rate']:>8.0f} tasks/s")
+    print(f"  dequeue throughput                   {metrics['dequeue_rate']:>8.0f} tasks/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--heavy", type=int, default=2000, help="tasks queued by the heavy tenant")
+    parser.add_argument("--light", type=int, default=9, help="number of light tenants")
+    parser.add_argument("--per-light", type=int, default=20, help="tasks per light tenant")
+    parser.add_argument("--aging", type=float, default=0.1, help="aging threshold in seconds for the fair queue")
+    parser.add_argument("--fake", action="store_true", help="use an in-memory fakeredis server")
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        redis_client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        redis_client._binary_client = fakeredis.FakeAsyncRedis(server=server)
+    else:
+        await redis_client.initialize()
+    binary = redis_client.binary_client
+
+    submissions = workload(args.heavy, args.light, args.per_light)
+    total = sum(len(task_ids) for _, _, task_ids in submissions)
+    print(f"{total} tasks: heavy={args.heavy}, {args.light} light x {args.per_light}, "
+          f"{args.per_light} low priority, {args.heavy // 4} high priority (redis: "
+          f"{'fakeredis' if args.fake else settings.redis_url})")
+
+    service = QueueService(quantum=1.0, aging_seconds=args.aging, client_weights={})
+    service.QUEUE_PREFIX = "bench:fair"
+    await service.initialize()
+    await service.clear()
+    await binary.delete(*(f"{FIFO_PREFIX}:{p}" for p in ("high", "normal", "low")))
+
+    try:
+        report("FIFO (previous)", await run(FifoQueue(binary), submissions), total)
+        report(f"Fair (DRR, aging {args.aging}s)", await run(FairQueue(service), submissions), total)
+    finally:
+        await service.clear()
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+"""
+Benchmark /api/history latency under concurrent generation bookkeeping load.
+
+Compares the async repository path against the previous synchronous
+Session-on-the-event-loop path using a throwaway SQLite database. Besides
+request latency it reports event-loop lag, i.e. how long any other
+coroutine (WebSocket sends, progress updates) is stalled by database I/O.
+Sync request latencies look low only because the client shares the blocked
+loop: requests are serialized and their queueing time shows up as loop lag.
+
+Usage:
+    python -m backend.benchmarks.bench_history [--rows 5000] [--requests 400]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_history_")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_tmpdir) / 'bench.db'}"
+os.environ.setdefault("RUNWARE_API_KEY", "benchmark")
+os.environ.setdefault("STORAGE_PATH", _tmpdir)
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from backend.api.endpoints import generate  # noqa: E402
+from backend.api.schemas import GenerationListResponse, GenerationResponse  # noqa: E402
+from backend.models.database import Generation, SessionLocal, close_db, init_db  # noqa: E402
+from backend.models.repository import generation_repository  # noqa: E402
+
+STATUSES = ["pending", "processing", "completed", "failed"]
+
+
+def build_app() -> FastAPI:
+    """Build an app with the real router plus the legacy sync history handler."""
+    app = FastAPI()
+    app.include_router(generate.router)
+
+    @app.get("/legacy/history", response_model=GenerationListResponse)
+    async def legacy_history() -> GenerationListResponse:
+        # The old handler used Depends(get_db), whose teardown runs in the
+        # threadpool; with >15 concurrent requests the blocked loop exhausts
+        # the pool and deadlocks, so the session is closed inline here.
+        db = SessionLocal()
+        try:
+            query = db.query(Generation)
+            total = query.count()
+            items = query.order_by(Generation.created_at.desc()).offset(0).limit(50).all()
+            return GenerationListResponse(
+                total=total,
+                items=[GenerationResponse.from_orm(gen) for gen in items],
+            )
+        finally:
+            db.close()
+
+    return app
+
+
+def seed(rows: int):
+    """Insert benchmark rows."""
+    init_db()
+    db = SessionLocal()
+    try:
+        db.add_all(
+            Generation(
+                generation_type="text-to-image",
+                prompt=f"benchmark prompt {i}",
+                parameters={"width": 512, "height": 512},
+                status=random.choice(STATUSES),
+                output_path="",
+            )
+            for i in range(rows)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def sync_writer(rows: int, stop: asyncio.Event):
+    """Simulate generation bookkeeping the old way: blocking commits on the loop."""
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            generation = db.get(Generation, random.randint(1, rows))
+            generation.status = random.choice(STATUSES)
+            generation.completed_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+        await asyncio.sleep(0)
+
+
+async def async_writer(rows: int, stop: asyncio.Event):
+    """Simulate generation bookkeeping through the async repository."""
+    while not stop.is_set():
+        await generation_repository.update(
+            random.randint(1, rows),
+            status=random.choice(STATUSES),
+            completed_at=datetime.utcnow(),
+        )
+
+
+async def loop_lag_probe(stop: asyncio.Event, lags: list[float], interval: float = 0.005):
+    """Record how late a periodic wakeup fires compared to its schedule."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (time.perf_counter() - start - interval) * 1000))
+
+
+async def run_mode(app: FastAPI, path: str, writer, args) -> tuple[list[float], list[float]]:
+    """Measure history latencies and loop lag while writers run."""
+    stop = asyncio.Event()
+    writers = [asyncio.create_task(writer(args.rows, stop)) for _ in range(args.writers)]
+    lags: list[float] = []
+    probe = asyncio.create_task(loop_lag_probe(stop, lags))
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        await asyncio.gather(*(one_request() for _ in range(args.requests)))
+
+    stop.set()
+    await asyncio.gather(probe, *writers)
+    return latencies, lags
+
+
+def report(name: str, samples: list[float]):
+    """Print percentiles of millisecond samples."""
+    ordered = sorted(samples)
+    p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    print(
+        f"{name:<14} n={len(ordered):<5} mean={statistics.mean(ordered):8.2f}ms "
+        f"p50={p(0.50):8.2f}ms p95={p(0.95):8.2f}ms p99={p(0.99):8.2f}ms max={ordered[-1]:8.2f}ms"
+    )
+
+
+async def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--writers", type=int, default=8)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    app = build_app()
+
+    print(f"rows={args.rows} requests={args.requests} concurrency={args.concurrency} writers={args.writers}")
+    for name, path, writer in (
+        ("sync", "/legacy/history", sync_writer),
+        ("async", "/api/history", async_writer),
+    ):
+        latencies, lags = await run_mode(app, path, writer, args)
+        report(f"{name} history", latencies)
+        report(f"{name} loop lag", lags)
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
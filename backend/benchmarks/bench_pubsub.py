@@ -0,0 +1,173 @@
+"""
+Benchmark Pub/Sub memory and connections with many concurrent watchers.
+
+Subscribes --watchers generations through the previous subscriber (one
+pubsub connection and listener task per generation) and through the
+multiplexed one (a single PSUBSCRIBE connection feeding local queues),
+then publishes one message per generation and waits until every watcher
+has it. Reported per subscriber:
+
+- Redis connections held, and subscriptions that failed
+- Python memory allocated for the subscriptions (tracemalloc)
+- time to subscribe every watcher and to deliver one message to each
+
+Runs against REDIS_URL, or an in-memory server with --fake (needs
+fakeredis). Against a real server the previous subscriber is capped by
+REDIS_MAX_CONNECTIONS and most of its subscriptions fail.
+
+Usage:
+    python -m backend.benchmarks.bench_pubsub [--watchers 10000] [--fake]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from typing import Dict, List
+
+os.environ.setdefault("RUNWARE_API_KEY", "benchmark")
+
+import redis.asyncio as redis  # noqa: E402
+
+from backend.core.codec import codec  # noqa: E402
+from backend.core.config import settings  # noqa: E402
+from backend.core.redis_client import redis_client  # noqa: E402
+from backend.services.pubsub_service import PubSubService  # noqa: E402
+
+FIRST_ID = 10_000_000
+
+
+class PreviousPubSubService:
+    """The previous subscriber: one pubsub connection and task per generation."""
+
+    def __init__(self):
+        self._listeners: Dict[int, asyncio.Queue] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self.failed = 0
+
+    async def _listen_channel(self, generation_id: int, queue: asyncio.Queue, ready: asyncio.Event):
+        pubsub = redis_client.binary_client.pubsub()
+        try:
+            await pubsub.subscribe(f"generation:progress:{generation_id}")
+            ready.set()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    await queue.put(codec.decode(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            ready.set()
+        finally:
+            await pubsub.aclose()
+
+    async def subscribe(self, generation_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        ready = asyncio.Event()
+        self._listeners[generation_id] = queue
+        self._tasks[generation_id] = asyncio.create_task(self._listen_channel(generation_id, queue, ready))
+        await ready.wait()
+        return queue
+
+    async def cleanup(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        self._listeners.clear()
+
+
+def connections_in_use() -> int:
+    """Connections currently checked out of the binary client's pool."""
+    return len(redis_client.binary_client.connection_pool._in_use_connections)
+
+
+async def run(service, publisher, watchers: int) -> Dict[str, float]:
+    """Subscribe every watcher, deliver one message to each and collect metrics."""
+    ids = list(range(FIRST_ID, FIRST_ID + watchers))
+    baseline_connections = connections_in_use()
+    gc.collect()
+    tracemalloc.start()
+
+    start = time.perf_counter()
+    queues: List[asyncio.Queue] = await asyncio.gather(*(service.subscribe(i) for i in ids))
+    subscribe_seconds = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    connections = connections_in_use() - baseline_connections
+
+    failed = getattr(service, "failed", 0)
+    start = time.perf_counter()
+    payload = codec.encode({"type": "progress", "progress": 50})
+    for offset in range(0, watchers, 500):
+        async with publisher.pipeline(transaction=False) as pipe:
+            for generation_id in ids[offset:offset + 500]:
+                pipe.publish(f"generation:progress:{generation_id}", payload)
+            await pipe.execute()
+
+    deadline = time.monotonic() + 30
+    while sum(1 for queue in queues if not queue.empty()) < watchers - failed and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    deliver_seconds = time.perf_counter() - start
+    received = sum(1 for queue in queues if not queue.empty())
+
+    await service.cleanup()
+    return {
+        "connections": connections,
+        "failed": failed,
+        "memory_mb": memory / 1e6,
+        "subscribe_seconds": subscribe_seconds,
+        "deliver_seconds": deliver_seconds,
+        "received": received,
+    }
+
+
+def report(name: str, metrics: Dict[str, float], watchers: int):
+    """Print one subscriber's results."""
+    print(f"\n{name}")
+    print(f"  Redis connections held              {metrics['connections']:>10d}")
+    print(f"  failed subscriptions                {metrics['failed']:>10d} / {watchers}")
+    print(f"  memory for subscriptions            {metrics['memory_mb']:>10.1f} MB")
+    subscribed = max(1, watchers - metrics["failed"])
+    print(f"  memory per subscribed watcher       {metrics['memory_mb'] * 1e3 / subscribed:>10.1f} KB")
+    print(f"  subscribe all watchers              {metrics['subscribe_seconds'] * 1000:>10.0f} ms")
+    print(f"  deliver one message to each         {metrics['deliver_seconds'] * 1000:>10.0f} ms"
+          f"  ({metrics['received']} received)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--watchers", type=int, default=10000, help="generations watched concurrently")
+    parser.add_argument("--fake", action="store_true", help="use an in-memory fakeredis server")
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        redis_client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        redis_client._binary_client = fakeredis.FakeAsyncRedis(server=server)
+        publisher = fakeredis.FakeAsyncRedis(server=server)
+    else:
+        await redis_client.initialize()
+        # Publish outside the pool the subscribers compete for
+        publisher = redis.Redis.from_url(settings.redis_url)
+
+    print(f"{args.watchers} concurrent watchers (redis: "
+          f"{'fakeredis' if args.fake else f'{settings.redis_url}, max {settings.redis_max_connections} connections'})")
+
+    try:
+        for name, service in (
+            ("One connection per generation (previous)", PreviousPubSubService()),
+            ("Multiplexed PSUBSCRIBE", PubSubService()),
+        ):
+            report(name, await run(service, publisher, args.watchers), args.watchers)
+    finally:
+        await publisher.aclose()
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
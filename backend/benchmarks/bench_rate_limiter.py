@@ -0,0 +1,191 @@
+"""
+Benchmark the rate limiting middleware stack.
+
+Sends requests through an in-process ASGI client to an app with the same
+middleware as the API (CORS, then the rate limiter) and a trivial
+endpoint. Variants:
+
+- no rate limiter
+- the original BaseHTTPMiddleware limiter (INCR + EXPIRE per window)
+- BaseHTTPMiddleware around the GCRA script (one EVALSHA per request)
+- the pure ASGI limiter on a limited route and on an exempt route
+- the pure ASGI limiter with Redis down (in-process token buckets)
+
+Reported per variant: requests/sec with --concurrency requests in flight,
+mean and p99 latency, and the latency overhead over no rate limiter.
+
+Runs against REDIS_URL, or an in-memory server with --fake (needs
+fakeredis[lua]; there is then no network round trip, and scripts run in
+an emulated Lua interpreter, so Redis-backed variants are not
+representative).
+
+Usage:
+    python -m backend.benchmarks.bench_rate_limiter [--requests 2000] [--concurrency 8] [--fake]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("RUNWARE_API_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from backend.core.config import settings  # noqa: E402
+from backend.core.rate_limit import RateLimiter  # noqa: E402
+from backend.core.redis_client import redis_client  # noqa: E402
+from backend.middleware.rate_limiter import RateLimiterMiddleware  # noqa: E402
+
+# High enough that no request is refused: only the bookkeeping is measured
+LIMIT = 10**9
+POLICIES = {"* /health": "exempt"}
+
+
+class IncrRateLimiterMiddleware(BaseHTTPMiddleware):
+    """The original limiter: INCR and EXPIRE per window."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        client_id = request.client.host if request.client else "unknown"
+        endpoint = f"{request.method}:{request.url.path}"
+        client = redis_client.client
+
+        minute_key = f"bench:rate_limit:minute:{client_id}:{endpoint}"
+        hour_key = f"bench:rate_limit:hour:{client_id}:{endpoint}"
+        minute_count = await client.incr(minute_key)
+        if minute_count == 1:
+            await client.expire(minute_key, 60)
+        hour_count = await client.incr(hour_key)
+        if hour_count == 1:
+            await client.expire(hour_key, 3600)
+
+        if minute_count > LIMIT or hour_count > LIMIT:
+            return Response(status_code=429)
+        return await call_next(request)
+
+
+class ScriptRateLimiterMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware calling the GCRA script."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiter = RateLimiter("bench:rate_limit", [("minute", LIMIT, 60.0), ("hour", LIMIT, 3600.0)])
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        client_id = request.client.host if request.client else "unknown"
+        allowed, _, _ = await self.limiter.hit(f"{client_id}:{request.method}:{request.url.path}")
+        if not allowed:
+            return Response(status_code=429)
+        return await call_next(request)
+
+
+def asgi_limiter(redis_down: bool = False) -> Callable[[Any], RateLimiterMiddleware]:
+    """Factory for the pure ASGI limiter, optionally with Redis considered down."""
+    def build(app) -> RateLimiterMiddleware:
+        middleware = RateLimiterMiddleware(app, policies=POLICIES, default=f"{LIMIT}/minute,{LIMIT}/hour")
+        if redis_down:
+            middleware.default.limiter._redis_retry_at = math.inf
+        return middleware
+    return build
+
+
+def build_app(limiter: Optional[Callable]) -> FastAPI:
+    """A two-route app with the API's middleware stack."""
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    if limiter is not None:
+        app.add_middleware(limiter)
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int, clients: int) -> Tuple[List[float], float]:
+    """Per-request latencies in microseconds and overall requests/sec."""
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get(path)
+
+        async def worker(offset: int):
+            for index in range(offset, requests, concurrency):
+                headers = {"X-Forwarded-For": f"10.0.{index % clients // 256}.{index % 256}"}
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append((time.perf_counter() - start) * 1e6)
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, requests / elapsed
+
+
+def report(name: str, latencies: List[float], rate: float, baseline: Optional[float]) -> float:
+    """Print one variant's results and return its mean latency."""
+    mean = statistics.mean(latencies)
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    overhead = f"{mean - baseline:>7.0f} us" if baseline is not None else f"{'-':>7} us"
+    print(f"  {name:<38} {rate:>7.0f} req/s   mean {mean:>6.0f} us   p99 {p99:>6.0f} us   overhead {overhead}")
+    return mean
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per variant")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--clients", type=int, default=100, help="distinct client addresses")
+    parser.add_argument("--fake", action="store_true", help="use an in-memory fakeredis server")
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        redis_client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        redis_client._binary_client = fakeredis.FakeAsyncRedis(server=server)
+    else:
+        await redis_client.initialize()
+
+    print(f"{args.requests} requests per variant, {args.concurrency} in flight, from {args.clients} clients "
+          f"(redis: {'fakeredis' if args.fake else settings.redis_url})")
+
+    variants: Dict[str, Tuple[Optional[Callable], str]] = {
+        "no rate limiter": (None, "/api/ping"),
+        "BaseHTTPMiddleware + INCR/EXPIRE": (IncrRateLimiterMiddleware, "/api/ping"),
+        "BaseHTTPMiddleware + GCRA script": (ScriptRateLimiterMiddleware, "/api/ping"),
+        "ASGI + GCRA script": (asgi_limiter(), "/api/ping"),
+        "ASGI, exempt route": (asgi_limiter(), "/health"),
+        "ASGI + token buckets (Redis down)": (asgi_limiter(redis_down=True), "/api/ping"),
+    }
+    try:
+        baseline = None
+        for name, (limiter, path) in variants.items():
+            latencies, rate = await measure(build_app(limiter), path, args.requests, args.concurrency, args.clients)
+            mean = report(name, latencies, rate, baseline)
+            if baseline is None:
+                baseline = mean
+    finally:
+        client = redis_client.client
+        keys = [key async for key in client.scan_iter("*rate_limit:*")]
+        if keys:
+            await client.delete(*keys)
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
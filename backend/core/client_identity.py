@@ -0,0 +1,79 @@
+"""Identify the client behind a request for scheduling and rate limiting."""
+
+import ipaddress
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+from starlette.types import Scope
+
+from backend.core.config import settings
+
+CLIENT_ID_MAX_LENGTH = 128
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache(maxsize=8)
+def _networks(proxies: Tuple[str, ...]) -> List[Network]:
+    """Parse trusted proxy addresses and CIDR ranges."""
+    return [ipaddress.ip_network(proxy.strip(), strict=False) for proxy in proxies if proxy.strip()]
+
+
+def is_trusted_proxy(address: str, proxies: Optional[Iterable[str]] = None) -> bool:
+    """
+    Check whether an address belongs to a trusted proxy.
+
+    Args:
+        address: IP address
+        proxies: Trusted addresses or CIDR ranges (default: settings.trusted_proxies)
+
+    Returns:
+        True if the address is trusted
+    """
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except ValueError:
+        return False
+    if proxies is None:
+        proxies = settings.trusted_proxies
+    return any(ip in network for network in _networks(tuple(proxies)))
+
+
+def client_identity(scope: Scope) -> str:
+    """
+    Identify the client a request is scheduled and limited against.
+
+    The transport peer address is used unless the peer is a trusted
+    proxy. Only then is an explicit ``X-Client-ID`` header honoured, so
+    several users behind one proxy can be told apart, or else the nearest
+    ``X-Forwarded-For`` address that is not itself a trusted proxy.
+    Headers from any other peer are ignored, so clients cannot pick
+    their own identity.
+
+    Args:
+        scope: ASGI connection scope
+
+    Returns:
+        Client identifier
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not is_trusted_proxy(peer):
+        return peer
+
+    client_id = ""
+    forwarded = []
+    for name, value in scope.get("headers", ()):
+        if name == b"x-client-id":
+            client_id = value.decode("latin-1").strip()
+        elif name == b"x-forwarded-for":
+            forwarded.extend(value.decode("latin-1").split(","))
+    if client_id:
+        return client_id[:CLIENT_ID_MAX_LENGTH]
+
+    # Proxies append the address they saw; walk back to the first one not ours
+    for address in reversed(forwarded):
+        address = address.strip()
+        if address and not is_trusted_proxy(address):
+            return address[:CLIENT_ID_MAX_LENGTH]
+    return peer
@@ -0,0 +1,172 @@
+"""Versioned binary codec for values stored in or published through Redis."""
+
+import json
+import logging
+import zlib
+from datetime import date
+from typing import Any, Optional, Union
+
+from backend.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4 = None
+
+logger = logging.getLogger(__name__)
+
+# First byte of every encoded value. JSON text never starts with it, so
+# header-less values written before the codec existed still decode.
+MAGIC = 0xC1
+VERSION = 1
+
+SERIALIZERS = {"json": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+
+def _default(value: Any) -> Any:
+    """
+    Serialize values the formats have no type for.
+
+    Dates and datetimes become ISO 8601 strings with every serializer, as
+    orjson writes them, so a value reads back the same whichever format
+    wrote it.
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+class Codec:
+    """
+    Encodes values as ``MAGIC | version | serializer | compression | body``.
+
+    Readers understand every format (plus legacy header-less JSON), so the
+    write format can be changed node by node. Set the serializer to
+    ``legacy`` to keep writing plain JSON until every node runs a reader.
+    """
+
+    def __init__(
+        self,
+        serializer: str = settings.codec_serializer,
+        compression: str = settings.codec_compression,
+        compress_threshold: int = settings.codec_compress_threshold,
+    ):
+        """
+        Initialize codec.
+
+        Args:
+            serializer: "legacy", "json" or "msgpack"
+            compression: "none", "zlib", "zstd" or "lz4"
+            compress_threshold: Minimum body size in bytes worth compressing
+        """
+        if serializer != "legacy" and serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown codec serializer: {serializer}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown codec compression: {compression}")
+
+        if serializer == "msgpack" and msgpack is None:
+            logger.warning("msgpack not installed, falling back to JSON codec")
+            serializer = "json"
+        if (compression == "zstd" and zstandard is None) or (compression == "lz4" and lz4 is None):
+            logger.warning(f"{compression} not installed, falling back to zlib compression")
+            compression = "zlib"
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if compression == "zstd" else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Serialize and, above the threshold, compress a value.
+
+        Args:
+            value: JSON-compatible value; dates and datetimes are written as ISO strings
+
+        Returns:
+            Encoded bytes
+        """
+        if self.serializer == "legacy":
+            return json.dumps(value, default=_default).encode()
+
+        if self.serializer == "msgpack":
+            body = msgpack.packb(value, use_bin_type=True, default=_default)
+        elif orjson is not None:
+            body = orjson.dumps(value, default=_default)
+        else:
+            body = json.dumps(value, separators=(",", ":"), default=_default).encode()
+
+        compression = self.compression
+        if compression == "none" or len(body) < self.compress_threshold:
+            compression = "none"
+        elif compression == "zlib":
+            body = zlib.compress(body, 6)
+        elif compression == "zstd":
+            body = self._zstd_compressor.compress(body)
+        elif compression == "lz4":
+            body = lz4.frame.compress(body)
+
+        header = bytes((MAGIC, VERSION, SERIALIZERS[self.serializer], COMPRESSIONS[compression]))
+        return header + body
+
+    def decode(self, data: Optional[Union[bytes, str]]) -> Any:
+        """
+        Decode a value written by any codec version or by plain json.dumps.
+
+        Args:
+            data: Raw value from Redis
+
+        Returns:
+            Decoded value, or None for None
+        """
+        if data is None:
+            return None
+        if isinstance(data, str) or not data or data[0] != MAGIC:
+            return json.loads(data)
+
+        version, serializer_id, compression_id = data[1], data[2], data[3]
+        if version != VERSION:
+            raise ValueError(f"Unsupported codec version: {version}")
+
+        body = data[4:]
+        if compression_id == COMPRESSIONS["zlib"]:
+            body = zlib.decompress(body)
+        elif compression_id == COMPRESSIONS["zstd"]:
+            if self._zstd_decompressor is None:
+                raise ValueError("zstandard is required to decode this value")
+            body = self._zstd_decompressor.decompress(body)
+        elif compression_id == COMPRESSIONS["lz4"]:
+            if lz4 is None:
+                raise ValueError("lz4 is required to decode this value")
+            body = lz4.frame.decompress(body)
+        elif compression_id != COMPRESSIONS["none"]:
+            raise ValueError(f"Unknown codec compression id: {compression_id}")
+
+        if serializer_id == SERIALIZERS["msgpack"]:
+            if msgpack is None:
+                raise ValueError("msgpack is required to decode this value")
+            return msgpack.unpackb(body, raw=False)
+        if serializer_id == SERIALIZERS["json"]:
+            return orjson.loads(body) if orjson is not None else json.loads(body)
+        raise ValueError(f"Unknown codec serializer id: {serializer_id}")
+
+
+# Global codec instance
+codec = Codec()
@@ -1,7 +1,7 @@
 """Configuration management using Pydantic Settings."""
 
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,30 +22,105 @@ class Settings(BaseSettings):
     # Storage Configuration
     storage_path: Path = Path("./generated")
 
+    # Download Configuration
+    download_max_connections: int = 20  # Pooled keep-alive connections
+    download_concurrency: int = 8  # Downloads in flight at once
+    download_timeout: float = 120.0  # Seconds per download
+    download_chunk_size: int = 256 * 1024  # Bytes buffered per streamed chunk
+
     # Server Configuration
     host: str = "127.0.0.1"
     port: int = 8000
 
     # Database Configuration
     database_url: str = "sqlite:///./runware_generator.db"
+    db_flush_interval: float = 0.5  # Seconds between batched generation status writes
 
     # Redis Configuration
     redis_url: str = "redis://localhost:6379/0"
-    redis_max_connections: int = 20
+    redis_max_connections: int = 20  # Per process, split between the text and binary pools
+    codec_serializer: str = "legacy"  # Redis value format: legacy (plain JSON), json or msgpack; switch once every node reads the codec
+    codec_compression: str = "zstd"  # Compression for large values: none, zlib, zstd or lz4
+    codec_compress_threshold: int = 1024  # Values smaller than this many bytes stay uncompressed
     cache_ttl: int = 3600
+    cache_local_max_entries: int = 1024  # In-process LRU tier entry limit
+    cache_local_max_bytes: int = 16 * 1024 * 1024  # In-process LRU tier size limit (encoded bytes)
+    cache_local_ttl: float = 60.0  # Seconds local entries live; bounds staleness after invalidation elsewhere
+    inflight_lock_ttl: int = 600  # Seconds a node leads an identical in-flight generation
+    inflight_wait_timeout: float = 600.0  # Seconds followers wait for another node's result
+    source_image_ttl: int = 86400  # Seconds an uploaded img2img source image UUID is reused
 
     # PostgreSQL Configuration (optional, for production)
     postgres_url: Optional[str] = None
 
+    # Proxies (addresses or CIDR ranges, JSON) whose X-Client-ID and X-Forwarded-For headers are trusted
+    trusted_proxies: list[str] = ["127.0.0.1", "::1"]
+
     # CORS Configuration - Allow all localhost ports for development
     cors_origins: list[str] = ["*"]  # Allow all origins in development
 
     # Generation Settings
+    default_model: str = "runware:100@1"
     default_image_width: int = 512
     default_image_height: int = 512
     default_steps: int = 25
     default_guidance_scale: float = 7.5
     max_concurrent_generations: int = 3
+    runware_pool_size: int = 2  # Runware websocket connections; requests go to the least busy one
+    runware_pool_health_interval: float = 15.0  # Seconds between pool health checks
+    runware_request_timeout: float = 300.0  # Seconds before an inference call is abandoned
+    runware_limit_initial: int = 4  # Starting adaptive concurrency limit for Runware calls
+    runware_limit_min: int = 1  # Floor of the adaptive concurrency limit
+    runware_limit_max: int = 32  # Ceiling of the adaptive concurrency limit
+    runware_latency_target: float = 45.0  # Calls slower than this (seconds) shrink the limit
+    runware_queue_timeout: float = 30.0  # Seconds a call may wait for a slot before being shed
+    runware_breaker_failures: int = 5  # Consecutive failures that open the circuit breaker
+    runware_breaker_reset: float = 30.0  # Seconds the circuit stays open before a probe call
+    runware_retry_attempts: int = 3  # Total attempts per inference, including the first
+    runware_retry_base_delay: float = 0.5  # Backoff cap (seconds) before the first retry, doubling after
+    runware_retry_max_delay: float = 10.0  # Largest backoff between attempts in seconds
+    runware_hedge_budget: float = 0.05  # Max duplicate requests as a fraction of all (0 disables hedging)
+    batch_max_size: int = 500  # Maximum generations one batch request may expand to
+    batch_ttl: int = 86400  # Seconds batch progress counters are kept in Redis
+
+    # Worker Settings
+    worker_enabled: bool = True  # Run a worker inside the API process
+    worker_poll_timeout: int = 5  # Seconds to block on an empty queue
+    worker_shutdown_timeout: float = 30.0  # Seconds to wait for in-flight generations
+    worker_backoff_base: float = 0.5  # Seconds to wait after the first failed dequeue, doubling per failure
+    worker_backoff_max: float = 30.0  # Longest wait between failed dequeues in seconds
+    progress_interval: float = 0.25  # Seconds progress updates are coalesced (latest wins) before publishing
+
+    # Queue Settings
+    queue_backend: str = "lists"  # "lists" for fair per-client scheduling, "streams" for Redis Streams consumer groups
+    queue_fair_quantum: float = 1.0  # Credit per client turn, in default-sized (512x512, default steps) generations
+    queue_aging_seconds: float = 60.0  # Serve a lower priority first after it waited this long (0 disables)
+    queue_client_weights: Dict[str, float] = {}  # Fair-share weight per client ID as JSON; others get 1
+    queue_visibility_timeout: float = 60.0  # Seconds a dequeued task stays leased without a worker heartbeat
+    queue_max_attempts: int = 3  # Deliveries before an abandoned task is dead-lettered
+    queue_reap_interval: float = 15.0  # Seconds between scans for expired leases
+    queue_retry_delay: float = 5.0  # Backoff before redelivering an abandoned task, doubling per attempt
+    queue_retry_max_delay: float = 300.0  # Largest redelivery backoff in seconds
+    queue_promote_batch: int = 100  # Due scheduled tasks moved into the queues per dequeue
+
+    # Rate Limiting
+    rate_limit_default: str = "60/minute,1000/hour"  # Per client and endpoint, for routes no policy matches
+    rate_limit_policies: Dict[str, str] = {  # "METHOD /path" (trailing * matches a prefix) -> limits or "exempt"
+        "* /health": "exempt",
+        "GET /": "exempt",
+        "GET /docs*": "exempt",
+        "GET /redoc*": "exempt",
+        "GET /openapi.json": "exempt",
+        "GET /api/history*": "300/minute,5000/hour",
+        "GET /api/generate/batch/*": "300/minute,5000/hour",
+        "GET /api/queue/*": "300/minute,5000/hour",
+    }
+
+    # Admission Control
+    admission_enabled: bool = True  # Charge generation requests against per-client cost budgets
+    admission_burst: float = 400.0  # Budget a client can spend at once, in default-sized (512x512) generations
+    admission_refill_per_minute: float = 100.0  # Budget a client regains per minute
+    admission_model_factors: Dict[str, float] = {}  # Cost multiplier per model ID as JSON; others cost 1x
 
     def __init__(self, **kwargs):
         """Initialize settings and create storage directory if needed."""
@@ -0,0 +1,180 @@
+"""Redis-backed rate limiting with an in-process fallback."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from redis.commands.core import AsyncScript
+
+from backend.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# GCRA over any number of windows in one round trip. Each key holds the
+# window's theoretical arrival time (TAT) in milliseconds: a request of
+# cost c pushes it forward by c emission intervals (period / limit) and is
+# allowed when the new TAT stays within one period of now. That is a token
+# bucket holding `limit` tokens refilled over `period`. A cost above the
+# limit is admitted once the bucket is full and charged in full: the TAT
+# moves that far ahead, so the key stays refused until the excess has
+# refilled, as if the request had been split into slices. Every window is checked before any is updated, so a
+# request refused by one window does not use up another. Keys expire once
+# their TAT has passed, and the server clock is used so API nodes agree.
+# KEYS: one per window; ARGV: cost, then (limit, period_ms) per window
+# Returns {1, 0, 0} if allowed, else {0, retry_after_ms, window number}
+_GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local tats = {}
+
+for i, key in ipairs(KEYS) do
+    local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local tat = math.max(tonumber(redis.call('GET', key) or 0), now)
+    local interval = period / limit
+    local ready_at = tat + interval * math.min(cost, limit) - period
+    if ready_at > now then
+        return {0, math.ceil(ready_at - now), i}
+    end
+    tats[i] = tat + interval * cost
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, tats[i], 'PX', math.max(1, math.ceil(tats[i] - now)))
+end
+return {1, 0, 0}
+"""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``capacity`` tokens per ``period``."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float, cost: float = 1.0) -> float:
+        """Refill and return the seconds until ``cost`` tokens are available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # A cost above the capacity needs a full bucket and leaves it in debt
+        needed = min(cost, self.capacity)
+        return 0.0 if self.tokens >= needed else (needed - self.tokens) / self.rate
+
+    def take(self, cost: float = 1.0):
+        """Spend tokens; call after wait_time returned 0."""
+        self.tokens -= cost
+
+
+class LocalRateLimiter:
+    """
+    In-process token buckets used while Redis is unreachable.
+
+    Limits are enforced per process rather than across the deployment,
+    and only the ``max_keys`` most recently seen keys are tracked.
+    """
+
+    def __init__(self, windows: List[Tuple[float, float]], max_keys: int = 10000):
+        """
+        Initialize local limiter.
+
+        Args:
+            windows: (limit, period in seconds) pairs
+            max_keys: Keys kept in memory
+        """
+        self.windows = windows
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[TokenBucket]]" = OrderedDict()
+
+    def hit(self, key: str, cost: float = 1.0) -> Tuple[bool, float, int]:
+        """
+        Charge a request against every window of a key.
+
+        Args:
+            key: Rate-limited key
+            cost: Tokens the request uses
+
+        Returns:
+            Tuple of (allowed, seconds until allowed, index of the window that refused)
+        """
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = [TokenBucket(limit, period) for limit, period in self.windows]
+            self._buckets[key] = buckets
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        now = time.monotonic()
+        for index, bucket in enumerate(buckets):
+            wait = bucket.wait_time(now, cost)
+            if wait > 0:
+                return False, wait, index
+        for bucket in buckets:
+            bucket.take(cost)
+        return True, 0.0, -1
+
+
+class RateLimiter:
+    """
+    Named windows checked atomically in Redis.
+
+    Each call is one script round trip. While Redis is unreachable,
+    requests are limited by in-process token buckets and Redis is
+    retried every ``REDIS_RETRY_SECONDS``.
+    """
+
+    REDIS_RETRY_SECONDS = 5.0
+
+    def __init__(self, prefix: str, windows: List[Tuple[str, float, float]], max_local_keys: int = 10000):
+        """
+        Initialize rate limiter.
+
+        Args:
+            prefix: Redis key prefix, keys are ``{prefix}:{window}:{key}``
+            windows: (name, limit, period in seconds) per window
+            max_local_keys: Keys the in-process fallback keeps in memory
+        """
+        self.prefix = prefix
+        self.windows = windows
+        self.local = LocalRateLimiter([(limit, period) for _, limit, period in windows], max_local_keys)
+        self._window_args = [value for _, limit, period in windows for value in (limit, int(period * 1000))]
+        self._script: Optional[AsyncScript] = None
+        self._redis_retry_at = 0.0
+
+    async def hit(self, key: str, cost: float = 1.0) -> Tuple[bool, float, Optional[str]]:
+        """
+        Charge a request against every window.
+
+        Args:
+            key: Rate-limited key, e.g. client and endpoint
+            cost: Units the request uses (1 for a plain request)
+
+        Returns:
+            Tuple of (allowed, seconds until allowed, name of the window that refused)
+        """
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                client = redis_client.client
+                if self._script is None:
+                    self._script = client.register_script(_GCRA_SCRIPT)
+                allowed, retry_after_ms, window = await self._script(
+                    keys=[f"{self.prefix}:{name}:{key}" for name, _, _ in self.windows],
+                    args=[cost, *self._window_args],
+                    client=client,
+                )
+                if allowed:
+                    return True, 0.0, None
+                return False, retry_after_ms / 1000, self.windows[window - 1][0]
+            except Exception as e:
+                logger.error(f"Rate limiting error, limiting in process for {self.REDIS_RETRY_SECONDS}s: {e}")
+                self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+        allowed, retry_after, index = self.local.hit(key, cost)
+        return allowed, retry_after, None if allowed else self.windows[index][0]
@@ -17,6 +17,8 @@ class RedisClient:
     _instance: Optional["RedisClient"] = None
     _pool: Optional[aioredis.ConnectionPool] = None
     _client: Optional[aioredis.Redis] = None
+    _binary_pool: Optional[aioredis.ConnectionPool] = None
+    _binary_client: Optional[aioredis.Redis] = None
     _lock = asyncio.Lock()
 
     def __new__(cls):
@@ -33,19 +35,32 @@ class RedisClient:
             if self._client is not None:
                 return
 
+            # Both pools together stay within the configured connection budget
+            binary_connections = max(1, settings.redis_max_connections // 2)
+            text_connections = max(1, settings.redis_max_connections - binary_connections)
+
             try:
                 self._pool = aioredis.ConnectionPool.from_url(
                     settings.redis_url,
-                    max_connections=settings.redis_max_connections,
+                    max_connections=text_connections,
                     decode_responses=True,
                 )
                 self._client = aioredis.Redis(connection_pool=self._pool)
 
+                # Codec-encoded values are bytes and must not be decoded as text
+                self._binary_pool = aioredis.ConnectionPool.from_url(
+                    settings.redis_url,
+                    max_connections=binary_connections,
+                    decode_responses=False,
+                )
+                self._binary_client = aioredis.Redis(connection_pool=self._binary_pool)
+
                 await self._client.ping()
                 logger.info("Redis connection established")
             except Exception as e:
                 logger.error(f"Failed to connect to Redis: {e}")
                 self._client = None
+                self._binary_client = None
                 raise
 
     async def close(self):
@@ -54,8 +69,14 @@ class RedisClient:
             await self._client.close()
         if self._pool:
             await self._pool.disconnect()
+        if self._binary_client:
+            await self._binary_client.close()
+        if self._binary_pool:
+            await self._binary_pool.disconnect()
         self._client = None
         self._pool = None
+        self._binary_client = None
+        self._binary_pool = None
         logger.info("Redis connection closed")
 
     @property
@@ -65,6 +86,13 @@ class RedisClient:
             raise RuntimeError("Redis client not initialized. Call initialize() first.")
         return self._client
 
+    @property
+    def binary_client(self) -> aioredis.Redis:
+        """Get Redis client returning raw bytes, for codec-encoded values."""
+        if self._binary_client is None:
+            raise RuntimeError("Redis client not initialized. Call initialize() first.")
+        return self._binary_client
+
     async def health_check(self) -> bool:
         """Check if Redis connection is healthy."""
         try:
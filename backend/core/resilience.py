@@ -0,0 +1,433 @@
+"""Load shedding, retry and hedging primitives for calls to external services."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(Exception):
+    """Raised when a call is shed instead of being queued."""
+
+
+class CircuitOpenError(OverloadedError):
+    """Raised when the circuit breaker rejects a call."""
+
+
+def _always_failure(error: BaseException) -> bool:
+    """Default predicate: every exception counts as a failure."""
+    return True
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit.
+
+    The limit grows by about one per limit's worth of fast, successful
+    calls and is multiplied by ``backoff`` when a call fails or exceeds
+    ``latency_target``. Callers that cannot get a slot within
+    ``queue_timeout`` are rejected with OverloadedError.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff: float = 0.5,
+        queue_timeout: float = 30.0,
+        is_failure: Callable[[BaseException], bool] = _always_failure,
+    ):
+        """
+        Initialize adaptive limiter.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest the limit may fall to
+            max_limit: Highest the limit may grow to
+            latency_target: Seconds above which a call counts as congestion
+            backoff: Multiplicative decrease factor
+            queue_timeout: Seconds a caller may wait for a slot
+            is_failure: Decides which exceptions signal overload
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+        self.is_failure = is_failure
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        self._last_decrease = 0.0
+        self._stats = {"accepted": 0, "rejected": 0, "decreases": 0}
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for the duration of one call.
+
+        Raises:
+            OverloadedError: If no slot frees up within queue_timeout
+        """
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.in_flight < int(self.limit)),
+                    timeout=self.queue_timeout,
+                )
+            except asyncio.TimeoutError:
+                self._stats["rejected"] += 1
+                raise OverloadedError(
+                    f"Concurrency limit {int(self.limit)} reached, request shed"
+                ) from None
+            self.in_flight += 1
+            self._stats["accepted"] += 1
+
+        start = time.monotonic()
+        congested = False
+        try:
+            yield
+        except Exception as e:
+            congested = self.is_failure(e)
+            raise
+        finally:
+            latency = time.monotonic() - start
+            self._on_complete(congested or latency > self.latency_target, latency)
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def _on_complete(self, congested: bool, latency: float):
+        """Adjust the limit after a call finished."""
+        if not congested:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return
+
+        # Calls started before the previous decrease still reflect the old
+        # load; decreasing again for each of them would collapse the limit.
+        now = time.monotonic()
+        if now - self._last_decrease < latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._stats["decreases"] += 1
+        logger.warning(f"Concurrency limit decreased to {int(self.limit)} (latency {latency:.1f}s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get limiter state.
+
+        Returns:
+            Dictionary with current limit, in-flight count and counters
+        """
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            **self._stats,
+        }
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately. After ``reset_timeout`` seconds up to
+    ``half_open_calls`` probes are let through; one success closes the
+    circuit, one failure opens it again. A probe that is shed
+    (OverloadedError) or cancelled never reached the service, so it only
+    frees its slot for the next probe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = _always_failure,
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before probing
+            half_open_calls: Concurrent probes allowed while half-open
+            is_failure: Decides which exceptions count as failures
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._stats = {"rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passed."""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            logger.info("Circuit breaker half-open, probing")
+        return self._state
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        Run one call through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or probes are exhausted
+        """
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probes >= self.half_open_calls):
+            self._stats["rejected"] += 1
+            raise CircuitOpenError("Circuit breaker is open, request rejected")
+
+        probing = state == self.HALF_OPEN
+        if probing:
+            self._probes += 1
+
+        try:
+            yield
+        except OverloadedError:
+            # Shed before reaching the service: says nothing about its health
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self._record_failure()
+            elif probing:
+                self._record_success()
+            raise
+        else:
+            self._record_success()
+        finally:
+            if probing:
+                self._probes -= 1
+
+    def _record_success(self):
+        """Close the circuit after a successful call."""
+        if self._state != self.CLOSED:
+            logger.info("Circuit breaker closed")
+        self._state = self.CLOSED
+        self._failures = 0
+
+    def _record_failure(self):
+        """Count a failure and open the circuit if needed."""
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self._stats["opened"] += 1
+                logger.warning(f"Circuit breaker opened after {self._failures} failures")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state.
+
+        Returns:
+            Dictionary with state, consecutive failures and counters
+        """
+        retry_in: Optional[float] = None
+        if self.state == self.OPEN:
+            retry_in = round(self.reset_timeout - (time.monotonic() - self._opened_at), 1)
+        return {
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "retry_in": retry_in,
+            **self._stats,
+        }
+
+
+@dataclass(frozen=True)
+class RetryRule:
+    """How to treat one class of errors."""
+
+    errors: Tuple[Type[BaseException], ...]
+    retry: bool
+    idempotent_only: bool = False
+    when: Optional[Callable[[BaseException], bool]] = None
+
+
+class RetryPolicy:
+    """
+    Retries calls with full-jitter exponential backoff.
+
+    Rules are checked in order and the first one matching the error
+    decides. Rules marked ``idempotent_only`` cover errors after which the
+    request may already have been processed; those are only retried for
+    idempotent calls. Errors matching no rule are not retried.
+    """
+
+    def __init__(
+        self,
+        rules: List[RetryRule],
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+    ):
+        """
+        Initialize retry policy.
+
+        Args:
+            rules: Ordered error rules
+            max_attempts: Total attempts including the first
+            base_delay: Backoff before the first retry in seconds
+            max_delay: Upper bound for a single backoff in seconds
+        """
+        self.rules = rules
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats = {"retries": 0, "exhausted": 0}
+
+    def should_retry(self, error: BaseException, idempotent: bool) -> bool:
+        """
+        Decide whether an error is worth another attempt.
+
+        Args:
+            error: Error raised by the attempt
+            idempotent: Whether repeating the call is safe
+
+        Returns:
+            True if the call should be retried
+        """
+        for rule in self.rules:
+            if isinstance(error, rule.errors) and (rule.when is None or rule.when(error)):
+                return rule.retry and (idempotent or not rule.idempotent_only)
+        return False
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the delay before a retry.
+
+        Args:
+            attempt: Number of attempts made so far (1 for the first retry)
+
+        Returns:
+            Delay in seconds, uniformly jittered below the exponential cap
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], idempotent: bool = False) -> Any:
+        """
+        Run fn, retrying according to the rules.
+
+        Args:
+            fn: Coroutine function making one attempt
+            idempotent: Whether repeating the call is safe
+
+        Returns:
+            Result of the first successful attempt
+        """
+        attempt = 1
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                if not self.should_retry(e, idempotent):
+                    raise
+                if attempt >= self.max_attempts:
+                    self._stats["exhausted"] += 1
+                    raise
+
+                delay = self.backoff(attempt)
+                self._stats["retries"] += 1
+                logger.warning(f"Attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get retry counters."""
+        return dict(self._stats)
+
+
+class Hedger:
+    """
+    Decides when to send a duplicate of a slow request.
+
+    A hedge is sent once a request has been running longer than the
+    observed ``percentile`` latency, as long as hedges stay within
+    ``budget`` (a fraction of all requests).
+    """
+
+    def __init__(
+        self,
+        budget: float,
+        percentile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize hedger.
+
+        Args:
+            budget: Maximum hedges as a fraction of requests (0 disables hedging)
+            percentile: Latency percentile after which to hedge
+            window: Number of recent latencies kept
+            min_samples: Samples needed before hedging starts
+        """
+        self.budget = budget
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._stats = {"requests": 0, "hedges": 0, "hedge_wins": 0}
+
+    def record(self, latency: float):
+        """Record the latency of a completed request."""
+        self._latencies.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """
+        Get how long to wait before hedging a new request.
+
+        Returns:
+            Seconds, or None if hedging is disabled or there is too little data
+        """
+        self._stats["requests"] += 1
+        if self.budget <= 0 or len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    def try_acquire(self) -> bool:
+        """
+        Spend hedge budget for one duplicate request.
+
+        Returns:
+            True if a hedge may be sent
+        """
+        if self._stats["hedges"] + 1 > self.budget * self._stats["requests"]:
+            return False
+        self._stats["hedges"] += 1
+        return True
+
+    def record_win(self):
+        """Count a hedge that finished before the original request."""
+        self._stats["hedge_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counters and the current hedge delay."""
+        ordered = sorted(self._latencies)
+        threshold = None
+        if len(ordered) >= self.min_samples:
+            threshold = round(ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))], 3)
+        return {"budget": self.budget, "threshold": threshold, **self._stats}
@@ -4,18 +4,22 @@ import logging
 from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from backend.core.config import settings
 from backend.core.redis_client import redis_client
-from backend.models.database import init_db
+from backend.models.database import close_db, init_db
 from backend.services.runware_service import runware_service
 from backend.services.cache_service import cache_service
 from backend.services.queue_service import queue_service
 from backend.services.pubsub_service import pubsub_service
-from backend.api.endpoints import generate
+from backend.services.worker_service import worker_service
+from backend.services.generation_writer import generation_writer
+from backend.services.progress_channel import progress_channel
+from backend.services.websocket_hub import websocket_hub
+from backend.api.endpoints import generate, websocket
 from backend.middleware.rate_limiter import RateLimiterMiddleware
 from pydantic import BaseModel
 
@@ -60,15 +64,29 @@ async def lifespan(app: FastAPI):
     logger.info("Connecting to Runware service...")
     await runware_service.initialize()
 
+    # Start batched generation status writer and progress channel
+    await generation_writer.start()
+    await progress_channel.start()
+
+    # Start in-process worker (disable when running `python -m backend.worker` separately)
+    if settings.worker_enabled:
+        logger.info("Starting generation worker...")
+        await worker_service.start()
+
     logger.info("Backend startup complete!")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Runware Generator Backend...")
+    await worker_service.stop()
+    await progress_channel.stop()
+    await generation_writer.stop()
+    await websocket_hub.cleanup()
     await pubsub_service.cleanup()
     await runware_service.close()
     await redis_client.close()
+    await close_db()
     logger.info("Backend shutdown complete")
 
 
@@ -92,133 +110,13 @@ app.add_middleware(
 # Add rate limiting middleware
 app.add_middleware(
     RateLimiterMiddleware,
-    requests_per_minute=60,
-    requests_per_hour=1000,
+    policies=settings.rate_limit_policies,
+    default=settings.rate_limit_default,
 )
 
 # Include routers
 app.include_router(generate.router)
-
-
-# WebSocket connection manager
-class ConnectionManager:
-    """Manages WebSocket connections for real-time updates."""
-
-    def __init__(self):
-        """Initialize connection manager."""
-        self.active_connections: dict[int, WebSocket] = {}
-
-    async def connect(self, websocket: WebSocket, generation_id: int):
-        """
-        Accept and store WebSocket connection.
-
-        Args:
-            websocket: WebSocket connection
-            generation_id: Generation ID to track
-        """
-        await websocket.accept()
-        self.active_connections[generation_id] = websocket
-        logger.info(f"WebSocket connected for generation {generation_id}")
-
-    def disconnect(self, generation_id: int):
-        """
-        Remove WebSocket connection.
-
-        Args:
-            generation_id: Generation ID
-        """
-        if generation_id in self.active_connections:
-            del self.active_connections[generation_id]
-            logger.info(f"WebSocket disconnected for generation {generation_id}")
-
-    async def send_progress(self, generation_id: int, progress: float, message: str):
-        """
-        Send progress update to client.
-
-        Args:
-            generation_id: Generation ID
-            progress: Progress percentage (0-100)
-            message: Status message
-        """
-        if generation_id in self.active_connections:
-            websocket = self.active_connections[generation_id]
-            try:
-                await websocket.send_json({
-                    "type": "progress",
-                    "generation_id": generation_id,
-                    "progress": progress,
-                    "message": message,
-                })
-            except Exception as e:
-                logger.error(f"Failed to send progress for generation {generation_id}: {e}")
-                self.disconnect(generation_id)
-
-    async def send_complete(self, generation_id: int, data: dict):
-        """
-        Send completion notification to client.
-
-        Args:
-            generation_id: Generation ID
-            data: Result data
-        """
-        if generation_id in self.active_connections:
-            websocket = self.active_connections[generation_id]
-            try:
-                await websocket.send_json({
-                    "type": "complete",
-                    "generation_id": generation_id,
-                    "data": data,
-                })
-            except Exception as e:
-                logger.error(f"Failed to send completion for generation {generation_id}: {e}")
-            finally:
-                self.disconnect(generation_id)
-
-    async def send_error(self, generation_id: int, error: str):
-        """
-        Send error notification to client.
-
-        Args:
-            generation_id: Generation ID
-            error: Error message
-        """
-        if generation_id in self.active_connections:
-            websocket = self.active_connections[generation_id]
-            try:
-                await websocket.send_json({
-                    "type": "error",
-                    "generation_id": generation_id,
-                    "message": error,
-                })
-            except Exception as e:
-                logger.error(f"Failed to send error for generation {generation_id}: {e}")
-            finally:
-                self.disconnect(generation_id)
-
-
-# Global manager instance for access from other modules
-manager = ConnectionManager()
-
-
-@app.websocket("/ws/generation/{generation_id}")
-async def websocket_endpoint(websocket: WebSocket, generation_id: int):
-    """
-    WebSocket endpoint for real-time generation progress updates.
-
-    Args:
-        websocket: WebSocket connection
-        generation_id: ID of generation to track
-    """
-    await manager.connect(websocket, generation_id)
-    try:
-        while True:
-            # Keep connection alive, waiting for client messages
-            data = await websocket.receive_text()
-            # Echo back for heartbeat
-            await websocket.send_json({"type": "heartbeat", "message": "pong"})
-    except WebSocketDisconnect:
-        manager.disconnect(generation_id)
-        logger.info(f"Client disconnected from generation {generation_id}")
+app.include_router(websocket.router)
 
 
 @app.get("/")
@@ -239,9 +137,13 @@ class UpdateApiKeyRequest(BaseModel):
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    runware_stats = runware_service.get_stats()
     return {
-        "status": "healthy",
+        "status": "degraded" if runware_stats["circuit_breaker"]["state"] == "open" else "healthy",
         "runware_connected": runware_service._initialized,
+        "runware": runware_stats,
+        "worker": worker_service.get_status(),
+        "websockets": websocket_hub.get_stats(),
     }
 
 @app.post("/settings/api-key")
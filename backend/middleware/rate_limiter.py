@@ -1,100 +1,166 @@
 """Rate limiting middleware using Redis."""
 
+import json
 import logging
-from typing import Callable
+import math
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from backend.core.redis_client import redis_client
+from backend.core.client_identity import client_identity
+from backend.core.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+EXEMPT = "exempt"
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware using Redis."""
+
+def parse_limits(spec: str) -> List[Tuple[str, float, float]]:
+    """
+    Parse a limit specification such as ``"60/minute,1000/hour"``.
+
+    Args:
+        spec: Comma-separated ``count/unit`` pairs (second, minute, hour, day)
+
+    Returns:
+        (window name, limit, period in seconds) per window
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    windows = []
+    for part in spec.split(","):
+        count, _, unit = part.strip().partition("/")
+        unit = unit.strip().rstrip("s")
+        if unit not in PERIODS or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid rate limit {part.strip()!r}, expected e.g. '60/minute'")
+        windows.append((unit, float(count), PERIODS[unit]))
+    return windows
+
+
+class RatePolicy:
+    """Limits applied to requests matching one rule of the policy table."""
+
+    def __init__(self, rule: str, spec: str):
+        """
+        Initialize policy.
+
+        Args:
+            rule: ``"METHOD /path"``; the method may be ``*`` and a trailing ``*`` matches any suffix
+            spec: Limits as accepted by parse_limits, or ``"exempt"``
+        """
+        method, _, pattern = rule.strip().partition(" ")
+        self.rule = rule
+        self.method = method.upper()
+        self.prefix = pattern.strip().endswith("*")
+        self.path = pattern.strip().rstrip("*")
+        self.exempt = spec.strip().lower() == EXEMPT
+        self.limiter = None if self.exempt else RateLimiter("rate_limit", parse_limits(spec))
+
+    def matches(self, method: str, path: str) -> bool:
+        """Whether the rule covers a request."""
+        if self.method not in ("*", method):
+            return False
+        return path.startswith(self.path) if self.prefix else path == self.path
+
+    @property
+    def specificity(self) -> Tuple[bool, int, bool]:
+        """Sort key: exact paths, then longer prefixes, then explicit methods win."""
+        return (not self.prefix, len(self.path), self.method != "*")
+
+
+class RateLimiterMiddleware:
+    """
+    Pure ASGI rate limiting middleware.
+
+    Every HTTP request is matched against a policy table of
+    ``"METHOD /path"`` rules; the most specific rule wins and requests no
+    rule covers get the default limits, counted per client and endpoint.
+    Requests under a named rule share one budget per client. Exempt rules
+    and WebSocket connections are passed straight through without
+    touching Redis. Limits are checked with one atomic script call,
+    falling back to in-process token buckets while Redis is unreachable.
+    """
+
+    RESOLVED_CACHE_SIZE = 4096
 
     def __init__(
         self,
-        app,
-        requests_per_minute: int = 60,
-        requests_per_hour: int = 1000,
+        app: ASGIApp,
+        policies: Optional[Dict[str, str]] = None,
+        default: str = "60/minute,1000/hour",
     ):
         """
         Initialize rate limiter.
 
         Args:
-            app: FastAPI application
-            requests_per_minute: Max requests per minute
-            requests_per_hour: Max requests per hour
+            app: ASGI application
+            policies: Limits per ``"METHOD /path"`` rule, or ``"exempt"``
+            default: Limits for requests no rule matches
         """
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.requests_per_hour = requests_per_hour
-
-    def _get_client_identifier(self, request: Request) -> str:
-        """Get client identifier for rate limiting."""
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-
-    def _get_endpoint_key(self, request: Request) -> str:
-        """Get endpoint key for rate limiting."""
-        return f"{request.method}:{request.url.path}"
-
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable,
-    ) -> Response:
+        self.app = app
+        self.policies = sorted(
+            (RatePolicy(rule, spec) for rule, spec in (policies or {}).items()),
+            key=lambda policy: policy.specificity,
+            reverse=True,
+        )
+        self.default = RatePolicy("* *", default)
+        self._resolved: Dict[Tuple[str, str], RatePolicy] = {}
+
+    def _resolve(self, method: str, path: str) -> RatePolicy:
+        """Find the policy for a request, caching the answer per method and path."""
+        key = (method, path)
+        policy = self._resolved.get(key)
+        if policy is None:
+            policy = next((p for p in self.policies if p.matches(method, path)), self.default)
+            if len(self._resolved) >= self.RESOLVED_CACHE_SIZE:
+                self._resolved.clear()
+            self._resolved[key] = policy
+        return policy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Process request with rate limiting.
 
         Args:
-            request: Incoming request
-            call_next: Next middleware/endpoint
-
-        Returns:
-            Response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        try:
-            if redis_client.client is None:
-                return await call_next(request)
-
-            client_id = self._get_client_identifier(request)
-            endpoint = self._get_endpoint_key(request)
-
-            minute_key = f"rate_limit:minute:{client_id}:{endpoint}"
-            hour_key = f"rate_limit:hour:{client_id}:{endpoint}"
-
-            client = redis_client.client
-
-            minute_count = await client.incr(minute_key)
-            if minute_count == 1:
-                await client.expire(minute_key, 60)
-
-            hour_count = await client.incr(hour_key)
-            if hour_count == 1:
-                await client.expire(hour_key, 3600)
-
-            if minute_count > self.requests_per_minute:
-                logger.warning(f"Rate limit exceeded (minute) for {client_id}")
-                return Response(
-                    content='{"error": "Rate limit exceeded: too many requests per minute"}',
-                    status_code=429,
-                    media_type="application/json",
-                )
-
-            if hour_count > self.requests_per_hour:
-                logger.warning(f"Rate limit exceeded (hour) for {client_id}")
-                return Response(
-                    content='{"error": "Rate limit exceeded: too many requests per hour"}',
-                    status_code=429,
-                    media_type="application/json",
-                )
-
-        except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
-
-        return await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        policy = self._resolve(method, path)
+        if policy.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        client_id = client_identity(scope)
+        key = f"{client_id}:{method}:{path}" if policy is self.default else f"{client_id}:{policy.rule}"
+        allowed, retry_after, window = await policy.limiter.hit(key)
+
+        if not allowed:
+            logger.warning(f"Rate limit exceeded ({window}) for {client_id} on {method} {path}")
+            await self._reject(send, window, retry_after)
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send: Send, window: str, retry_after: float):
+        """Send a 429 response."""
+        body = json.dumps({"error": f"Rate limit exceeded: too many requests per {window}"}).encode()
+        start: Message = {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import JSON, create_engine, Column, Integer, String, DateTime, Float, Boolean
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -62,6 +63,7 @@ class Generation(Base):
     # Output Information
     output_path = Column(String, nullable=False)
     output_url = Column(String, nullable=True)
+    output_hashes = Column(JSON, nullable=True)  # SHA-256 of every stored output (content-addressed)
 
     # Metadata
     width = Column(Integer, nullable=True)
@@ -88,6 +90,22 @@ class Generation(Base):
         return f"<Generation(id={self.id}, type={self.generation_type}, status={self.status})>"
 
 
+class StoredObject(Base):
+    """Model for content-addressed media files shared between generations."""
+
+    __tablename__ = "stored_objects"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False, index=True)  # Generations referencing this file
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        """String representation of StoredObject."""
+        return f"<StoredObject(sha256={self.sha256[:12]}, refs={self.ref_count})>"
+
+
 # Database engine and session
 engine = create_engine(
     settings.database_url,
@@ -98,6 +116,31 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _async_database_url(url: str) -> str:
+    """Map a database URL onto its asyncio driver (aiosqlite/asyncpg)."""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# Async engine and session used by request handlers and workers
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    echo=False,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
 def init_db():
     """Initialize database by creating all tables."""
     Base.metadata.create_all(bind=engine)
@@ -115,3 +158,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Async database session dependency for FastAPI.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def close_db():
+    """Dispose of the async engine connection pool."""
+    await async_engine.dispose()
@@ -0,0 +1,200 @@
+"""Async repository for generation records."""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+
+from backend.models.database import AsyncSessionLocal, Generation
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationRepository:
+    """Non-blocking CRUD operations on the generations table."""
+
+    async def create(self, **fields: Any) -> Generation:
+        """
+        Insert a new generation record.
+
+        Args:
+            **fields: Generation column values
+
+        Returns:
+            Persisted Generation with its ID populated
+        """
+        async with AsyncSessionLocal() as session:
+            generation = Generation(**fields)
+            session.add(generation)
+            await session.commit()
+            await session.refresh(generation)
+            return generation
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Generation]:
+        """
+        Insert several generation records in one transaction.
+
+        Args:
+            rows: Column values for each generation
+
+        Returns:
+            Persisted Generations with IDs populated, in input order
+        """
+        async with AsyncSessionLocal() as session:
+            generations = [Generation(**fields) for fields in rows]
+            session.add_all(generations)
+            await session.commit()
+            return generations
+
+    async def get(self, generation_id: int) -> Optional[Generation]:
+        """
+        Get a generation by ID.
+
+        Args:
+            generation_id: Generation ID
+
+        Returns:
+            Generation or None if not found
+        """
+        async with AsyncSessionLocal() as session:
+            return await session.get(Generation, generation_id)
+
+    async def update(self, generation_id: int, **fields: Any) -> Optional[Generation]:
+        """
+        Update columns of a generation.
+
+        Args:
+            generation_id: Generation ID
+            **fields: Column values to set
+
+        Returns:
+            Updated Generation or None if not found
+        """
+        async with AsyncSessionLocal() as session:
+            generation = await session.get(Generation, generation_id)
+            if generation is None:
+                return None
+
+            for name, value in fields.items():
+                setattr(generation, name, value)
+
+            await session.commit()
+            return generation
+
+    async def update_many(self, generation_ids: List[int], **fields: Any) -> int:
+        """
+        Set the same column values on several generations.
+
+        Args:
+            generation_ids: Generation IDs
+            **fields: Column values to set
+
+        Returns:
+            Number of rows updated
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Generation).where(Generation.id.in_(generation_ids)).values(**fields)
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def list_ids_by_status(self, statuses: List[str], created_before: datetime) -> List[int]:
+        """
+        Get IDs of generations in the given states created before a time.
+
+        Args:
+            statuses: Statuses to match
+            created_before: Only rows created earlier than this
+
+        Returns:
+            Matching generation IDs
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Generation.id).where(
+                    Generation.status.in_(statuses),
+                    Generation.created_at < created_before,
+                )
+            )
+            return list(result.scalars().all())
+
+    async def list_history(
+        self,
+        generation_type: Optional[str] = None,
+        status: Optional[str] = None,
+        favorite: Optional[bool] = None,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[int, List[Generation]]:
+        """
+        Query generation history with optional filters.
+
+        Args:
+            generation_type: Filter by generation type
+            status: Filter by status
+            favorite: Filter by favorite flag
+            search: Substring to search in prompts
+            limit: Maximum results
+            offset: Results offset for pagination
+
+        Returns:
+            Tuple of (total matching count, page of generations)
+        """
+        conditions = []
+
+        if generation_type:
+            conditions.append(Generation.generation_type == generation_type)
+
+        if status:
+            conditions.append(Generation.status == status)
+
+        if favorite is not None:
+            conditions.append(Generation.favorite == favorite)
+
+        if search:
+            search_term = f"%{search}%"
+            conditions.append(
+                or_(
+                    Generation.prompt.ilike(search_term),
+                    Generation.negative_prompt.ilike(search_term),
+                )
+            )
+
+        async with AsyncSessionLocal() as session:
+            count_query = select(func.count()).select_from(Generation).where(*conditions)
+            total = (await session.execute(count_query)).scalar_one()
+
+            page_query = (
+                select(Generation)
+                .where(*conditions)
+                .order_by(Generation.created_at.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+            generations = list((await session.execute(page_query)).scalars().all())
+
+        return total, generations
+
+    async def delete(self, generation_id: int) -> bool:
+        """
+        Delete a generation.
+
+        Args:
+            generation_id: Generation ID
+
+        Returns:
+            True if a record was deleted
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(Generation).where(Generation.id == generation_id)
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+
+# Global generation repository instance
+generation_repository = GenerationRepository()
@@ -0,0 +1,84 @@
+"""Cost-weighted admission control for API requests."""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from backend.core.config import settings
+from backend.core.rate_limit import RateLimiter
+from backend.services.queue_service import generation_work
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionService:
+    """
+    Per-client budgets for generation requests.
+
+    A generation is charged its estimated GPU work: pixels x steps x images
+    relative to a default 512x512 generation, times the model's cost
+    factor. Every client has a token bucket of ``burst`` units refilled at
+    ``refill_per_minute``, so a 2048x2048, 150-step, 4-image request uses
+    384 times the budget of a default one. A request costing more than the
+    whole burst, such as a large batch, is admitted against a full budget
+    and charged in full, so the client waits until the excess has
+    refilled before its next generation. Budgets
+    live in Redis and fall back to in-process buckets while Redis is
+    unreachable. Read-only requests are limited by the rate limiting
+    middleware's policy table instead.
+    """
+
+    def __init__(
+        self,
+        burst: float = settings.admission_burst,
+        refill_per_minute: float = settings.admission_refill_per_minute,
+        model_factors: Optional[Dict[str, float]] = None,
+        enabled: bool = settings.admission_enabled,
+    ):
+        """
+        Initialize admission service.
+
+        Args:
+            burst: Generation budget a client can spend at once, in default-sized generations
+            refill_per_minute: Generation budget a client regains per minute
+            model_factors: Cost multiplier per model ID (others cost 1x)
+            enabled: Admit everything when False
+        """
+        self.enabled = enabled
+        self.model_factors = settings.admission_model_factors if model_factors is None else model_factors
+        # A bucket of N tokens refilled at r per minute is one window of N per N / r minutes
+        self.generations = RateLimiter("admission", [("generate", burst, burst / refill_per_minute * 60)])
+
+    def generation_cost(self, params: Dict[str, Any]) -> float:
+        """
+        Estimate what a generation is charged.
+
+        Args:
+            params: Generation parameters (width, height, steps, num_images, model)
+
+        Returns:
+            Cost in units of one default-sized generation
+        """
+        return round(generation_work(params) * self.model_factors.get(params.get("model") or "", 1.0), 4)
+
+    async def admit_generation(self, client_id: str, cost: float) -> Tuple[bool, float]:
+        """
+        Charge generation work to a client's budget.
+
+        Args:
+            client_id: Client identifier
+            cost: Cost from generation_cost, summed over a batch
+
+        Returns:
+            Tuple of (admitted, seconds until enough budget has refilled)
+        """
+        if not self.enabled:
+            return True, 0.0
+
+        allowed, retry_after, _ = await self.generations.hit(client_id, cost)
+        if not allowed:
+            logger.warning(f"Generation costing {cost:g} refused for {client_id}, retry in {retry_after:.1f}s")
+        return allowed, retry_after
+
+
+# Global admission service instance
+admission_service = AdmissionService()
@@ -0,0 +1,152 @@
+"""Aggregate progress tracking for batch generations."""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from backend.core.codec import codec
+from backend.core.config import settings
+from backend.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Count each generation once, however often it is reported
+# KEYS: counters hash, finished set; ARGV: generation_id, counter field, ttl
+# Returns {1 if counted now else 0, counters as a flat HGETALL list}
+_RECORD_SCRIPT = """
+local counted = redis.call('SADD', KEYS[2], ARGV[1])
+if counted == 1 then
+    redis.call('HINCRBY', KEYS[1], ARGV[2], 1)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return {counted, redis.call('HGETALL', KEYS[1])}
+"""
+
+
+class BatchService:
+    """
+    Counts finished items per batch and publishes aggregate progress.
+
+    Tasks are delivered at least once, so the same generation may be
+    reported more than once; only its first report is counted.
+    """
+
+    KEY_PREFIX = "batch"
+    CHANNEL_PREFIX = "batch:progress"
+
+    def __init__(self, ttl: int = settings.batch_ttl):
+        """
+        Initialize batch service.
+
+        Args:
+            ttl: Seconds batch counters are kept after the last update
+        """
+        self.ttl = ttl
+
+    def _key(self, batch_id: str) -> str:
+        """Redis hash holding a batch's counters."""
+        return f"{self.KEY_PREFIX}:{batch_id}"
+
+    def channel(self, batch_id: str) -> str:
+        """Pub/Sub channel carrying a batch's aggregate progress."""
+        return f"{self.CHANNEL_PREFIX}:{batch_id}"
+
+    async def create(self, batch_id: str, total: int) -> bool:
+        """
+        Register a new batch.
+
+        Args:
+            batch_id: Batch ID
+            total: Number of generations in the batch
+
+        Returns:
+            True if registered successfully
+        """
+        try:
+            client = redis_client.client
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.hset(self._key(batch_id), mapping={
+                    "total": total,
+                    "completed": 0,
+                    "failed": 0,
+                    "created_at": datetime.utcnow().isoformat(),
+                })
+                pipe.expire(self._key(batch_id), self.ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Batch create error: {e}")
+            return False
+
+    async def record(self, batch_id: str, generation_id: int, succeeded: bool) -> Optional[Dict[str, Any]]:
+        """
+        Count a finished batch item and publish the new aggregate.
+
+        Repeated reports for the same generation are ignored.
+
+        Args:
+            batch_id: Batch ID
+            generation_id: Generation that finished
+            succeeded: Whether the item completed successfully
+
+        Returns:
+            Updated batch status, or None on error
+        """
+        try:
+            counted, flat = await redis_client.client.eval(
+                _RECORD_SCRIPT, 2, self._key(batch_id), f"{self._key(batch_id)}:finished",
+                generation_id, "completed" if succeeded else "failed", self.ttl,
+            )
+            batch = self._to_status(batch_id, dict(zip(flat[::2], flat[1::2], strict=True)))
+            if not counted:
+                logger.info(f"Generation {generation_id} already counted for batch {batch_id}")
+                return batch
+
+            event_type = "complete" if batch["finished"] >= batch["total"] else "progress"
+            await redis_client.binary_client.publish(
+                self.channel(batch_id),
+                codec.encode({"type": event_type, **batch, "timestamp": datetime.utcnow().isoformat()}),
+            )
+            return batch
+        except Exception as e:
+            logger.error(f"Batch record error: {e}")
+            return None
+
+    async def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a batch's aggregate status.
+
+        Args:
+            batch_id: Batch ID
+
+        Returns:
+            Batch status, or None if unknown or expired
+        """
+        try:
+            counters = await redis_client.client.hgetall(self._key(batch_id))
+            if not counters:
+                return None
+            return self._to_status(batch_id, counters)
+        except Exception as e:
+            logger.error(f"Batch get error: {e}")
+            return None
+
+    def _to_status(self, batch_id: str, counters: Dict[str, str]) -> Dict[str, Any]:
+        """Build the status payload from raw hash counters."""
+        total = int(counters.get("total", 0))
+        completed = int(counters.get("completed", 0))
+        failed = int(counters.get("failed", 0))
+        finished = completed + failed
+        return {
+            "batch_id": batch_id,
+            "total": total,
+            "completed": completed,
+            "failed": failed,
+            "finished": finished,
+            "progress": round(finished / total * 100, 1) if total else 100.0,
+        }
+
+
+# Global batch service instance
+batch_service = BatchService()
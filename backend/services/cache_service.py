@@ -3,19 +3,114 @@
 import hashlib
 import json
 import logging
-from typing import Any, Dict, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
+from backend.core.codec import codec
 from backend.core.config import settings
 from backend.core.redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
 
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL and size-based eviction."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.cache_local_max_entries,
+        max_bytes: int = settings.cache_local_max_bytes,
+        ttl: float = settings.cache_local_ttl,
+    ):
+        """
+        Initialize local cache.
+
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total encoded size of entries
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value and mark it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None):
+        """
+        Store a value, evicting least recently used entries to stay in bounds.
+
+        Args:
+            key: Cache key
+            value: Value to store (shared with callers, do not mutate)
+            size: Encoded size of the value in bytes
+            ttl: Optional TTL override in seconds
+        """
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        expires_at = time.monotonic() + min(ttl or self.ttl, self.ttl)
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove a key."""
+        return self._remove(key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove all keys starting with prefix."""
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current size."""
+        return {"entries": len(self._entries), "bytes": self._bytes, **self.stats}
+
+    def _remove(self, key: str) -> bool:
+        """Drop an entry and account for its size."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        return True
+
+
 class CacheService:
     """Service for caching generation results."""
 
+    KEY_PREFIX = "cache:generation"
+
     def __init__(self):
         self._initialized = False
+        self.local = LocalCache()
+        self._redis_stats = {"hits": 0, "misses": 0, "errors": 0}
 
     async def initialize(self):
         """Initialize cache service."""
@@ -23,6 +118,62 @@ class CacheService:
             await redis_client.initialize()
             self._initialized = True
 
+    @staticmethod
+    def _normalize_text(text: Optional[str]) -> Optional[str]:
+        """Collapse whitespace so cosmetic prompt differences share a key."""
+        if text is None:
+            return None
+        normalized = " ".join(text.split())
+        return normalized or None
+
+    def _canonical_params(self, generation_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in the defaults the Runware request would use."""
+        canonical: Dict[str, Any] = {
+            "model": params.get("model") or settings.default_model,
+            "steps": params.get("steps") or settings.default_steps,
+            "guidance_scale": float(params.get("guidance_scale") or settings.default_guidance_scale),
+            "negative_prompt": self._normalize_text(params.get("negative_prompt")),
+            "seed": params.get("seed"),
+        }
+
+        if generation_type == "image-to-image":
+            # Key on the source content when known so paths and URLs of the same image match
+            canonical["source"] = params.get("source_sha256") or params.get("image_url")
+            canonical["strength"] = float(params.get("strength", 0.75))
+        else:
+            canonical["width"] = params.get("width") or settings.default_image_width
+            canonical["height"] = params.get("height") or settings.default_image_height
+            canonical["num_images"] = params.get("num_images") or 1
+
+        return canonical
+
+    def build_generation_key(
+        self,
+        generation_type: str,
+        prompt: str,
+        params: Dict[str, Any],
+    ) -> Optional[str]:
+        """
+        Build the canonical cache key for a generation request.
+
+        Shared by lookups, stores and in-flight coalescing so they always
+        agree. Requests without a fixed seed produce a different image every
+        time and are not cacheable.
+
+        Args:
+            generation_type: Type of generation
+            prompt: Text prompt
+            params: Request parameters (missing values take defaults)
+
+        Returns:
+            Cache key, or None if the request is not cacheable
+        """
+        if params.get("seed") is None:
+            return None
+
+        canonical = self._canonical_params(generation_type, params)
+        return self._generate_cache_key(generation_type, self._normalize_text(prompt) or "", canonical)
+
     def _generate_cache_key(
         self,
         generation_type: str,
@@ -33,20 +184,29 @@ class CacheService:
         param_str = json.dumps(params, sort_keys=True)
         key_data = f"{generation_type}:{prompt}:{param_str}"
         hash_value = hashlib.md5(key_data.encode()).hexdigest()
-        return f"cache:generation:{generation_type}:{hash_value}"
+        return f"{self.KEY_PREFIX}:{generation_type}:{hash_value}"
+
+    async def get(self, cache_key: str) -> Optional[Any]:
+        """Get cached generation result, checking the local tier first."""
+        result = self.local.get(cache_key)
+        if result is not None:
+            logger.debug(f"Local cache hit for key: {cache_key}")
+            return result
 
-    async def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached generation result."""
         try:
-            client = redis_client.client
+            client = redis_client.binary_client
             cached_data = await client.get(cache_key)
             if cached_data:
-                result = json.loads(cached_data)
+                result = codec.decode(cached_data)
+                self._redis_stats["hits"] += 1
+                self.local.set(cache_key, result, len(cached_data))
                 logger.info(f"Cache hit for key: {cache_key}")
                 return result
+            self._redis_stats["misses"] += 1
             logger.debug(f"Cache miss for key: {cache_key}")
             return None
         except Exception as e:
+            self._redis_stats["errors"] += 1
             logger.error(f"Cache get error: {e}")
             return None
 
@@ -55,26 +215,31 @@ class CacheService:
         generation_type: str,
         prompt: str,
         params: Dict[str, Any],
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Any]:
         """Get cached generation by parameters."""
-        cache_key = self._generate_cache_key(generation_type, prompt, params)
+        cache_key = self.build_generation_key(generation_type, prompt, params)
+        if cache_key is None:
+            return None
         return await self.get(cache_key)
 
     async def set(
         self,
         cache_key: str,
-        value: Dict[str, Any],
+        value: Any,
         ttl: Optional[int] = None,
     ) -> bool:
-        """Cache generation result."""
+        """Cache generation result in both tiers."""
+        cached_data = codec.encode(value)
+        expiry = ttl or settings.cache_ttl
+        self.local.set(cache_key, value, len(cached_data), expiry)
+
         try:
-            client = redis_client.client
-            cached_data = json.dumps(value)
-            expiry = ttl or settings.cache_ttl
+            client = redis_client.binary_client
             await client.setex(cache_key, expiry, cached_data)
             logger.info(f"Cached result with TTL {expiry}s: {cache_key}")
             return True
         except Exception as e:
+            self._redis_stats["errors"] += 1
             logger.error(f"Cache set error: {e}")
             return False
 
@@ -83,15 +248,27 @@ class CacheService:
         generation_type: str,
         prompt: str,
         params: Dict[str, Any],
-        value: Dict[str, Any],
+        value: Any,
         ttl: Optional[int] = None,
     ) -> bool:
         """Cache generation result by parameters."""
-        cache_key = self._generate_cache_key(generation_type, prompt, params)
+        cache_key = self.build_generation_key(generation_type, prompt, params)
+        if cache_key is None:
+            return False
         return await self.set(cache_key, value, ttl)
 
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get hit/miss counters per cache tier.
+
+        Returns:
+            Dictionary with "local" and "redis" tier statistics
+        """
+        return {"local": self.local.get_stats(), "redis": dict(self._redis_stats)}
+
     async def delete(self, cache_key: str) -> bool:
         """Delete cached result."""
+        self.local.delete(cache_key)
         try:
             client = redis_client.client
             result = await client.delete(cache_key)
@@ -103,9 +280,10 @@ class CacheService:
 
     async def delete_by_type(self, generation_type: str) -> int:
         """Delete all cache entries for a generation type."""
+        self.local.delete_prefix(f"{self.KEY_PREFIX}:{generation_type}:")
         try:
             client = redis_client.client
-            pattern = f"cache:generation:{generation_type}:*"
+            pattern = f"{self.KEY_PREFIX}:{generation_type}:*"
             keys = []
             async for key in client.scan_iter(match=pattern):
                 keys.append(key)
@@ -119,9 +297,10 @@ class CacheService:
 
     async def clear_all(self) -> int:
         """Clear all generation cache entries."""
+        self.local.delete_prefix(f"{self.KEY_PREFIX}:")
         try:
             client = redis_client.client
-            pattern = "cache:generation:*"
+            pattern = f"{self.KEY_PREFIX}:*"
             keys = []
             async for key in client.scan_iter(match=pattern):
                 keys.append(key)
@@ -151,9 +330,9 @@ class CacheService:
             True if published successfully
         """
         try:
-            client = redis_client.client
+            client = redis_client.binary_client
             channel = f"generation:progress:{generation_id}"
-            payload = json.dumps({
+            payload = codec.encode({
                 "type": "progress",
                 "generation_id": generation_id,
                 "progress": progress,
@@ -182,9 +361,9 @@ class CacheService:
             True if published successfully
         """
         try:
-            client = redis_client.client
+            client = redis_client.binary_client
             channel = f"generation:progress:{generation_id}"
-            payload = json.dumps({
+            payload = codec.encode({
                 "type": "complete",
                 "generation_id": generation_id,
                 "data": data,
@@ -212,9 +391,9 @@ class CacheService:
             True if published successfully
         """
         try:
-            client = redis_client.client
+            client = redis_client.binary_client
             channel = f"generation:progress:{generation_id}"
-            payload = json.dumps({
+            payload = codec.encode({
                 "type": "error",
                 "generation_id": generation_id,
                 "message": error,
@@ -227,5 +406,28 @@ class CacheService:
             return False
 
 
+    async def publish_events(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Publish progress events for any generations in one round trip.
+
+        Events are published in order, each on the channel of its
+        ``generation_id``.
+
+        Args:
+            events: Progress, complete or error messages
+
+        Returns:
+            True if published successfully
+        """
+        try:
+            async with redis_client.binary_client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.publish(f"generation:progress:{event['generation_id']}", codec.encode(event))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Pub/Sub publish of {len(events)} events error: {e}")
+            return False
+
 # Global cache service instance
 cache_service = CacheService()
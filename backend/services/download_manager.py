@@ -0,0 +1,123 @@
+"""Shared HTTP download manager for generated media."""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+import aiohttp
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DownloadedFile:
+    """Result of a completed download."""
+
+    path: Path
+    size: int
+    sha256: str
+
+
+class DownloadManager:
+    """Long-lived aiohttp session with a pooled, keep-alive connector."""
+
+    def __init__(
+        self,
+        max_connections: int = settings.download_max_connections,
+        max_concurrent: int = settings.download_concurrency,
+        timeout: float = settings.download_timeout,
+        chunk_size: int = settings.download_chunk_size,
+    ):
+        """
+        Initialize download manager.
+
+        Args:
+            max_connections: Connection pool size
+            max_concurrent: Maximum downloads in flight at once
+            timeout: Total timeout per download in seconds
+            chunk_size: Bytes read from the socket and written per chunk
+        """
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use."""
+        if self._session is not None and not self._session.closed:
+            return self._session
+
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=30,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                )
+                logger.info(f"Download session created (pool size {self.max_connections})")
+            return self._session
+
+    async def download(self, url: str, output_path: Path) -> DownloadedFile:
+        """
+        Stream a URL to a local file.
+
+        The body is written chunk by chunk to a temporary file in the
+        destination directory (file I/O runs in a thread) and atomically
+        renamed into place, so readers never see partial files and memory
+        stays bounded by the chunk size.
+
+        Args:
+            url: URL to download
+            output_path: Destination file path
+
+        Returns:
+            DownloadedFile with path, size and SHA-256 of the content
+        """
+        session = await self._get_session()
+        temp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+
+        async with self._semaphore:
+            try:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        raise Exception(f"Failed to download image: HTTP {response.status}")
+
+                    async with aiofiles.open(temp_path, "wb") as f:
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            digest.update(chunk)
+                            size += len(chunk)
+                            await f.write(chunk)
+
+                await aiofiles.os.replace(temp_path, output_path)
+            except BaseException:
+                try:
+                    await aiofiles.os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+
+        logger.info(f"Image saved to {output_path} ({size} bytes)")
+        return DownloadedFile(path=output_path, size=size, sha256=digest.hexdigest())
+
+    async def close(self):
+        """Close the shared session and its connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("Download session closed")
@@ -0,0 +1,224 @@
+"""Write-behind buffer for generation status updates."""
+
+import asyncio
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+
+from sqlalchemy import bindparam, update
+
+from backend.core.config import settings
+from backend.models.database import AsyncSessionLocal, Generation
+
+logger = logging.getLogger(__name__)
+
+# Statuses that end a generation; they trigger an immediate flush
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+
+class GenerationStateWriter:
+    """
+    Coalesces generation updates from concurrent jobs into periodic bulk UPDATEs.
+
+    A failed batch is retried with later flushes. Rows whose updates have
+    been in ``max_retries`` failed batches are then written one at a time,
+    so a single bad row cannot hold back the others; rows that fail on
+    their own as well are logged and dropped.
+    """
+
+    def __init__(self, flush_interval: float = settings.db_flush_interval, max_retries: int = 3):
+        """
+        Initialize state writer.
+
+        Args:
+            flush_interval: Maximum seconds an update stays buffered
+            max_retries: Failed batches a row may be part of before it is written alone
+        """
+        self.flush_interval = flush_interval
+        self.max_retries = max(1, max_retries)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        # Rows taken out of _pending by the flush in progress
+        self._flushing: Set[int] = set()
+        self._attempts: Dict[int, int] = {}
+        self._waiters: Dict[int, List[asyncio.Future]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._runner: Optional[asyncio.Task] = None
+        self._stats = {"updates": 0, "flushes": 0, "rows": 0, "errors": 0, "dropped": 0}
+
+    async def start(self):
+        """Start the background flush loop."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            logger.info(f"Generation state writer started (flush interval {self.flush_interval}s)")
+
+    async def stop(self):
+        """Stop the flush loop and write out everything still buffered."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+        await self.flush()
+        logger.info("Generation state writer stopped")
+
+    def update(self, generation_id: int, **fields: Any):
+        """
+        Buffer column updates for a generation.
+
+        Later values for the same column replace earlier ones. Terminal
+        statuses wake the flusher so results become visible promptly.
+
+        Args:
+            generation_id: Generation ID
+            **fields: Column values to set
+        """
+        self._pending.setdefault(generation_id, {}).update(fields)
+        self._stats["updates"] += 1
+
+        if fields.get("status") in TERMINAL_STATUSES:
+            self._wakeup.set()
+
+    async def commit(self, generation_id: int, **fields: Any) -> bool:
+        """
+        Buffer column updates and wait until they are durably written.
+
+        Without fields, waits for whatever is buffered for the generation,
+        including updates a concurrent flush is still writing.
+
+        Args:
+            generation_id: Generation ID
+            **fields: Column values to set
+
+        Returns:
+            True once written, False if the update was dropped after repeated failures
+        """
+        if fields:
+            self.update(generation_id, **fields)
+        if generation_id not in self._pending and generation_id not in self._flushing:
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(generation_id, []).append(future)
+        while not future.done():
+            await self.flush()
+            if not future.done():
+                # Failed batch: retry on the next interval, or sooner if the runner flushes
+                await asyncio.wait({future}, timeout=self.flush_interval)
+        return future.result()
+
+    async def flush(self) -> int:
+        """
+        Write all buffered updates in one transaction.
+
+        Returns:
+            Number of generation rows written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            self._flushing = set(batch)
+            try:
+                await self._write(batch)
+            except asyncio.CancelledError:
+                # Interrupted mid-write: keep the rows for the next flush
+                for generation_id, fields in batch.items():
+                    self._pending[generation_id] = {**fields, **self._pending.get(generation_id, {})}
+                raise
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} generation updates: {e}")
+                self._stats["errors"] += 1
+                return await self._retry(batch)
+            finally:
+                self._flushing = set()
+
+            self._stats["flushes"] += 1
+            self._stats["rows"] += len(batch)
+            for generation_id in batch:
+                self._resolve(generation_id, True)
+            logger.debug(f"Flushed {len(batch)} generation updates")
+            return len(batch)
+
+    async def _write(self, batch: Dict[int, Dict[str, Any]]):
+        """Write rows in one transaction, one executemany UPDATE per column set."""
+        # Group rows by the set of columns they touch so each group is
+        # a single executemany UPDATE statement.
+        groups: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+        for generation_id, fields in batch.items():
+            groups.setdefault(frozenset(fields), []).append({"_id": generation_id, **fields})
+
+        table = Generation.__table__
+        async with AsyncSessionLocal() as session:
+            for columns, rows in groups.items():
+                statement = (
+                    update(table)
+                    .where(table.c.id == bindparam("_id"))
+                    .values({column: bindparam(column) for column in columns})
+                )
+                await session.execute(statement, rows)
+            await session.commit()
+
+    async def _retry(self, batch: Dict[int, Dict[str, Any]]) -> int:
+        """
+        Handle a failed batch: re-buffer rows with retries left, write the rest alone.
+
+        Returns:
+            Number of rows written one at a time
+        """
+        written = 0
+        for generation_id, fields in batch.items():
+            attempts = self._attempts.get(generation_id, 0) + 1
+            if attempts < self.max_retries:
+                self._attempts[generation_id] = attempts
+                # Re-buffer, letting updates that arrived meanwhile win
+                self._pending[generation_id] = {**fields, **self._pending.get(generation_id, {})}
+                continue
+
+            try:
+                await self._write({generation_id: fields})
+            except Exception as e:
+                logger.error(f"Dropping update for generation {generation_id} after {attempts} failures: {e}")
+                self._stats["dropped"] += 1
+                self._resolve(generation_id, False)
+                continue
+            self._stats["rows"] += 1
+            self._resolve(generation_id, True)
+            written += 1
+        return written
+
+    def _resolve(self, generation_id: int, written: bool):
+        """Settle a row's retry count and wake callers waiting for it."""
+        if generation_id in self._pending:
+            # Newer updates arrived meanwhile: waiters keep waiting for those
+            return
+        self._attempts.pop(generation_id, None)
+        for future in self._waiters.pop(generation_id, []):
+            if not future.done():
+                future.set_result(written)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get writer statistics.
+
+        Returns:
+            Dictionary with buffered, update, flush, row, error and dropped counts
+        """
+        return {"buffered": len(self._pending), **self._stats}
+
+    async def _run(self):
+        """Flush on every interval or as soon as a terminal status arrives."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+# Global generation state writer instance
+generation_writer = GenerationStateWriter()
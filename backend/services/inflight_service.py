@@ -0,0 +1,266 @@
+"""Single-flight registry that coalesces identical in-flight generations."""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.core.codec import codec
+from backend.core.config import settings
+from backend.core.redis_client import redis_client
+from backend.services.pubsub_service import PubSubService, pubsub_service
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[float, str], None]
+
+# Delete the lock only if this node still owns it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class _Flight:
+    """A running generation and everyone waiting for it on this node."""
+
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.listeners: List[ProgressCallback] = []
+        self.followers = 0
+
+    def progress(self, progress: float, message: str):
+        """Fan a progress update out to every attached listener."""
+        for listener in list(self.listeners):
+            try:
+                listener(progress, message)
+            except Exception as e:
+                logger.error(f"Progress listener error: {e}")
+
+
+class InflightService:
+    """
+    Ensures identical requests trigger a single Runware call.
+
+    Within a process, duplicates attach to the leader's future and progress
+    stream. Across nodes, a Redis lock elects one leader per key and the
+    result (plus progress) is broadcast on a per-key channel. Remote
+    followers receive it through the process's shared Pub/Sub subscriber,
+    so waiting costs no Redis connection of its own.
+    """
+
+    LOCK_PREFIX = "inflight:lock"
+    CHANNEL_PREFIX = "inflight:events"
+
+    def __init__(
+        self,
+        lock_ttl: int = settings.inflight_lock_ttl,
+        wait_timeout: float = settings.inflight_wait_timeout,
+        pubsub: PubSubService = pubsub_service,
+    ):
+        """
+        Initialize in-flight registry.
+
+        Args:
+            lock_ttl: Seconds a node may hold the leader lock for a key
+            wait_timeout: Seconds a follower waits for another node's result
+            pubsub: Subscriber delivering other nodes' events
+        """
+        self.pubsub = pubsub
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.node_id = uuid.uuid4().hex
+        self._flights: Dict[str, _Flight] = {}
+        self._stats = {"leaders": 0, "local_followers": 0, "remote_followers": 0}
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with in-flight key count and leader/follower counters
+        """
+        return {"in_flight": len(self._flights), **self._stats}
+
+    async def run(
+        self,
+        key: str,
+        factory: Callable[[ProgressCallback], Awaitable[Any]],
+        progress_callback: Optional[ProgressCallback] = None,
+        lookup: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Run factory once per key, sharing its result with concurrent callers.
+
+        Args:
+            key: Canonical request key
+            factory: Coroutine function doing the work; receives a progress callback
+            progress_callback: Caller's progress callback
+            lookup: Optional cache lookup used when a remote leader already finished
+
+        Returns:
+            The factory result (possibly produced by another caller or node)
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._stats["local_followers"] += 1
+            flight.followers += 1
+            if progress_callback:
+                flight.listeners.append(progress_callback)
+            logger.info(f"Attached to in-flight generation {key}")
+            return await asyncio.shield(flight.future)
+
+        flight = _Flight()
+        if progress_callback:
+            flight.listeners.append(progress_callback)
+        self._flights[key] = flight
+
+        try:
+            result = await self._run_leader_or_follow(key, factory, flight, lookup)
+            flight.future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except Exception as e:
+            flight.future.set_exception(e)
+            if not flight.followers:
+                # Nobody else awaits it; avoid "exception never retrieved" noise
+                flight.future.exception()
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+    async def _run_leader_or_follow(
+        self,
+        key: str,
+        factory: Callable[[ProgressCallback], Awaitable[Any]],
+        flight: _Flight,
+        lookup: Optional[Callable[[], Awaitable[Any]]],
+    ) -> Any:
+        """Elect a cluster-wide leader for key, or wait for the current one."""
+        lock_key = f"{self.LOCK_PREFIX}:{key}"
+        channel = f"{self.CHANNEL_PREFIX}:{key}"
+
+        try:
+            client = redis_client.client
+            acquired = await client.set(lock_key, self.node_id, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            logger.warning(f"In-flight lock unavailable, running locally: {e}")
+            self._stats["leaders"] += 1
+            return await factory(flight.progress)
+
+        if not acquired:
+            result = await self._follow_remote(client, lock_key, channel, flight, lookup)
+            if result is not None:
+                self._stats["remote_followers"] += 1
+                return result
+            # Leader vanished without a usable result; do the work ourselves
+            acquired = await client.set(lock_key, self.node_id, nx=True, ex=self.lock_ttl)
+
+        self._stats["leaders"] += 1
+
+        # One tracked publisher per flight keeps remote events in order
+        events: asyncio.Queue = asyncio.Queue()
+        publisher = asyncio.create_task(self._publish_events(channel, events)) if acquired else None
+
+        def progress(value: float, message: str):
+            flight.progress(value, message)
+            if publisher is not None:
+                events.put_nowait({"type": "progress", "progress": value, "message": message})
+
+        try:
+            result = await factory(progress)
+        except Exception as e:
+            if publisher is not None:
+                events.put_nowait({"type": "error", "message": str(e)})
+            raise
+        else:
+            if publisher is not None:
+                events.put_nowait({"type": "complete", "result": result})
+        finally:
+            if publisher is not None:
+                events.put_nowait(None)
+                try:
+                    await publisher
+                finally:
+                    publisher.cancel()
+                    await self._release(lock_key)
+
+        return result
+
+    async def _publish_events(self, channel: str, events: asyncio.Queue):
+        """
+        Publish a flight's events in order until the None sentinel.
+
+        Progress that has already been superseded by a queued event is skipped.
+        """
+        while True:
+            event = await events.get()
+            if event is None:
+                return
+            if event["type"] == "progress" and not events.empty():
+                continue
+            await self._publish(channel, event)
+
+    async def _follow_remote(
+        self,
+        client,
+        lock_key: str,
+        channel: str,
+        flight: _Flight,
+        lookup: Optional[Callable[[], Awaitable[Any]]],
+    ) -> Any:
+        """
+        Wait for another node's result on the key's channel.
+
+        Returns:
+            The remote result, or None if the leader is gone or timed out
+        """
+        events = await self.pubsub.watch(channel)
+        try:
+            # The leader may have finished before we subscribed
+            if not await client.exists(lock_key):
+                return await lookup() if lookup else None
+
+            logger.info(f"Waiting for generation {lock_key} on another node")
+            return await asyncio.wait_for(
+                self._await_remote_result(events, flight),
+                timeout=self.wait_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for remote generation {lock_key}")
+            return None
+        finally:
+            await self.pubsub.unwatch(channel, events)
+
+    async def _await_remote_result(self, events: asyncio.Queue, flight: _Flight) -> Any:
+        """Relay remote progress until a terminal event arrives."""
+        while True:
+            event = await events.get()
+            if event["type"] == "progress":
+                flight.progress(event["progress"], event["message"])
+            elif event["type"] == "complete":
+                return event["result"]
+            elif event["type"] == "error":
+                raise Exception(event["message"])
+
+    async def _publish(self, channel: str, event: Dict[str, Any]):
+        """Publish an event for remote followers."""
+        try:
+            await redis_client.binary_client.publish(channel, codec.encode(event))
+        except Exception as e:
+            logger.error(f"In-flight publish error: {e}")
+
+    async def _release(self, lock_key: str):
+        """Release the leader lock if this node still owns it."""
+        try:
+            await redis_client.client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, self.node_id)
+        except Exception as e:
+            logger.error(f"In-flight lock release error: {e}")
+
+
+# Global in-flight registry instance
+inflight_service = InflightService()
@@ -0,0 +1,168 @@
+"""Ordered, coalescing channel for generation progress events."""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from backend.core.config import settings
+from backend.services.cache_service import cache_service
+from backend.services.websocket_hub import websocket_hub
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressChannel:
+    """
+    Delivers progress events per generation in order, coalescing bursts.
+
+    Progress updates are buffered and only the latest per generation is
+    published each interval, with all generations' updates batched into
+    one Redis pipeline. Complete and error events replace any buffered
+    progress and are flushed immediately. Flushes are serialized, so an
+    older update can never be published after a newer one, and progress
+    reported after a generation finished is dropped. If Redis is
+    unavailable the events go straight to local WebSockets instead.
+    """
+
+    # Finished generations remembered to drop late progress
+    MAX_FINISHED = 4096
+
+    def __init__(self, interval: float = settings.progress_interval):
+        """
+        Initialize progress channel.
+
+        Args:
+            interval: Maximum seconds a progress update stays buffered
+        """
+        self.interval = interval
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._finished: "OrderedDict[int, None]" = OrderedDict()
+        self._flush_lock = asyncio.Lock()
+        self._runner: Optional[asyncio.Task] = None
+        self._stats = {"events": 0, "coalesced": 0, "late": 0, "flushes": 0, "published": 0, "errors": 0}
+
+    async def start(self):
+        """Start the background flush loop."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            logger.info(f"Progress channel started (interval {self.interval}s)")
+
+    async def stop(self):
+        """Stop the flush loop and deliver everything still buffered."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+        await self.flush()
+        logger.info("Progress channel stopped")
+
+    def progress(self, generation_id: int, progress: float, message: str):
+        """
+        Buffer a progress update, replacing any not yet published.
+
+        Safe to call from synchronous progress callbacks.
+
+        Args:
+            generation_id: Generation ID
+            progress: Progress percentage (0-100)
+            message: Status message
+        """
+        self._stats["events"] += 1
+        if generation_id in self._finished:
+            self._stats["late"] += 1
+            return
+        if generation_id in self._pending:
+            self._stats["coalesced"] += 1
+
+        self._pending[generation_id] = {
+            "type": "progress",
+            "generation_id": generation_id,
+            "progress": progress,
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    async def complete(self, generation_id: int, data: dict):
+        """
+        Deliver a generation's completion.
+
+        Args:
+            generation_id: Generation ID
+            data: Result data
+        """
+        await self._finish(generation_id, {"type": "complete", "generation_id": generation_id, "data": data})
+
+    async def error(self, generation_id: int, error: str):
+        """
+        Deliver a generation's failure.
+
+        Args:
+            generation_id: Generation ID
+            error: Error message
+        """
+        await self._finish(generation_id, {"type": "error", "generation_id": generation_id, "message": error})
+
+    async def _finish(self, generation_id: int, event: Dict[str, Any]):
+        """Replace buffered progress with a terminal event and flush it."""
+        self._stats["events"] += 1
+        if self._pending.pop(generation_id, None) is not None:
+            self._stats["coalesced"] += 1
+
+        self._finished[generation_id] = None
+        self._finished.move_to_end(generation_id)
+        while len(self._finished) > self.MAX_FINISHED:
+            self._finished.popitem(last=False)
+
+        event["timestamp"] = datetime.utcnow().isoformat()
+        self._pending[generation_id] = event
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Publish all buffered events in one pipeline.
+
+        Returns:
+            Number of events delivered
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            events = list(batch.values())
+            if not await cache_service.publish_events(events):
+                self._stats["errors"] += 1
+                for event in events:
+                    await websocket_hub.broadcast(event["generation_id"], event)
+
+            self._stats["flushes"] += 1
+            self._stats["published"] += len(events)
+            return len(events)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get channel statistics.
+
+        Returns:
+            Dictionary with buffered, event, coalesced, late, flush, published and error counts
+        """
+        return {"buffered": len(self._pending), **self._stats}
+
+    async def _run(self):
+        """Flush buffered progress on every interval."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Progress flush error: {e}")
+
+
+# Global progress channel instance
+progress_channel = ProgressChannel()
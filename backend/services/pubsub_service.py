@@ -1,90 +1,168 @@
 """Pub/Sub service for real-time progress updates."""
 
 import asyncio
-import json
 import logging
-from typing import Callable, Dict, Optional
+from typing import Any, Dict, Optional, Set, Tuple
 
+from backend.core.codec import codec
 from backend.core.redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
 
 class PubSubService:
-    """Service for Redis Pub/Sub operations."""
+    """
+    Service for Redis Pub/Sub operations.
+
+    One subscriber connection per process listens on every channel under
+    ``PREFIXES`` (generation progress and in-flight generation events) and
+    demultiplexes messages into a local queue per watcher, so watching
+    many channels costs one Redis connection rather than one each. Each
+    message is decoded once however many watchers receive it. A channel's
+    entry is dropped when its last watcher unsubscribes; messages for
+    channels nobody in this process watches are discarded after one
+    dictionary lookup. Watcher
+    queues are bounded: a consumer that falls ``QUEUE_SIZE`` messages
+    behind loses the oldest ones.
+    """
+
+    CHANNEL_PREFIX = "generation:progress:"
+    # Channel families served by the shared connection; InflightService publishes under the second
+    PREFIXES: Tuple[str, ...] = (CHANNEL_PREFIX, "inflight:events:")
+    QUEUE_SIZE = 256
+    READY_TIMEOUT = 5.0
+    RECONNECT_DELAY = 1.0
 
     def __init__(self):
-        self._listeners: Dict[str, asyncio.Queue] = {}
-        self._tasks: Dict[str, asyncio.Task] = {}
-        self._lock = asyncio.Lock()
-
-    async def _listen_channel(
-        self,
-        generation_id: int,
-        queue: asyncio.Queue,
-    ):
-        """Listen to Redis Pub/Sub channel for a generation."""
-        channel_name = f"generation:progress:{generation_id}"
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self.delivered = 0
+        self.dropped = 0
+
+    async def _read(self):
+        """Receive every watched message on one connection, reconnecting on failure."""
+        patterns = [f"{prefix}*" for prefix in self.PREFIXES]
+        while True:
+            pubsub = redis_client.binary_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(*patterns)
+                self._ready.set()
+                logger.info(f"Subscribed to patterns: {', '.join(patterns)}")
+
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error listening to patterns {', '.join(patterns)}: {e}")
+            finally:
+                self._ready.clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    def _dispatch(self, channel: bytes, data: bytes):
+        """Hand a message to every local watcher of its channel."""
+        queues = self._listeners.get(channel.decode("utf-8", "replace"))
+        if not queues:
+            return
 
         try:
-            pubsub = redis_client.client.pubsub()
-            await pubsub.subscribe(channel_name)
-            logger.info(f"Subscribed to channel: {channel_name}")
-
-            async for message in pubsub.listen():
-                if message["type"] == "message":
-                    try:
-                        data = json.loads(message["data"])
-                        await queue.put(data)
-                    except Exception as e:
-                        logger.error(f"Error parsing message: {e}")
+            message = codec.decode(data)
         except Exception as e:
-            logger.error(f"Error listening to channel {channel_name}: {e}")
-        finally:
-            await pubsub.unsubscribe(channel_name)
-            logger.info(f"Unsubscribed from channel: {channel_name}")
-
-    async def subscribe(self, generation_id: int) -> asyncio.Queue:
+            logger.error(f"Error parsing message: {e}")
+            return
+
+        for queue in queues:
+            if queue.full():
+                # Progress is latest-wins: make room by dropping the oldest update
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+            self.delivered += 1
+
+    async def watch(self, channel: str, queue: Optional[asyncio.Queue] = None) -> asyncio.Queue:
         """
-        Subscribe to progress updates for a generation.
+        Start delivering a channel's messages into a queue.
+
+        Every call gets its own queue, so several watchers of the same
+        channel each receive all of its messages. Returns once the shared
+        subscription is active, so no message published afterwards is missed.
 
         Args:
-            generation_id: Generation ID
+            channel: Channel name, under one of PREFIXES
+            queue: Existing queue to deliver into, e.g. one shared across channels
 
         Returns:
-            Queue for receiving updates
+            Queue for receiving messages; pass it to unwatch when done
+
+        Raises:
+            ValueError: If the channel is not covered by the shared subscription
         """
-        async with self._lock:
-            if generation_id in self._listeners:
-                return self._listeners[generation_id]
+        if not channel.startswith(self.PREFIXES):
+            raise ValueError(f"Channel {channel} is not under any of {self.PREFIXES}")
 
-            queue: asyncio.Queue = asyncio.Queue()
-            self._listeners[generation_id] = queue
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
 
-            task = asyncio.create_task(
-                self._listen_channel(generation_id, queue)
-            )
-            self._tasks[generation_id] = task
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._listeners.setdefault(channel, set()).add(queue)
 
-            logger.info(f"Created listener for generation {generation_id}")
-            return queue
+        if not self._ready.is_set():
+            # Wait for the pattern subscription so early messages are not missed
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=self.READY_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Pub/Sub subscriber not ready, watching {channel} anyway")
 
-    async def unsubscribe(self, generation_id: int):
+        return queue
+
+    async def unwatch(self, channel: str, queue: Optional[asyncio.Queue] = None):
         """
-        Unsubscribe from progress updates for a generation.
+        Stop delivering a channel's messages.
+
+        Args:
+            channel: Channel name
+            queue: Watcher queue returned by watch (None removes every watcher)
+        """
+        queues = self._listeners.get(channel)
+        if queues is None:
+            return
+
+        if queue is None:
+            queues.clear()
+        else:
+            queues.discard(queue)
+        if not queues:
+            del self._listeners[channel]
+
+    async def subscribe(self, generation_id: int, queue: Optional[asyncio.Queue] = None) -> asyncio.Queue:
+        """
+        Subscribe to progress updates for a generation.
 
         Args:
             generation_id: Generation ID
+            queue: Existing queue to deliver into, e.g. one shared across generations
+
+        Returns:
+            Queue for receiving updates; pass it to unsubscribe when done
         """
-        async with self._lock:
-            if generation_id in self._tasks:
-                self._tasks[generation_id].cancel()
-                del self._tasks[generation_id]
+        return await self.watch(f"{self.CHANNEL_PREFIX}{generation_id}", queue)
 
-            if generation_id in self._listeners:
-                del self._listeners[generation_id]
+    async def unsubscribe(self, generation_id: int, queue: Optional[asyncio.Queue] = None):
+        """
+        Unsubscribe from progress updates for a generation.
 
-            logger.info(f"Removed listener for generation {generation_id}")
+        Args:
+            generation_id: Generation ID
+            queue: Watcher queue returned by subscribe (None removes every watcher)
+        """
+        await self.unwatch(f"{self.CHANNEL_PREFIX}{generation_id}", queue)
 
     async def listen_once(
         self,
@@ -110,16 +188,34 @@ class PubSubService:
             logger.warning(f"Timeout waiting for generation {generation_id}")
             return None
         finally:
-            await self.unsubscribe(generation_id)
+            await self.unsubscribe(generation_id, queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get subscriber statistics.
+
+        Returns:
+            Dictionary with watched channels, watcher queues, connection state and message counters
+        """
+        return {
+            "channels": len(self._listeners),
+            "watchers": sum(len(queues) for queues in self._listeners.values()),
+            "connected": self._ready.is_set(),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
 
     async def cleanup(self):
         """Cleanup all active subscriptions."""
-        async with self._lock:
-            for task in self._tasks.values():
-                task.cancel()
-            self._tasks.clear()
-            self._listeners.clear()
-            logger.info("Pub/Sub service cleaned up")
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        self._listeners.clear()
+        logger.info("Pub/Sub service cleaned up")
 
 
 # Global Pub/Sub service instance
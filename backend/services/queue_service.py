@@ -1,35 +1,499 @@
 """Queue service for managing generation tasks."""
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict, Optional, Tuple
+import os
+import random
+import socket
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from redis.commands.core import AsyncScript
+
+from backend.core.codec import codec
 from backend.core.config import settings
 from backend.core.redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Every task lives in the payload and cost hashes; the per-client lists only
+# hold task IDs so the scheduler can read a task's cost without decoding it.
+# The index hash maps each queued or scheduled task ID to "priority|client".
+# Cancelled tasks are tombstoned rather than searched for; the scheduler
+# drops their IDs when it reaches them. Tasks due later wait in the
+# scheduled sorted set, scored by run time, and are promoted in batches by
+# the dequeue script. Keys are derived from the prefix inside the scripts,
+# so the queue needs a single Redis node rather than a cluster.
+
+# Append a task ID to its client's FIFO and wake one waiting consumer
+_READY_LUA = """
+local function ready(prefix, priority, client, task_id, now)
+    local base = prefix .. ':' .. priority
+    if redis.call('LLEN', base .. ':ring') == 0 then
+        redis.call('SET', base .. ':served', now)
+    end
+    redis.call('RPUSH', base .. ':client:' .. client, task_id)
+    if redis.call('SADD', base .. ':active', client) == 1 then
+        redis.call('RPUSH', base .. ':ring', client)
+    end
+    redis.call('INCR', base .. ':size')
+    redis.call('RPUSH', prefix .. ':signal', 1)
+end
+"""
+
+# ARGV: prefix, priority, client_id, now, signal_limit, run_at (0 for now),
+# then (task_id, payload, cost) triples
+_ENQUEUE_SCRIPT = _READY_LUA + """
+local prefix, priority, client, now = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+local run_at = tonumber(ARGV[6])
+
+local count = 0
+for i = 7, #ARGV, 3 do
+    redis.call('HSET', prefix .. ':payloads', ARGV[i], ARGV[i + 1])
+    redis.call('HSET', prefix .. ':costs', ARGV[i], ARGV[i + 2])
+    redis.call('HSET', prefix .. ':index', ARGV[i], priority .. '|' .. client)
+    if run_at > tonumber(now) then
+        redis.call('ZADD', prefix .. ':scheduled', run_at, ARGV[i])
+    else
+        ready(prefix, priority, client, ARGV[i], now)
+    end
+    count = count + 1
+end
+
+redis.call('LTRIM', prefix .. ':signal', -tonumber(ARGV[5]), -1)
+return count
+"""
+
+# Promote up to promote_batch due scheduled tasks, then pick a task by
+# deficit round-robin across the clients of one priority, with aging across
+# priorities. The served task stays in the payload hash under a lease that
+# expires after the visibility timeout unless the worker heartbeats or acks
+# it. Returns {task_id, payload, attempt}; {next run time} or nil when no
+# task is ready; or 0 when the visit budget ran out before any client saved
+# up enough credit.
+#
+# ARGV: prefix, now, aging_seconds, quantum, visibility_timeout, consumer,
+# promote_batch, signal_limit, priorities...
+_DEQUEUE_SCRIPT = _READY_LUA + """
+local prefix, now = ARGV[1], tonumber(ARGV[2])
+local aging, quantum = tonumber(ARGV[3]), tonumber(ARGV[4])
+local visibility, consumer = tonumber(ARGV[5]), ARGV[6]
+local payloads, costs = prefix .. ':payloads', prefix .. ':costs'
+local weights = prefix .. ':weights'
+local scheduled = prefix .. ':scheduled'
+
+local due = redis.call('ZRANGEBYSCORE', scheduled, '-inf', now, 'LIMIT', 0, ARGV[7])
+for _, task_id in ipairs(due) do
+    redis.call('ZREM', scheduled, task_id)
+    local location = redis.call('HGET', prefix .. ':index', task_id)
+    if location then
+        local priority, client = string.match(location, '^([^|]*)|(.*)$')
+        ready(prefix, priority, client, task_id, ARGV[2])
+    end
+end
+if #due > 0 then
+    redis.call('LTRIM', prefix .. ':signal', -tonumber(ARGV[8]), -1)
+end
+
+local function pick_priority()
+    local chosen, starved, oldest = nil, nil, nil
+    for i = 9, #ARGV do
+        local base = prefix .. ':' .. ARGV[i]
+        if redis.call('LLEN', base .. ':ring') > 0 then
+            if chosen == nil then
+                chosen = ARGV[i]
+            elseif aging > 0 then
+                local served = tonumber(redis.call('GET', base .. ':served') or now)
+                if now - served >= aging and (oldest == nil or served < oldest) then
+                    starved, oldest = ARGV[i], served
+                end
+            end
+        end
+    end
+    return starved or chosen
+end
+
+local function cost_of(task_id)
+    return tonumber(redis.call('HGET', costs, task_id) or '1')
+end
+
+local function retire(base, client)
+    redis.call('LPOP', base .. ':ring')
+    redis.call('SREM', base .. ':active', client)
+    redis.call('HDEL', base .. ':deficits', client)
+end
+
+local function rotate(base)
+    redis.call('RPUSH', base .. ':ring', redis.call('LPOP', base .. ':ring'))
+end
+
+local function serve(priority)
+    local base = prefix .. ':' .. priority
+    local deficits = base .. ':deficits'
+    local visits = 256 * redis.call('LLEN', base .. ':ring')
+
+    for _ = 1, visits do
+        local client = redis.call('LINDEX', base .. ':ring', 0)
+        if not client then
+            return nil
+        end
+
+        local queue = base .. ':client:' .. client
+        local task_id = redis.call('LINDEX', queue, 0)
+        if not task_id then
+            retire(base, client)
+        elseif redis.call('SREM', prefix .. ':tombstones', task_id) == 1 then
+            redis.call('LPOP', queue)
+        else
+            local cost = cost_of(task_id)
+            local deficit = tonumber(redis.call('HGET', deficits, client) or '0')
+            if deficit < cost then
+                -- A client at the head of the ring without enough credit
+                -- is starting a new turn
+                deficit = deficit + quantum * tonumber(redis.call('HGET', weights, client) or '1')
+            end
+
+            if deficit < cost then
+                redis.call('HSET', deficits, client, deficit)
+                rotate(base)
+            else
+                redis.call('LPOP', queue)
+                local payload = redis.call('HGET', payloads, task_id)
+                redis.call('HDEL', prefix .. ':index', task_id)
+                redis.call('DECR', base .. ':size')
+                redis.call('SET', base .. ':served', now)
+
+                deficit = deficit - cost
+                local next_id = redis.call('LINDEX', queue, 0)
+                if not next_id then
+                    retire(base, client)
+                else
+                    redis.call('HSET', deficits, client, deficit)
+                    if deficit < cost_of(next_id) then
+                        rotate(base)
+                    end
+                end
+
+                if payload then
+                    redis.call('ZADD', prefix .. ':leases', now + visibility, task_id)
+                    redis.call('HSET', prefix .. ':leased', task_id, priority .. '|' .. client .. '|' .. consumer)
+                    local attempt = redis.call('HINCRBY', prefix .. ':attempts', task_id, 1)
+                    return {task_id, payload, attempt}
+                end
+                redis.call('HDEL', costs, task_id)
+            end
+        end
+    end
+    return 0
+end
+
+for _ = 9, #ARGV do
+    local priority = pick_priority()
+    if not priority then
+        redis.call('DEL', prefix .. ':signal')
+        local next_run = redis.call('ZRANGE', scheduled, 0, 0, 'WITHSCORES')
+        if next_run[2] then
+            return {next_run[2]}
+        end
+        return nil
+    end
+    local task = serve(priority)
+    if task then
+        return task
+    end
+end
+return 0
+"""
+
+# Schedule tasks whose lease expired for another delivery after an
+# exponential backoff, or move them to the dead-letter hash once they used
+# up their attempts. Returns {requeued task IDs, dead task IDs}.
+#
+# ARGV: prefix, now, max_attempts, limit, base_delay, max_delay, jitter (0-1)
+_REAP_SCRIPT = """
+local prefix, now = ARGV[1], ARGV[2]
+local max_attempts = tonumber(ARGV[3])
+local base_delay, max_delay, jitter = tonumber(ARGV[5]), tonumber(ARGV[6]), tonumber(ARGV[7])
+local requeued, dead = {}, {}
+
+for _, task_id in ipairs(redis.call('ZRANGEBYSCORE', prefix .. ':leases', '-inf', now, 'LIMIT', 0, ARGV[4])) do
+    local lease = redis.call('HGET', prefix .. ':leased', task_id) or ''
+    local priority, client = string.match(lease, '^([^|]*)|(.*)|[^|]*$')
+    local attempts = tonumber(redis.call('HGET', prefix .. ':attempts', task_id) or '0')
+    local payload = redis.call('HGET', prefix .. ':payloads', task_id)
+
+    redis.call('ZREM', prefix .. ':leases', task_id)
+    redis.call('HDEL', prefix .. ':leased', task_id)
+
+    if not payload or not priority then
+        redis.call('HDEL', prefix .. ':payloads', task_id)
+        redis.call('HDEL', prefix .. ':costs', task_id)
+        redis.call('HDEL', prefix .. ':attempts', task_id)
+    elseif attempts >= max_attempts then
+        redis.call('HSET', prefix .. ':dead', task_id, payload)
+        redis.call('HDEL', prefix .. ':payloads', task_id)
+        redis.call('HDEL', prefix .. ':costs', task_id)
+        redis.call('HDEL', prefix .. ':attempts', task_id)
+        table.insert(dead, task_id)
+    else
+        local delay = math.min(max_delay, base_delay * 2 ^ (attempts - 1)) * (0.5 + jitter / 2)
+        redis.call('HSET', prefix .. ':index', task_id, priority .. '|' .. client)
+        redis.call('ZADD', prefix .. ':scheduled', tonumber(now) + delay, task_id)
+        table.insert(requeued, task_id)
+    end
+end
+
+return {requeued, dead}
+"""
+
+# ARGV: prefix, priorities...
+_CLEAR_SCRIPT = """
+local prefix = ARGV[1]
+local removed = 0
+local priorities = {}
+for i = 2, #ARGV do
+    local base = prefix .. ':' .. ARGV[i]
+    for _, client in ipairs(redis.call('SMEMBERS', base .. ':active')) do
+        local queue = base .. ':client:' .. client
+        for _, task_id in ipairs(redis.call('LRANGE', queue, 0, -1)) do
+            if redis.call('SREM', prefix .. ':tombstones', task_id) == 0 then
+                redis.call('HDEL', prefix .. ':payloads', task_id)
+                redis.call('HDEL', prefix .. ':costs', task_id)
+                redis.call('HDEL', prefix .. ':attempts', task_id)
+                redis.call('HDEL', prefix .. ':index', task_id)
+                removed = removed + 1
+            end
+        end
+        redis.call('DEL', queue)
+    end
+    redis.call('DEL', base .. ':ring', base .. ':active', base .. ':deficits', base .. ':size', base .. ':served')
+    priorities[ARGV[i]] = true
+end
+
+for _, task_id in ipairs(redis.call('ZRANGE', prefix .. ':scheduled', 0, -1)) do
+    local location = redis.call('HGET', prefix .. ':index', task_id) or ''
+    if priorities[string.match(location, '^([^|]*)|') or ''] then
+        redis.call('ZREM', prefix .. ':scheduled', task_id)
+        redis.call('HDEL', prefix .. ':payloads', task_id)
+        redis.call('HDEL', prefix .. ':costs', task_id)
+        redis.call('HDEL', prefix .. ':attempts', task_id)
+        redis.call('HDEL', prefix .. ':index', task_id)
+        removed = removed + 1
+    end
+end
+return removed
+"""
+
+# Tombstone a queued task or unschedule a scheduled one. Returns its priority, or nil if it is not queued
+# (or not in the given priority).
+#
+# ARGV: prefix, task_id, priority (empty for any)
+_REMOVE_SCRIPT = """
+local prefix, task_id = ARGV[1], ARGV[2]
+local location = redis.call('HGET', prefix .. ':index', task_id)
+if not location then
+    return nil
+end
+local priority = string.match(location, '^([^|]*)|')
+if ARGV[3] ~= '' and ARGV[3] ~= priority then
+    return nil
+end
+
+redis.call('HDEL', prefix .. ':index', task_id)
+redis.call('HDEL', prefix .. ':payloads', task_id)
+redis.call('HDEL', prefix .. ':costs', task_id)
+redis.call('HDEL', prefix .. ':attempts', task_id)
+if redis.call('ZREM', prefix .. ':scheduled', task_id) == 0 then
+    redis.call('SADD', prefix .. ':tombstones', task_id)
+    redis.call('DECR', prefix .. ':' .. priority .. ':size')
+end
+return priority
+"""
+
+# Where a task is. Returns {'queued', priority, client, position in the
+# client's queue, estimated tasks served first}, {'scheduled', priority,
+# client, run time}, {'processing', priority, client, consumer, attempt,
+# lease deadline}, {'dead'} or nil.
+#
+# ARGV: prefix, task_id, priorities (highest first)...
+_LOOKUP_SCRIPT = """
+local prefix, task_id = ARGV[1], ARGV[2]
+
+local location = redis.call('HGET', prefix .. ':index', task_id)
+if location then
+    local priority, client = string.match(location, '^([^|]*)|(.*)$')
+    local run_at = redis.call('ZSCORE', prefix .. ':scheduled', task_id)
+    if run_at then
+        return {'scheduled', priority, client, run_at}
+    end
+
+    local base = prefix .. ':' .. priority
+    local position = redis.call('LPOS', base .. ':client:' .. client, task_id) or 0
+
+    -- Under round-robin every other client gets about as many turns,
+    -- scaled by weight, before this task comes up
+    local weights = prefix .. ':weights'
+    local own_weight = tonumber(redis.call('HGET', weights, client) or '1')
+    local ahead = position
+    for _, other in ipairs(redis.call('SMEMBERS', base .. ':active')) do
+        if other ~= client then
+            local share = (position + 1) * tonumber(redis.call('HGET', weights, other) or '1') / own_weight
+            ahead = ahead + math.min(redis.call('LLEN', base .. ':client:' .. other), math.floor(share))
+        end
+    end
+    for i = 3, #ARGV do
+        if ARGV[i] == priority then
+            break
+        end
+        ahead = ahead + tonumber(redis.call('GET', prefix .. ':' .. ARGV[i] .. ':size') or '0')
+    end
+    return {'queued', priority, client, position, ahead}
+end
+
+local deadline = redis.call('ZSCORE', prefix .. ':leases', task_id)
+if deadline then
+    local lease = redis.call('HGET', prefix .. ':leased', task_id) or '||'
+    local priority, client, consumer = string.match(lease, '^([^|]*)|(.*)|([^|]*)$')
+    local attempt = redis.call('HGET', prefix .. ':attempts', task_id) or '1'
+    return {'processing', priority, client, consumer, attempt, deadline}
+end
+
+if redis.call('HEXISTS', prefix .. ':dead', task_id) == 1 then
+    return {'dead'}
+end
+return nil
+"""
+
+
+def generation_work(params: Dict[str, Any]) -> float:
+    """
+    Estimate a generation's GPU work relative to a default-sized generation.
+
+    Args:
+        params: Generation parameters
+
+    Returns:
+        Work in units of one default text-to-image generation
+    """
+    pixels = (params.get("width") or settings.default_image_width) * (
+        params.get("height") or settings.default_image_height
+    )
+    work = pixels * (params.get("steps") or settings.default_steps) * (params.get("num_images") or 1)
+    baseline = settings.default_image_width * settings.default_image_height * settings.default_steps
+    return round(max(0.01, work / baseline), 4)
+
 
 class QueueService:
-    """Service for managing generation task queue."""
+    """
+    Service for managing generation task queue.
+
+    Each priority keeps one FIFO per client. Clients take turns by deficit
+    round-robin: every turn adds ``quantum`` times the client's weight to
+    its credit and tasks are served while the credit covers their cost, so
+    one client submitting thousands of tasks cannot starve the others.
+    Higher priorities are served first, but a lower priority that has not
+    been served for ``aging_seconds`` jumps ahead.
+
+    Delivery is at least once: a dequeued task is leased to its consumer
+    until it is acked. Leases not renewed by a heartbeat within
+    ``visibility_timeout`` are reaped and the task is served again after a
+    backoff, or moved to the dead-letter hash after ``max_attempts``
+    deliveries. Tasks can also be scheduled for a later time; redeliveries
+    use the same sorted set to back off.
+    """
 
     QUEUE_PREFIX = "queue:generation"
     PRIORITY_HIGH = "high"
     PRIORITY_NORMAL = "normal"
     PRIORITY_LOW = "low"
+    DEFAULT_CLIENT = "anonymous"
+    SIGNAL_LIMIT = 1024
 
-    def __init__(self):
+    def __init__(
+        self,
+        quantum: float = settings.queue_fair_quantum,
+        aging_seconds: float = settings.queue_aging_seconds,
+        client_weights: Optional[Dict[str, float]] = None,
+        visibility_timeout: float = settings.queue_visibility_timeout,
+        max_attempts: int = settings.queue_max_attempts,
+        retry_delay: float = settings.queue_retry_delay,
+        retry_max_delay: float = settings.queue_retry_max_delay,
+        promote_batch: int = settings.queue_promote_batch,
+        consumer_id: Optional[str] = None,
+    ):
+        """
+        Initialize queue service.
+
+        Args:
+            quantum: Credit a client earns per turn, in default-sized tasks
+            aging_seconds: Wait after which a lower priority is served first (0 disables)
+            client_weights: Fair-share weight per client ID (others get 1)
+            visibility_timeout: Seconds a dequeued task stays leased without a heartbeat
+            max_attempts: Deliveries before a task is dead-lettered
+            retry_delay: Backoff before redelivering an abandoned task, doubling per attempt
+            retry_max_delay: Upper bound for the redelivery backoff in seconds
+            promote_batch: Due scheduled tasks promoted per dequeue
+            consumer_id: Name recorded on leases (default: host:pid)
+        """
+        self.quantum = quantum
+        self.aging_seconds = aging_seconds
+        self.client_weights = settings.queue_client_weights if client_weights is None else client_weights
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.promote_batch = max(1, promote_batch)
+        self.consumer_id = consumer_id or f"{socket.gethostname()}:{os.getpid()}"
         self._initialized = False
+        self._enqueue_script: Optional[AsyncScript] = None
+        self._dequeue_script: Optional[AsyncScript] = None
+        self._clear_script: Optional[AsyncScript] = None
+        self._remove_script: Optional[AsyncScript] = None
+        self._reap_script: Optional[AsyncScript] = None
+        self._lookup_script: Optional[AsyncScript] = None
 
     async def initialize(self):
         """Initialize queue service."""
         if not self._initialized:
             await redis_client.initialize()
+            client = redis_client.binary_client
+            self._enqueue_script = client.register_script(_ENQUEUE_SCRIPT)
+            self._dequeue_script = client.register_script(_DEQUEUE_SCRIPT)
+            self._clear_script = client.register_script(_CLEAR_SCRIPT)
+            self._remove_script = client.register_script(_REMOVE_SCRIPT)
+            self._reap_script = client.register_script(_REAP_SCRIPT)
+            self._lookup_script = client.register_script(_LOOKUP_SCRIPT)
+            if self.client_weights:
+                await client.hset(f"{self.QUEUE_PREFIX}:weights", mapping=self.client_weights)
             self._initialized = True
 
-    def _get_queue_name(self, priority: str = "normal") -> str:
-        """Get queue name based on priority."""
-        return f"{self.QUEUE_PREFIX}:{priority}"
+    def _priorities(self, priority: Optional[str] = None) -> List[str]:
+        """Priorities to act on, highest first."""
+        if priority:
+            return [priority]
+        return [self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW]
+
+    def _task_cost(self, params: Dict[str, Any]) -> float:
+        """Cost of a task for fair scheduling."""
+        return generation_work(params)
+
+    async def set_client_weight(self, client_id: str, weight: float) -> bool:
+        """
+        Set a client's fair-share weight.
+
+        Args:
+            client_id: Client ID
+            weight: Relative share of the workers (1 is the default)
+
+        Returns:
+            True if stored successfully
+        """
+        try:
+            await redis_client.client.hset(f"{self.QUEUE_PREFIX}:weights", client_id, weight)
+            return True
+        except Exception as e:
+            logger.error(f"Set client weight error: {e}")
+            return False
 
     async def enqueue(
         self,
@@ -37,6 +501,9 @@ class QueueService:
         generation_type: str,
         params: Dict[str, Any],
         priority: str = "normal",
+        client_id: str = DEFAULT_CLIENT,
+        run_at: Optional[float] = None,
+        delay: Optional[float] = None,
     ) -> bool:
         """
         Enqueue a generation task.
@@ -46,23 +513,65 @@ class QueueService:
             generation_type: Type of generation (text-to-image, etc.)
             params: Generation parameters
             priority: Task priority (high, normal, low)
+            client_id: Client the task is scheduled fairly against
+            run_at: Unix time before which the task is not served
+            delay: Seconds from now before which the task is not served
 
         Returns:
             True if enqueued successfully
         """
-        try:
-            client = redis_client.client
-            queue_name = self._get_queue_name(priority)
+        if await self.enqueue_many([(task_id, generation_type, params)], priority, client_id, run_at, delay):
+            logger.info(f"Enqueued task {task_id} to {priority} queue for {client_id}")
+            return True
+        return False
+
+    async def enqueue_many(
+        self,
+        tasks: List[Tuple[int, str, Dict[str, Any]]],
+        priority: str = "normal",
+        client_id: str = DEFAULT_CLIENT,
+        run_at: Optional[float] = None,
+        delay: Optional[float] = None,
+    ) -> bool:
+        """
+        Enqueue several generation tasks in a single round trip.
 
-            task_data = {
-                "task_id": task_id,
-                "generation_type": generation_type,
-                "params": params,
-                "priority": priority,
-            }
+        Tasks with a run time in the future wait in the scheduled set and
+        are moved into their client's queue once due.
 
-            await client.rpush(queue_name, json.dumps(task_data))
-            logger.info(f"Enqueued task {task_id} to {priority} queue")
+        Args:
+            tasks: (task_id, generation_type, params) tuples
+            priority: Task priority (high, normal, low)
+            client_id: Client the tasks are scheduled fairly against
+            run_at: Unix time before which the tasks are not served
+            delay: Seconds from now before which the tasks are not served
+
+        Returns:
+            True if all tasks were enqueued
+        """
+        if not tasks:
+            return True
+
+        try:
+            now = time.time()
+            if delay:
+                run_at = max(run_at or 0, now + delay)
+            args: List[Any] = [self.QUEUE_PREFIX, priority, client_id, now, self.SIGNAL_LIMIT, run_at or 0]
+            for task_id, generation_type, params in tasks:
+                payload = codec.encode({
+                    "task_id": task_id,
+                    "generation_type": generation_type,
+                    "params": params,
+                    "priority": priority,
+                    "client_id": client_id,
+                })
+                args.extend([task_id, payload, self._task_cost(params)])
+
+            await self._enqueue_script(args=args, client=redis_client.binary_client)
+            if run_at and run_at > now:
+                logger.info(f"Scheduled {len(tasks)} tasks to {priority} queue in {run_at - now:.0f}s")
+            elif len(tasks) > 1:
+                logger.info(f"Enqueued {len(tasks)} tasks to {priority} queue for {client_id}")
             return True
         except Exception as e:
             logger.error(f"Enqueue error: {e}")
@@ -74,35 +583,178 @@ class QueueService:
         priorities: Optional[list[str]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        Dequeue a task with priority support.
+        Dequeue the next task due under fair scheduling.
+
+        The task is leased to this consumer and must be acked once handled.
 
         Args:
             timeout: Wait timeout in seconds
             priorities: Priority order (default: high, normal, low)
 
         Returns:
-            Task data or None if no task available
+            Task data (with its delivery ``attempt``) or None if no task available
+
+        Raises:
+            Exception: If Redis is unreachable, so callers can back off
+        """
+        try:
+            client = redis_client.binary_client
+            args = [
+                self.QUEUE_PREFIX, 0, self.aging_seconds, self.quantum,
+                self.visibility_timeout, self.consumer_id,
+                self.promote_batch, self.SIGNAL_LIMIT,
+                *(priorities or self._priorities()),
+            ]
+            deadline = time.monotonic() + timeout
+
+            while True:
+                args[1] = time.time()
+                result = await self._dequeue_script(args=args, client=client)
+
+                if isinstance(result, list) and len(result) == 3:
+                    task_data = codec.decode(result[1])
+                    task_data["attempt"] = result[2]
+                    logger.info(f"Dequeued task {task_data['task_id']} (attempt {result[2]})")
+                    return task_data
+
+                if result == 0:
+                    # Credit still accumulating for large tasks: go again
+                    await asyncio.sleep(0)
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if result:
+                    # Nothing ready yet: wake up when the next scheduled task is due
+                    remaining = min(remaining, max(0.05, float(result[0]) - time.time()))
+                # Each enqueued task pushes a token; wait for one instead of polling
+                await client.blpop([f"{self.QUEUE_PREFIX}:signal"], timeout=remaining)
+        except Exception as e:
+            logger.error(f"Dequeue error: {e}")
+            raise
+
+    async def ack(self, task_id: int) -> bool:
+        """
+        Mark a dequeued task as handled and drop it from the queue.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            True if the task was still leased
         """
         try:
             client = redis_client.client
-            if priorities is None:
-                priorities = [self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW]
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.zrem(f"{self.QUEUE_PREFIX}:leases", task_id)
+                pipe.hdel(f"{self.QUEUE_PREFIX}:leased", task_id)
+                pipe.hdel(f"{self.QUEUE_PREFIX}:payloads", task_id)
+                pipe.hdel(f"{self.QUEUE_PREFIX}:costs", task_id)
+                pipe.hdel(f"{self.QUEUE_PREFIX}:attempts", task_id)
+                leased, *_ = await pipe.execute()
+            return bool(leased)
+        except Exception as e:
+            logger.error(f"Ack error: {e}")
+            return False
 
-            queue_names = [self._get_queue_name(p) for p in priorities]
+    async def heartbeat(self, task_ids: List[int]) -> bool:
+        """
+        Extend the leases of tasks still being worked on.
 
-            result = await client.blpop(queue_names, timeout=timeout)
+        Args:
+            task_ids: IDs of tasks this consumer is handling
 
-            if result:
-                _, task_json = result
-                task_data = json.loads(task_json)
-                logger.info(f"Dequeued task {task_data['task_id']}")
-                return task_data
+        Returns:
+            True if the leases were extended
+        """
+        if not task_ids:
+            return True
 
-            return None
+        try:
+            deadline = time.time() + self.visibility_timeout
+            # XX: never resurrect a lease the reaper already took back
+            await redis_client.client.zadd(
+                f"{self.QUEUE_PREFIX}:leases",
+                dict.fromkeys(task_ids, deadline),
+                xx=True,
+            )
+            return True
         except Exception as e:
-            logger.error(f"Dequeue error: {e}")
+            logger.error(f"Heartbeat error: {e}")
+            return False
+
+    async def reap(self, limit: int = 100) -> Tuple[List[int], List[Dict[str, Any]]]:
+        """
+        Take back tasks whose lease expired.
+
+        They are scheduled for another delivery after a jittered exponential
+        backoff, or dead-lettered once they used up their attempts.
+
+        Args:
+            limit: Maximum leases to process in one call
+
+        Returns:
+            Tuple of (rescheduled task IDs, dead-lettered task payloads)
+        """
+        try:
+            client = redis_client.binary_client
+            requeued, dead = await self._reap_script(
+                args=[
+                    self.QUEUE_PREFIX, time.time(), self.max_attempts, limit,
+                    self.retry_delay, self.retry_max_delay, random.random(),
+                ],
+                client=client,
+            )
+            requeued = [int(task_id) for task_id in requeued]
+            dead_tasks = []
+            if dead:
+                payloads = await client.hmget(f"{self.QUEUE_PREFIX}:dead", dead)
+                dead_tasks = [codec.decode(payload) for payload in payloads if payload is not None]
+
+            if requeued:
+                logger.warning(f"Rescheduled {len(requeued)} abandoned tasks: {requeued}")
+            for task in dead_tasks:
+                logger.error(f"Task {task['task_id']} dead-lettered after {self.max_attempts} attempts")
+            return requeued, dead_tasks
+        except Exception as e:
+            logger.error(f"Reap error: {e}")
+            return [], []
+
+    async def known_task_ids(self, task_ids: List[int]) -> Optional[Set[int]]:
+        """
+        Find which tasks are queued or leased.
+
+        Args:
+            task_ids: Task IDs to check
+
+        Returns:
+            Subset of task_ids the queue still holds, or None on error
+        """
+        if not task_ids:
+            return set()
+
+        try:
+            payloads = await redis_client.binary_client.hmget(f"{self.QUEUE_PREFIX}:payloads", task_ids)
+            return {task_id for task_id, payload in zip(task_ids, payloads, strict=True) if payload is not None}
+        except Exception as e:
+            logger.error(f"Known task lookup error: {e}")
             return None
 
+    async def get_dead_letters(self) -> List[Dict[str, Any]]:
+        """
+        Get tasks that exhausted their delivery attempts.
+
+        Returns:
+            Dead-lettered task payloads
+        """
+        try:
+            payloads = await redis_client.binary_client.hvals(f"{self.QUEUE_PREFIX}:dead")
+            return [codec.decode(payload) for payload in payloads]
+        except Exception as e:
+            logger.error(f"Get dead letters error: {e}")
+            return []
+
     async def get_length(self, priority: Optional[str] = None) -> int:
         """
         Get queue length.
@@ -115,14 +767,8 @@ class QueueService:
         """
         try:
             client = redis_client.client
-            if priority:
-                queue_name = self._get_queue_name(priority)
-                return await client.llen(queue_name)
-            else:
-                total = 0
-                for p in [self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW]:
-                    total += await client.llen(self._get_queue_name(p))
-                return total
+            sizes = await client.mget([f"{self.QUEUE_PREFIX}:{p}:size" for p in self._priorities(priority)])
+            return sum(int(size or 0) for size in sizes)
         except Exception as e:
             logger.error(f"Get length error: {e}")
             return 0
@@ -138,15 +784,10 @@ class QueueService:
             Number of tasks removed
         """
         try:
-            client = redis_client.client
-            priorities = [priority] if priority else [self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW]
-            total = 0
-            for p in priorities:
-                queue_name = self._get_queue_name(p)
-                count = await client.llen(queue_name)
-                if count > 0:
-                    await client.delete(queue_name)
-                    total += count
+            total = await self._clear_script(
+                args=[self.QUEUE_PREFIX, *self._priorities(priority)],
+                client=redis_client.binary_client,
+            )
             logger.info(f"Cleared {total} tasks from queue")
             return total
         except Exception as e:
@@ -157,52 +798,117 @@ class QueueService:
         """
         Remove specific task from queue.
 
+        The task is looked up in the index and tombstoned, so this takes one
+        round trip whatever the queue depth. Tasks already leased to a
+        worker are not removed.
+
         Args:
             task_id: Task ID to remove
-            priority: Priority queue to search (None for all)
+            priority: Only remove it from this priority (None for any)
 
         Returns:
             True if task was found and removed
         """
         try:
-            client = redis_client.client
-            priorities = [priority] if priority else [self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW]
-
-            for p in priorities:
-                queue_name = self._get_queue_name(p)
-                length = await client.llen(queue_name)
-                for idx in range(length):
-                    task_json = await client.lindex(queue_name, idx)
-                    if task_json:
-                        task_data = json.loads(task_json)
-                        if task_data.get("task_id") == task_id:
-                            await client.lrem(queue_name, 1, task_json)
-                            logger.info(f"Removed task {task_id} from {p} queue")
-                            return True
-            return False
+            removed_from = await self._remove_script(
+                args=[self.QUEUE_PREFIX, task_id, priority or ""],
+                client=redis_client.binary_client,
+            )
+            if removed_from is None:
+                return False
+            logger.info(f"Removed task {task_id} from {removed_from.decode()} queue")
+            return True
         except Exception as e:
             logger.error(f"Remove task error: {e}")
             return False
 
+    async def get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up where a task is in a single round trip.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Task state (queued with position, scheduled, processing or dead), or None if unknown
+        """
+        try:
+            result = await self._lookup_script(
+                args=[self.QUEUE_PREFIX, task_id, *self._priorities()],
+                client=redis_client.binary_client,
+            )
+        except Exception as e:
+            logger.error(f"Get task error: {e}")
+            return None
+
+        if result is None:
+            return None
+
+        state = result[0].decode()
+        task: Dict[str, Any] = {"task_id": task_id, "state": state}
+        if state == "queued":
+            task.update(
+                priority=result[1].decode(),
+                client_id=result[2].decode(),
+                client_position=result[3],
+                position=result[4],
+            )
+        elif state == "scheduled":
+            task.update(
+                priority=result[1].decode(),
+                client_id=result[2].decode(),
+                run_at=float(result[3]),
+                runs_in=round(max(0.0, float(result[3]) - time.time()), 1),
+            )
+        elif state == "processing":
+            task.update(
+                priority=result[1].decode(),
+                client_id=result[2].decode(),
+                consumer=result[3].decode(),
+                attempt=int(result[4]),
+                lease_expires_in=round(max(0.0, float(result[5]) - time.time()), 1),
+            )
+        return task
+
     async def get_queue_info(self) -> Dict[str, int]:
         """
         Get information about all queues.
 
         Returns:
-            Dictionary with queue lengths
+            Dictionary with queue lengths, clients waiting, scheduled, leased and dead-lettered tasks
         """
         try:
             client = redis_client.client
-            info = {}
-            for p in [self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW]:
-                queue_name = self._get_queue_name(p)
-                info[p] = await client.llen(queue_name)
+            priorities = self._priorities()
+            async with client.pipeline(transaction=False) as pipe:
+                for p in priorities:
+                    pipe.get(f"{self.QUEUE_PREFIX}:{p}:size")
+                    pipe.scard(f"{self.QUEUE_PREFIX}:{p}:active")
+                pipe.zcard(f"{self.QUEUE_PREFIX}:scheduled")
+                pipe.zcard(f"{self.QUEUE_PREFIX}:leases")
+                pipe.hlen(f"{self.QUEUE_PREFIX}:dead")
+                *results, scheduled, processing, dead = await pipe.execute()
+
+            info = {p: int(results[2 * i] or 0) for i, p in enumerate(priorities)}
             info["total"] = sum(info.values())
+            info["clients"] = sum(results[1::2])
+            info["scheduled"] = scheduled
+            info["processing"] = processing
+            info["dead"] = dead
             return info
         except Exception as e:
             logger.error(f"Get queue info error: {e}")
             return {}
 
 
+def _create_queue_service() -> QueueService:
+    """Build the queue backend selected by ``settings.queue_backend``."""
+    if settings.queue_backend == "streams":
+        from backend.services.stream_queue_service import StreamQueueService
+
+        return StreamQueueService()
+    return QueueService()
+
+
 # Global queue service instance
-queue_service = QueueService()
+queue_service = _create_queue_service()
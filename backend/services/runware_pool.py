@@ -0,0 +1,225 @@
+"""Pool of Runware websocket connections with least-loaded dispatch."""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from runware import Runware
+
+from backend.core.config import settings
+from backend.core.resilience import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+
+class NoConnectionError(OverloadedError):
+    """Raised when no pool member has an open websocket."""
+
+
+class PooledConnection:
+    """One Runware client and its load counters."""
+
+    def __init__(self, index: int, client: Runware):
+        self.index = index
+        self.client = client
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.reconnects = 0
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the websocket is open."""
+        try:
+            return self.client.connected()
+        except Exception:
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters for this connection."""
+        return {
+            "index": self.index,
+            "connected": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+        }
+
+
+class RunwarePool:
+    """
+    Fixed-size set of Runware clients.
+
+    Each call goes to the open connection with the fewest requests in
+    flight. A background task reconnects members whose websocket closed.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        size: int = settings.runware_pool_size,
+        health_interval: float = settings.runware_pool_health_interval,
+        client_factory: Callable[[str], Runware] = lambda api_key: Runware(api_key=api_key),
+    ):
+        """
+        Initialize connection pool.
+
+        Args:
+            api_key: Runware API key
+            size: Number of connections
+            health_interval: Seconds between health checks
+            client_factory: Creates a client for an API key
+        """
+        self.api_key = api_key
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self.client_factory = client_factory
+        self.connections: List[PooledConnection] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._reconnecting: Dict[int, asyncio.Task] = {}
+
+    async def start(self) -> int:
+        """
+        Open all connections and start health checks.
+
+        Returns:
+            Number of connections that connected
+        """
+        self.connections = [
+            PooledConnection(index, self.client_factory(self.api_key)) for index in range(self.size)
+        ]
+        results = await asyncio.gather(
+            *(connection.client.connect() for connection in self.connections),
+            return_exceptions=True,
+        )
+        for connection, result in zip(self.connections, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"Runware connection {connection.index} failed to connect: {result}")
+
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._run_health_checks())
+
+        connected = sum(1 for connection in self.connections if connection.healthy)
+        logger.info(f"Runware pool started ({connected}/{self.size} connections open)")
+        return connected
+
+    async def close(self):
+        """Stop health checks and disconnect every member."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        for task in self._reconnecting.values():
+            task.cancel()
+        self._reconnecting.clear()
+
+        for connection in self.connections:
+            try:
+                await connection.client.disconnect()
+            except Exception as e:
+                logger.warning(f"Error disconnecting Runware connection {connection.index}: {e}")
+        self.connections = []
+        logger.info("Runware pool closed")
+
+    def least_loaded(self, exclude: Optional[PooledConnection] = None) -> PooledConnection:
+        """
+        Pick the open connection with the fewest requests in flight.
+
+        Args:
+            exclude: Connection to avoid if another one is open
+
+        Returns:
+            Chosen connection
+
+        Raises:
+            NoConnectionError: If no connection is open
+        """
+        candidates = [connection for connection in self.connections if connection.healthy]
+        if exclude is not None and len(candidates) > 1:
+            candidates = [connection for connection in candidates if connection is not exclude]
+
+        if not candidates:
+            for connection in self.connections:
+                self._schedule_reconnect(connection)
+            raise NoConnectionError("No Runware connection available")
+
+        return min(candidates, key=lambda connection: (connection.in_flight, connection.requests))
+
+    @asynccontextmanager
+    async def acquire(self, exclude: Optional[PooledConnection] = None) -> AsyncIterator[PooledConnection]:
+        """
+        Borrow the least-loaded connection for one request.
+
+        Args:
+            exclude: Connection to avoid if another one is open
+
+        Yields:
+            Connection to send the request on
+        """
+        connection = self.least_loaded(exclude)
+        connection.in_flight += 1
+        connection.requests += 1
+        try:
+            yield connection
+        except Exception:
+            connection.failures += 1
+            if not connection.healthy:
+                self._schedule_reconnect(connection)
+            raise
+        finally:
+            connection.in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with pool size, open count and per-connection counters
+        """
+        connections = [connection.get_stats() for connection in self.connections]
+        return {
+            "size": self.size,
+            "connected": sum(1 for connection in connections if connection["connected"]),
+            "in_flight": sum(connection["in_flight"] for connection in connections),
+            "connections": connections,
+        }
+
+    def _schedule_reconnect(self, connection: PooledConnection):
+        """Reconnect a member in the background unless already in progress."""
+        task = self._reconnecting.get(connection.index)
+        if task is None or task.done():
+            self._reconnecting[connection.index] = asyncio.create_task(self._reconnect(connection))
+
+    async def _reconnect(self, connection: PooledConnection):
+        """Replace a dead member's client with a freshly connected one."""
+        # Let requests already sent on the old socket fail on their own
+        client = self.client_factory(self.api_key)
+        try:
+            await client.connect()
+        except Exception as e:
+            logger.error(f"Runware connection {connection.index} reconnect failed: {e}")
+            return
+
+        old_client, connection.client = connection.client, client
+        connection.reconnects += 1
+        logger.info(f"Runware connection {connection.index} reconnected")
+
+        try:
+            await old_client.disconnect()
+        except Exception:
+            pass
+
+    async def _run_health_checks(self):
+        """Periodically reconnect members whose websocket is closed."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for connection in self.connections:
+                if not connection.healthy:
+                    logger.warning(f"Runware connection {connection.index} is down, reconnecting")
+                    self._schedule_reconnect(connection)
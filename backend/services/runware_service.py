@@ -1,19 +1,62 @@
 """Runware SDK service wrapper for image and video generation."""
 
 import asyncio
+import dataclasses
+import functools
 import logging
-from pathlib import Path
+import time
 from typing import Optional, Dict, Any, Callable
-from datetime import datetime
 
-from runware import Runware, IImageInference
+import aiofiles.os
+from runware import IImageInference, RunwareAPIError
 
 from backend.core.config import settings
+from backend.core.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    Hedger,
+    OverloadedError,
+    RetryPolicy,
+    RetryRule,
+)
 from backend.services.cache_service import cache_service
+from backend.services.download_manager import DownloadedFile, DownloadManager
+from backend.services.inflight_service import inflight_service
+from backend.services.runware_pool import NoConnectionError, PooledConnection, RunwarePool
+from backend.services.source_image_service import source_image_service
+from backend.services.storage_service import storage_service
 
 logger = logging.getLogger(__name__)
 
 
+def _is_service_failure(error: BaseException) -> bool:
+    """
+    Decide whether an error says something about Runware's health.
+
+    Rejected parameters are the caller's mistake and shed calls never
+    reached Runware, so neither should shrink the limit or open the circuit.
+    """
+    if isinstance(error, OverloadedError):
+        return False
+    if isinstance(error, RunwareAPIError):
+        return not str(error.code or "").startswith(("invalid", "missing", "unsupported"))
+    return True
+
+
+# First matching rule wins; anything unmatched is not retried
+_RETRY_RULES = [
+    # Shed calls must stay shed, or retries would defeat the breaker and limiter
+    RetryRule((CircuitOpenError,), retry=False),
+    # Never reached Runware; a member is usually back after a reconnect
+    RetryRule((NoConnectionError,), retry=True),
+    RetryRule((OverloadedError,), retry=False),
+    RetryRule((RunwareAPIError,), retry=False, when=lambda e: not _is_service_failure(e)),
+    # Runware may already have run the request
+    RetryRule((RunwareAPIError, asyncio.TimeoutError, ConnectionError), retry=True, idempotent_only=True),
+]
+
+
 class RunwareService:
     """Service wrapper for Runware SDK operations."""
 
@@ -25,18 +68,42 @@ class RunwareService:
             api_key: Runware API key
         """
         self.api_key = api_key
-        self.runware: Optional[Runware] = None
+        self.pool: Optional[RunwarePool] = None
+        self.downloads = DownloadManager()
+        self.limiter = AdaptiveLimiter(
+            initial_limit=settings.runware_limit_initial,
+            min_limit=settings.runware_limit_min,
+            max_limit=settings.runware_limit_max,
+            latency_target=settings.runware_latency_target,
+            queue_timeout=settings.runware_queue_timeout,
+            is_failure=_is_service_failure,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.runware_breaker_failures,
+            reset_timeout=settings.runware_breaker_reset,
+            is_failure=_is_service_failure,
+        )
+        self.retry_policy = RetryPolicy(
+            rules=_RETRY_RULES,
+            max_attempts=settings.runware_retry_attempts,
+            base_delay=settings.runware_retry_base_delay,
+            max_delay=settings.runware_retry_max_delay,
+        )
+        self.hedger = Hedger(budget=settings.runware_hedge_budget)
         self._initialized = False
 
     async def initialize(self):
-        """Initialize Runware client connection."""
+        """Initialize the pool of Runware client connections."""
         if not self._initialized:
             # Only initialize if we have a valid API key
             if self.api_key and self.api_key.strip():
                 try:
                     logger.info(f"Attempting to connect to Runware with API key: {self.api_key[:10]}...")
-                    self.runware = Runware(api_key=self.api_key)
-                    await self.runware.connect()
+                    self.pool = RunwarePool(api_key=self.api_key)
+                    if not await self.pool.start():
+                        await self.pool.close()
+                        self.pool = None
+                        raise Exception("No Runware connection could be opened")
                     self._initialized = True
                     logger.info("Runware service initialized successfully")
                 except Exception as e:
@@ -51,13 +118,151 @@ class RunwareService:
                 self._initialized = False
 
     async def close(self):
-        """Close Runware client connection."""
-        if self._initialized and self.runware:
-            # Runware SDK doesn't have a close method in current version
-            # Just mark as not initialized
+        """Close Runware client connections."""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+        if self._initialized:
             self._initialized = False
             logger.info("Runware service closed")
 
+        await self.downloads.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool, load shedding, retry and hedging state.
+
+        Returns:
+            Dictionary with "pool", "limiter", "circuit_breaker", "retry"
+            and "hedging" sections
+        """
+        if self.pool is None:
+            pool = {"size": 0, "connected": 0, "in_flight": 0, "connections": []}
+        else:
+            pool = self.pool.get_stats()
+        return {
+            "pool": pool,
+            "limiter": self.limiter.get_stats(),
+            "circuit_breaker": self.breaker.get_stats(),
+            "retry": self.retry_policy.get_stats(),
+            "hedging": self.hedger.get_stats(),
+        }
+
+    async def _infer(self, request_params: IImageInference, idempotent: bool = False) -> list:
+        """
+        Send an inference request, retrying and hedging as configured.
+
+        Args:
+            request_params: Runware inference request
+            idempotent: Whether a duplicate call cannot change the outcome
+                (a fixed seed reproduces the same image)
+
+        Returns:
+            Images returned by Runware
+
+        Raises:
+            OverloadedError: If the call was shed (circuit open or no slot)
+        """
+        return await self.retry_policy.call(
+            lambda: self._infer_hedged(request_params),
+            idempotent=idempotent,
+        )
+
+    async def _infer_hedged(self, request_params: IImageInference) -> list:
+        """
+        Make one attempt, duplicating it on another connection if it runs slow.
+
+        Args:
+            request_params: Runware inference request
+
+        Returns:
+            Images from whichever request succeeded first
+        """
+        delay = self.hedger.delay()
+        if delay is None:
+            return await self._infer_once(request_params)
+
+        primary_connection: Dict[str, PooledConnection] = {}
+        primary = asyncio.create_task(self._infer_once(request_params, used=primary_connection))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self.hedger.try_acquire():
+                return await primary
+
+            logger.info(f"Inference exceeded {delay:.1f}s, sending hedged request")
+            hedge = asyncio.create_task(
+                self._infer_once(request_params, exclude=primary_connection.get("connection"))
+            )
+            pending.add(hedge)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedger.record_win()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Release the loser's connection and limiter slot before returning
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _infer_once(
+        self,
+        request_params: IImageInference,
+        exclude: Optional[PooledConnection] = None,
+        used: Optional[Dict[str, PooledConnection]] = None,
+    ) -> list:
+        """
+        Send one inference request on the least-loaded connection.
+
+        Calls fail fast while the circuit is open and wait for a slot under
+        the adaptive concurrency limit otherwise.
+
+        Args:
+            request_params: Runware inference request
+            exclude: Connection to avoid, e.g. the one a hedged request is on
+            used: Receives the chosen connection under "connection"
+
+        Returns:
+            Images returned by Runware
+        """
+        # The SDK assigns a taskUUID in place; every attempt needs its own
+        request = dataclasses.replace(request_params, taskUUID=None)
+
+        async with self.breaker.guard(), self.limiter.acquire():
+            async with self.pool.acquire(exclude) as connection:
+                if used is not None:
+                    used["connection"] = connection
+                start = time.monotonic()
+                images = await asyncio.wait_for(
+                    connection.client.imageInference(requestImage=request),
+                    timeout=settings.runware_request_timeout,
+                )
+                self.hedger.record(time.monotonic() - start)
+                return images
+
+    async def _upload_image(self, path: str) -> str:
+        """
+        Upload a local image on the least-loaded connection.
+
+        Args:
+            path: Local file path
+
+        Returns:
+            Runware image UUID
+        """
+        async with self.pool.acquire() as connection:
+            uploaded = await connection.client.uploadImage(path)
+        return uploaded.imageUUID
+
     async def update_api_key(self, api_key: str):
         """Update API key and reinitialize if needed."""
         self.api_key = api_key
@@ -125,14 +330,58 @@ class RunwareService:
             "negative_prompt": negative_prompt,
         }
 
-        if use_cache:
-            cached_result = await cache_service.get_generation("text-to-image", prompt, params)
+        # Same key for lookup, store and coalescing; None when seed is random
+        cache_key = cache_service.build_generation_key("text-to-image", prompt, params)
+
+        if use_cache and cache_key:
+            cached_result = await self._cached(cache_key)
             if cached_result:
                 if progress_callback:
                     progress_callback(100.0, "Retrieved from cache")
                 logger.info("Returning cached result for text-to-image generation")
                 return cached_result
 
+        async def generate(callback: Optional[Callable[[float, str], None]]):
+            return await self._generate_text_to_image(
+                prompt=prompt,
+                negative_prompt=negative_prompt,
+                width=width,
+                height=height,
+                steps=steps,
+                guidance_scale=guidance_scale,
+                seed=seed,
+                model=model,
+                num_images=num_images,
+                progress_callback=callback,
+                cache_key=cache_key if use_cache else None,
+            )
+
+        # Random seeds make every request unique; only fixed seeds can be shared
+        if cache_key is None:
+            return await generate(progress_callback)
+
+        return await inflight_service.run(
+            key=cache_key,
+            factory=generate,
+            progress_callback=progress_callback,
+            lookup=lambda: self._cached(cache_key),
+        )
+
+    async def _generate_text_to_image(
+        self,
+        prompt: str,
+        negative_prompt: Optional[str],
+        width: int,
+        height: int,
+        steps: int,
+        guidance_scale: float,
+        seed: Optional[int],
+        model: Optional[str],
+        num_images: int,
+        progress_callback: Optional[Callable[[float, str], None]],
+        cache_key: Optional[str],
+    ) -> list[Dict[str, Any]]:
+        """Call Runware for a text-to-image request and cache the results under cache_key."""
         try:
             if progress_callback:
                 progress_callback(10.0, "Preparing generation request...")
@@ -140,7 +389,7 @@ class RunwareService:
             # Prepare request parameters
             params = {
                 "positivePrompt": prompt,
-                "model": model or "runware:100@1",
+                "model": model or settings.default_model,
                 "width": width,
                 "height": height,
                 "numberResults": num_images,
@@ -160,23 +409,30 @@ class RunwareService:
                 progress_callback(20.0, "Sending request to Runware...")
 
             # Generate images
-            images = await self.runware.imageInference(requestImage=request_params)
+            images = await self._infer(request_params, idempotent=seed is not None)
 
             if progress_callback:
                 progress_callback(80.0, "Processing results...")
 
-            # Process results
-            results = []
-            for idx, image in enumerate(images):
-                # Save image locally
-                output_path = await self._save_image(
-                    image_url=image.imageURL,
-                    prefix=f"txt2img_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{idx}",
+            # Save all images locally in parallel
+            stored_files = await asyncio.gather(*(
+                self._save_image(image_url=image.imageURL) for image in images
+            ), return_exceptions=True)
+            errors = [stored for stored in stored_files if isinstance(stored, BaseException)]
+            if errors:
+                # Unpin the images that did arrive, the generation fails without them
+                await storage_service.release_pins(
+                    stored.sha256 for stored in stored_files if not isinstance(stored, BaseException)
                 )
+                raise errors[0]
 
+            # Process results
+            results = []
+            for image, stored in zip(images, stored_files, strict=True):
                 result = {
                     "image_url": image.imageURL,
-                    "output_path": str(output_path),
+                    "output_path": str(stored.path),
+                    "sha256": stored.sha256,
                     "seed": image.seed if hasattr(image, "seed") else seed,
                     "width": width,
                     "height": height,
@@ -190,8 +446,8 @@ class RunwareService:
 
             logger.info(f"Generated {len(results)} images successfully")
 
-            if use_cache:
-                await cache_service.set_generation("text-to-image", prompt, params, results)
+            if cache_key:
+                await cache_service.set(cache_key, results)
 
             return results
 
@@ -232,18 +488,96 @@ class RunwareService:
         """
         await self.ensure_initialized()
 
+        if progress_callback:
+            progress_callback(5.0, "Preparing source image...")
+
+        try:
+            source = await source_image_service.resolve(image_url, self._upload_image, self.downloads)
+        except Exception as e:
+            logger.error(f"Image-to-image source upload failed: {str(e)}")
+            if progress_callback:
+                progress_callback(0.0, f"Error: {str(e)}")
+            raise
+
+        params = {
+            "source_sha256": source.sha256,
+            "strength": strength,
+            "steps": steps,
+            "guidance_scale": guidance_scale,
+            "seed": seed,
+            "model": model,
+            "negative_prompt": negative_prompt,
+        }
+        cache_key = cache_service.build_generation_key("image-to-image", prompt, params)
+
+        if cache_key:
+            cached_result = await self._cached(cache_key)
+            if cached_result:
+                if progress_callback:
+                    progress_callback(100.0, "Retrieved from cache")
+                logger.info("Returning cached result for image-to-image generation")
+                return cached_result
+
+        request = functools.partial(
+            self._generate_image_to_image,
+            prompt=prompt,
+            negative_prompt=negative_prompt,
+            strength=strength,
+            steps=steps,
+            guidance_scale=guidance_scale,
+            seed=seed,
+            model=model,
+            cache_key=cache_key,
+        )
+
+        async def generate(callback: Optional[Callable[[float, str], None]]):
+            nonlocal source
+            try:
+                return await request(image_uuid=source.image_uuid, progress_callback=callback)
+            except RunwareAPIError:
+                if not source.cached:
+                    raise
+                # The remembered upload may have expired on Runware's side
+                await source_image_service.forget(source.sha256)
+                source = await source_image_service.resolve(image_url, self._upload_image, self.downloads)
+                return await request(image_uuid=source.image_uuid, progress_callback=callback)
+
+        if cache_key is None:
+            return await generate(progress_callback)
+
+        return await inflight_service.run(
+            key=cache_key,
+            factory=generate,
+            progress_callback=progress_callback,
+            lookup=lambda: self._cached(cache_key),
+        )
+
+    async def _generate_image_to_image(
+        self,
+        prompt: str,
+        image_uuid: str,
+        negative_prompt: Optional[str],
+        strength: float,
+        steps: int,
+        guidance_scale: float,
+        seed: Optional[int],
+        model: Optional[str],
+        progress_callback: Optional[Callable[[float, str], None]],
+        cache_key: Optional[str],
+    ) -> Dict[str, Any]:
+        """Call Runware for an image-to-image request and cache the result under cache_key."""
         try:
             if progress_callback:
                 progress_callback(10.0, "Preparing image-to-image generation...")
 
-            # Prepare request with image URL
+            # Prepare request with the uploaded source image
             params = {
                 "positivePrompt": prompt,
-                "model": model or "runware:100@1",
+                "model": model or settings.default_model,
                 "numberResults": 1,
                 "steps": steps,
                 "CFGScale": guidance_scale,
-                "imageInitiator": image_url,
+                "seedImage": image_uuid,
                 "strength": strength,
             }
 
@@ -258,20 +592,18 @@ class RunwareService:
             if progress_callback:
                 progress_callback(30.0, "Sending request to Runware...")
 
-            images = await self.runware.imageInference(requestImage=request_params)
+            images = await self._infer(request_params, idempotent=seed is not None)
 
             if progress_callback:
                 progress_callback(80.0, "Processing result...")
 
             image = images[0]
-            output_path = await self._save_image(
-                image_url=image.imageURL,
-                prefix=f"img2img_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            )
+            stored = await self._save_image(image_url=image.imageURL)
 
             result = {
                 "image_url": image.imageURL,
-                "output_path": str(output_path),
+                "output_path": str(stored.path),
+                "sha256": stored.sha256,
                 "seed": image.seed if hasattr(image, "seed") else seed,
                 "strength": strength,
                 "steps": steps,
@@ -282,6 +614,10 @@ class RunwareService:
                 progress_callback(100.0, "Generation complete!")
 
             logger.info("Image-to-image generation completed successfully")
+
+            if cache_key:
+                await cache_service.set(cache_key, result)
+
             return result
 
         except Exception as e:
@@ -328,37 +664,44 @@ class RunwareService:
                 progress_callback(0.0, f"Error: {str(e)}")
             raise
 
-    async def _save_image(self, image_url: str, prefix: str = "image") -> Path:
+    async def _cached(self, cache_key: str) -> Optional[Any]:
+        """
+        Get a cached result whose stored files still exist.
+
+        Files are deleted with the last generation referencing them, while
+        cached results pointing at them may live on; such entries are dropped.
+
+        Args:
+            cache_key: Result cache key
+
+        Returns:
+            Cached result, or None on a miss or a stale entry
+        """
+        result = await cache_service.get(cache_key)
+        if not result:
+            return None
+
+        for entry in result if isinstance(result, list) else [result]:
+            if not await aiofiles.os.path.exists(entry["output_path"]):
+                logger.info(f"Cached result for {cache_key} points at a deleted file, discarding it")
+                await cache_service.delete(cache_key)
+                return None
+        return result
+
+    async def _save_image(self, image_url: str, ext: str = ".png") -> DownloadedFile:
         """
-        Download and save image locally.
+        Download and save image into content-addressed storage.
 
         Args:
             image_url: URL of the image to download
-            prefix: Filename prefix
+            ext: File extension including the dot
 
         Returns:
-            Path to saved image file
+            DownloadedFile with the stored object path and its SHA-256
         """
-        import aiohttp
-
-        # Ensure storage directory exists
-        settings.storage_path.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename
-        filename = f"{prefix}.png"
-        output_path = settings.storage_path / filename
-
-        # Download image
-        async with aiohttp.ClientSession() as session:
-            async with session.get(image_url) as response:
-                if response.status == 200:
-                    with open(output_path, "wb") as f:
-                        f.write(await response.read())
-                    logger.info(f"Image saved to {output_path}")
-                else:
-                    raise Exception(f"Failed to download image: HTTP {response.status}")
-
-        return output_path
+        temp_path = await storage_service.temp_path(ext)
+        downloaded = await self.downloads.download(image_url, temp_path)
+        return await storage_service.ingest(downloaded)
 
 
 # Global service instance
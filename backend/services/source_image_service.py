@@ -0,0 +1,159 @@
+"""Registry of source images already uploaded to Runware."""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import aiofiles
+import aiofiles.os
+
+from backend.core.config import settings
+from backend.core.redis_client import redis_client
+from backend.services.download_manager import DownloadManager
+from backend.services.inflight_service import inflight_service
+from backend.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceImage:
+    """A source image resolved to its content hash and Runware image UUID."""
+
+    sha256: str
+    image_uuid: str
+    cached: bool
+
+
+class SourceImageService:
+    """
+    Uploads each distinct source image to Runware once.
+
+    Sources are identified by content hash, so the same picture referenced
+    by different paths or URLs shares one upload. A URL is fetched and
+    hashed every time rather than trusted as an identity, since the image
+    behind it may change; only the upload is skipped.
+    """
+
+    IMAGE_PREFIX = "source:image"
+
+    def __init__(self, ttl: int = settings.source_image_ttl):
+        """
+        Initialize source image registry.
+
+        Args:
+            ttl: Seconds an uploaded image UUID is reused
+        """
+        self.ttl = ttl
+        self._stats = {"hits": 0, "uploads": 0}
+
+    def get_stats(self) -> dict:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dictionary with reuse and upload counts
+        """
+        return dict(self._stats)
+
+    async def resolve(
+        self,
+        image_ref: str,
+        upload_image: Callable[[str], Awaitable[str]],
+        downloads: DownloadManager,
+    ) -> SourceImage:
+        """
+        Get a Runware image UUID for a local path or URL, uploading if needed.
+
+        Args:
+            image_ref: Local file path or http(s) URL
+            upload_image: Uploads a local file to Runware and returns its image UUID
+            downloads: Download manager used to fetch remote sources
+
+        Returns:
+            SourceImage with content hash and image UUID
+        """
+        temp_path: Optional[Path] = None
+
+        try:
+            if await aiofiles.os.path.exists(image_ref):
+                local_path = Path(image_ref)
+                sha256 = await self._hash_file(local_path)
+            elif image_ref.startswith(("http://", "https://")):
+                temp_path = await storage_service.temp_path(Path(image_ref.split("?")[0]).suffix or ".png")
+                downloaded = await downloads.download(image_ref, temp_path)
+                sha256 = downloaded.sha256
+                local_path = temp_path
+            else:
+                raise ValueError(f"Source image not found: {image_ref}")
+
+            image_uuid = await self._get(self._image_key(sha256))
+            if image_uuid is not None:
+                self._stats["hits"] += 1
+                logger.info(f"Reusing uploaded source image {sha256[:12]}")
+                return SourceImage(sha256=sha256, image_uuid=image_uuid, cached=True)
+
+            async def upload(_progress):
+                image_uuid = await upload_image(str(local_path))
+                self._stats["uploads"] += 1
+                await self._set(self._image_key(sha256), image_uuid)
+                logger.info(f"Uploaded source image {sha256[:12]} as {image_uuid}")
+                return image_uuid
+
+            image_uuid = await inflight_service.run(
+                key=self._image_key(sha256),
+                factory=upload,
+                lookup=lambda: self._get(self._image_key(sha256)),
+            )
+            return SourceImage(sha256=sha256, image_uuid=image_uuid, cached=False)
+        finally:
+            if temp_path is not None:
+                try:
+                    await aiofiles.os.remove(temp_path)
+                except OSError:
+                    pass
+
+    async def forget(self, sha256: str):
+        """
+        Drop a remembered upload, e.g. after Runware rejected the UUID.
+
+        Args:
+            sha256: Content hash of the source image
+        """
+        try:
+            await redis_client.client.delete(self._image_key(sha256))
+        except Exception as e:
+            logger.error(f"Source image forget error: {e}")
+
+    def _image_key(self, sha256: str) -> str:
+        """Redis key holding the image UUID for a content hash."""
+        return f"{self.IMAGE_PREFIX}:{sha256}"
+
+    async def _hash_file(self, path: Path) -> str:
+        """Hash a local file in chunks without blocking the loop."""
+        digest = hashlib.sha256()
+        async with aiofiles.open(path, "rb") as f:
+            while chunk := await f.read(settings.download_chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    async def _get(self, key: str) -> Optional[str]:
+        """Read a registry entry, treating Redis errors as a miss."""
+        try:
+            return await redis_client.client.get(key)
+        except Exception as e:
+            logger.error(f"Source image lookup error: {e}")
+            return None
+
+    async def _set(self, key: str, value: str):
+        """Write a registry entry with the registry TTL."""
+        try:
+            await redis_client.client.setex(key, self.ttl, value)
+        except Exception as e:
+            logger.error(f"Source image store error: {e}")
+
+
+# Global source image registry instance
+source_image_service = SourceImageService()
@@ -0,0 +1,258 @@
+"""Content-addressed storage for generated media."""
+
+import logging
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import aiofiles.os
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.database import AsyncSessionLocal, StoredObject
+from backend.services.download_manager import DownloadedFile
+
+logger = logging.getLogger(__name__)
+
+
+class StorageService:
+    """
+    Stores files under their SHA-256 with reference counts in the database.
+
+    Ingesting a file takes a reference in the same transaction that records
+    the object, so it cannot be reclaimed before a generation points at it.
+    That reference is held as a pin until claim_references hands it to the
+    first generation completing with the file, or dropped by release_pins
+    when its generation fails.
+    """
+
+    OBJECTS_DIR = "objects"
+    TEMP_DIR = "tmp"
+    TOMBSTONE_SUFFIX = ".deleting"
+
+    def __init__(self, root: Path = settings.storage_path):
+        """
+        Initialize storage service.
+
+        Args:
+            root: Storage root directory
+        """
+        self.root = root
+        self._pins: Counter = Counter()
+
+    def object_path(self, sha256: str, ext: str = ".png") -> Path:
+        """
+        Get the sharded path for a content hash.
+
+        Files live at ``objects/ab/cd/abcd....ext`` so no directory holds
+        more than a few hundred entries even with millions of objects.
+
+        Args:
+            sha256: Hex SHA-256 of the content
+            ext: File extension including the dot
+
+        Returns:
+            Absolute object path
+        """
+        return self.root / self.OBJECTS_DIR / sha256[:2] / sha256[2:4] / f"{sha256}{ext}"
+
+    async def temp_path(self, ext: str = ".png") -> Path:
+        """
+        Get a unique temporary path inside the storage root.
+
+        Temporary files share the filesystem with objects so ingesting
+        them is an atomic rename.
+
+        Args:
+            ext: File extension including the dot
+
+        Returns:
+            Path that does not exist yet
+        """
+        temp_dir = self.root / self.TEMP_DIR
+        await aiofiles.os.makedirs(temp_dir, exist_ok=True)
+        return temp_dir / f"{uuid.uuid4().hex}{ext}"
+
+    async def ingest(self, downloaded: DownloadedFile) -> DownloadedFile:
+        """
+        Move a downloaded temp file to its content-addressed location and pin it.
+
+        Identical content already in the store is kept and the temp file is
+        discarded, so duplicates cost no extra disk space.
+
+        Args:
+            downloaded: Temp file with its size and checksum
+
+        Returns:
+            DownloadedFile pointing at the object path
+        """
+        target = self.object_path(downloaded.sha256, downloaded.path.suffix)
+
+        # Reference first: once committed, release_references leaves the file alone
+        async with AsyncSessionLocal() as session:
+            existed = await self._increment(session, downloaded.sha256, 1)
+            if not existed:
+                session.add(
+                    StoredObject(
+                        sha256=downloaded.sha256,
+                        path=str(target),
+                        size=downloaded.size,
+                        ref_count=1,
+                    )
+                )
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Another task ingested the same content concurrently
+                await session.rollback()
+                await self._increment(session, downloaded.sha256, 1)
+                await session.commit()
+        self._pins[downloaded.sha256] += 1
+
+        if await aiofiles.os.path.exists(target):
+            await aiofiles.os.remove(downloaded.path)
+            logger.info(f"Deduplicated stored object {downloaded.sha256[:12]}")
+        else:
+            await aiofiles.os.makedirs(target.parent, exist_ok=True)
+            await aiofiles.os.replace(downloaded.path, target)
+
+        return DownloadedFile(path=target, size=downloaded.size, sha256=downloaded.sha256)
+
+    @staticmethod
+    async def _increment(session: AsyncSession, sha256: str, count: int) -> bool:
+        """Adjust an object's reference count; returns False if it has no row."""
+        result = await session.execute(
+            update(StoredObject)
+            .where(StoredObject.sha256 == sha256)
+            .values(ref_count=StoredObject.ref_count + count)
+        )
+        return result.rowcount > 0
+
+    async def claim_references(self, hashes: Iterable[str]):
+        """
+        Record that a completed generation references the given objects.
+
+        Pins left by ingest become the generation's references; objects
+        without a pin (cached or shared results) get a new reference.
+
+        Args:
+            hashes: Object hashes (repeat a hash to add several references)
+        """
+        unpinned = []
+        for sha256 in hashes:
+            if self._pins[sha256] > 0:
+                self._pins[sha256] -= 1
+            else:
+                unpinned.append(sha256)
+        self._pins += Counter()  # Drop exhausted entries
+        await self.add_references(unpinned)
+
+    async def release_pins(self, hashes: Iterable[str]) -> int:
+        """
+        Drop the pins of a failed generation along with their references.
+
+        Hashes without a pin (already claimed, or never ingested by this
+        process) are skipped, so the references other generations hold
+        are left alone.
+
+        Args:
+            hashes: Object hashes returned by ingest
+
+        Returns:
+            Number of files removed from disk
+        """
+        pinned = []
+        for sha256 in hashes:
+            if self._pins[sha256] > 0:
+                self._pins[sha256] -= 1
+                pinned.append(sha256)
+        self._pins += Counter()  # Drop exhausted entries
+        return await self.release_references(pinned)
+
+    async def add_references(self, hashes: Iterable[str]):
+        """
+        Record that a generation references the given objects.
+
+        Args:
+            hashes: Object hashes (repeat a hash to add several references)
+        """
+        counts = Counter(hashes)
+        if not counts:
+            return
+
+        async with AsyncSessionLocal() as session:
+            for sha256, count in counts.items():
+                await self._increment(session, sha256, count)
+            await session.commit()
+
+    async def release_references(self, hashes: Iterable[str]) -> int:
+        """
+        Drop references and delete objects nobody references anymore.
+
+        Args:
+            hashes: Object hashes previously passed to add_references
+
+        Returns:
+            Number of files removed from disk
+        """
+        counts = Counter(hashes)
+        if not counts:
+            return 0
+
+        async with AsyncSessionLocal() as session:
+            for sha256, count in counts.items():
+                await self._increment(session, sha256, -count)
+
+            result = await session.execute(
+                select(StoredObject).where(
+                    StoredObject.sha256.in_(list(counts)),
+                    StoredObject.ref_count <= 0,
+                )
+            )
+            orphans = list(result.scalars().all())
+            for stored in orphans:
+                await session.delete(stored)
+            await session.commit()
+
+        removed = 0
+        for stored in orphans:
+            if await self._remove_object(stored):
+                removed += 1
+
+        if removed:
+            logger.info(f"Reclaimed {removed} unreferenced stored objects")
+        return removed
+
+
+    async def _remove_object(self, stored: StoredObject) -> bool:
+        """
+        Delete an unreferenced object's file unless it was ingested again meanwhile.
+
+        The file is first moved aside, then the row is checked once more: a
+        concurrent ingest commits its row before placing the file, so either
+        the row is seen and the file is restored, or the ingest places the
+        file after it was deleted.
+
+        Returns:
+            True if the file was deleted
+        """
+        tombstone = f"{stored.path}{self.TOMBSTONE_SUFFIX}"
+        try:
+            await aiofiles.os.replace(stored.path, tombstone)
+        except FileNotFoundError:
+            return False
+
+        async with AsyncSessionLocal() as session:
+            revived = await session.get(StoredObject, stored.sha256) is not None
+        if revived:
+            await aiofiles.os.replace(tombstone, stored.path)
+            return False
+
+        await aiofiles.os.remove(tombstone)
+        return True
+
+# Global storage service instance
+storage_service = StorageService()
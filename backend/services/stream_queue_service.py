@@ -0,0 +1,701 @@
+"""Queue service backed by Redis Streams consumer groups."""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from redis.commands.core import AsyncScript
+from redis.exceptions import ResponseError
+
+from backend.core.codec import codec
+from backend.core.redis_client import redis_client
+from backend.services.queue_service import QueueService
+
+logger = logging.getLogger(__name__)
+
+# Each priority is one stream read by a single consumer group, so Redis
+# itself tracks which consumer holds which entry (the pending entries list)
+# and how often it was delivered. Entries carry the task ID and payload;
+# the index hash maps each queued or scheduled task ID to "priority|entry"
+# ("priority|" while scheduled), and acked or cancelled entries are XDEL'd
+# so the streams only hold live work. The size counters track entries not
+# yet delivered to the group. Tasks due later wait in the scheduled sorted
+# set with their payload in the delayed hash until the dequeue script
+# appends them to their stream.
+
+# Move a pending entry to the dead-letter hash
+_BURY_LUA = """
+local function bury(prefix, group, stream, entry, task_id, payload)
+    redis.call('HSET', prefix .. ':dead', task_id, payload)
+    redis.call('XACK', stream, group, entry)
+    redis.call('XDEL', stream, entry)
+    redis.call('HDEL', prefix .. ':index', task_id)
+end
+"""
+
+# ARGV: prefix, priority, now, run_at, then (task_id, payload) pairs
+_ENQUEUE_SCRIPT = """
+local prefix, priority = ARGV[1], ARGV[2]
+local now, run_at = tonumber(ARGV[3]), tonumber(ARGV[4])
+local stream = prefix .. ':' .. priority
+
+for i = 5, #ARGV, 2 do
+    local task_id, payload = ARGV[i], ARGV[i + 1]
+    if run_at > now then
+        redis.call('HSET', prefix .. ':delayed', task_id, payload)
+        redis.call('ZADD', prefix .. ':scheduled', run_at, task_id)
+        redis.call('HSET', prefix .. ':index', task_id, priority .. '|')
+    else
+        local entry = redis.call('XADD', stream, '*', 'task_id', task_id, 'payload', payload)
+        redis.call('HSET', prefix .. ':index', task_id, priority .. '|' .. entry)
+        redis.call('INCR', stream .. ':size')
+    end
+end
+return (#ARGV - 4) / 2
+"""
+
+# ARGV: prefix, group, consumer, now, min_idle_ms, max_attempts, promote_batch, priorities...
+# Returns {payload, attempt}, or {'', next_run or '', last entry ID per priority...} when idle
+_DEQUEUE_SCRIPT = _BURY_LUA + """
+local prefix, group, consumer = ARGV[1], ARGV[2], ARGV[3]
+local now, min_idle, max_attempts = tonumber(ARGV[4]), tonumber(ARGV[5]), tonumber(ARGV[6])
+local index = prefix .. ':index'
+
+-- Append due scheduled tasks to their priority's stream
+local due = redis.call('ZRANGEBYSCORE', prefix .. ':scheduled', '-inf', now, 'LIMIT', 0, tonumber(ARGV[7]))
+for _, task_id in ipairs(due) do
+    redis.call('ZREM', prefix .. ':scheduled', task_id)
+    local payload = redis.call('HGET', prefix .. ':delayed', task_id)
+    local location = redis.call('HGET', index, task_id)
+    redis.call('HDEL', prefix .. ':delayed', task_id)
+    if payload and location then
+        local priority = string.match(location, '^([^|]*)|')
+        local stream = prefix .. ':' .. priority
+        local entry = redis.call('XADD', stream, '*', 'task_id', task_id, 'payload', payload)
+        redis.call('HSET', index, task_id, priority .. '|' .. entry)
+        redis.call('INCR', stream .. ':size')
+    end
+end
+
+-- Take over an entry whose consumer stopped renewing it
+for i = 8, #ARGV do
+    local stream = prefix .. ':' .. ARGV[i]
+    local entry = redis.call('XAUTOCLAIM', stream, group, consumer, min_idle, '0-0', 'COUNT', 1)[2][1]
+    if entry then
+        if not entry[2] then
+            -- Deleted while pending
+            redis.call('XACK', stream, group, entry[1])
+        else
+            local task_id, payload = entry[2][2], entry[2][4]
+            local attempt = redis.call('XPENDING', stream, group, entry[1], entry[1], 1)[1][4]
+            if attempt <= max_attempts then
+                return {payload, attempt}
+            end
+            -- Claimed before the reaper saw it: dead-letter it and let reap() report it
+            bury(prefix, group, stream, entry[1], task_id, payload)
+            redis.call('RPUSH', prefix .. ':dead:unreported', task_id)
+        end
+    end
+end
+
+-- Then deliver new entries, highest priority first
+for i = 8, #ARGV do
+    local stream = prefix .. ':' .. ARGV[i]
+    local reply = redis.call('XREADGROUP', 'GROUP', group, consumer, 'COUNT', 1, 'STREAMS', stream, '>')
+    if reply and reply[1] then
+        -- {{stream, entries}}, which some servers flatten for a single stream
+        local entries = type(reply[1]) == 'table' and reply[1][2] or reply[2]
+        local entry = entries[1]
+        if entry then
+            redis.call('DECR', stream .. ':size')
+            return {entry[2][4], 1}
+        end
+    end
+end
+
+-- Idle: report when the next scheduled task is due and where each stream
+-- ends, so the caller can block for entries added after this point
+local next_run = redis.call('ZRANGE', prefix .. ':scheduled', 0, 0, 'WITHSCORES')
+local idle = {'', next_run[2] or ''}
+for i = 8, #ARGV do
+    local last = redis.call('XREVRANGE', prefix .. ':' .. ARGV[i], '+', '-', 'COUNT', 1)[1]
+    idle[#idle + 1] = last and last[1] or '0-0'
+end
+return idle
+"""
+
+# ARGV: prefix, group, task_id
+_ACK_SCRIPT = """
+local prefix, group, task_id = ARGV[1], ARGV[2], ARGV[3]
+local location = redis.call('HGET', prefix .. ':index', task_id)
+if not location then
+    return 0
+end
+local priority, entry = string.match(location, '^([^|]*)|(.*)$')
+if entry == '' then
+    return 0
+end
+local stream = prefix .. ':' .. priority
+local acked = redis.call('XACK', stream, group, entry)
+redis.call('XDEL', stream, entry)
+redis.call('HDEL', prefix .. ':index', task_id)
+return acked
+"""
+
+# ARGV: prefix, group, consumer, task_ids...
+_HEARTBEAT_SCRIPT = """
+local prefix, group, consumer = ARGV[1], ARGV[2], ARGV[3]
+local renewed = 0
+for i = 4, #ARGV do
+    local location = redis.call('HGET', prefix .. ':index', ARGV[i])
+    if location then
+        local priority, entry = string.match(location, '^([^|]*)|(.*)$')
+        local stream = prefix .. ':' .. priority
+        local pending = entry ~= '' and redis.call('XPENDING', stream, group, entry, entry, 1)[1]
+        -- Never take an entry back from a consumer that already claimed it
+        if pending and pending[2] == consumer then
+            redis.call('XCLAIM', stream, group, consumer, 0, entry, 'JUSTID')
+            renewed = renewed + 1
+        end
+    end
+end
+return renewed
+"""
+
+# ARGV: prefix, group, min_idle_ms, max_attempts, limit, priorities...
+# Returns {idle task IDs left for XAUTOCLAIM, dead-lettered task IDs}
+_REAP_SCRIPT = _BURY_LUA + """
+local prefix, group = ARGV[1], ARGV[2]
+local min_idle, max_attempts, limit = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local requeued, dead = {}, {}
+
+for i = 6, #ARGV do
+    local stream = prefix .. ':' .. ARGV[i]
+    for _, item in ipairs(redis.call('XPENDING', stream, group, 'IDLE', min_idle, '-', '+', limit)) do
+        local entry = redis.call('XRANGE', stream, item[1], item[1])[1]
+        if not entry then
+            redis.call('XACK', stream, group, item[1])
+        elseif item[4] >= max_attempts then
+            bury(prefix, group, stream, item[1], entry[2][2], entry[2][4])
+            table.insert(dead, entry[2][2])
+        else
+            table.insert(requeued, entry[2][2])
+        end
+    end
+end
+
+for _, task_id in ipairs(redis.call('LRANGE', prefix .. ':dead:unreported', 0, -1)) do
+    table.insert(dead, task_id)
+end
+redis.call('DEL', prefix .. ':dead:unreported')
+return {requeued, dead}
+"""
+
+# ARGV: prefix, group, priorities...
+_CLEAR_SCRIPT = """
+local prefix, group = ARGV[1], ARGV[2]
+local index = prefix .. ':index'
+local removed = 0
+local cleared = {}
+
+for i = 3, #ARGV do
+    local stream = prefix .. ':' .. ARGV[i]
+    cleared[ARGV[i]] = true
+    -- Entries leased to a consumer stay until acked
+    local leased = {}
+    local count = redis.call('XPENDING', stream, group)[1]
+    if count > 0 then
+        for _, item in ipairs(redis.call('XPENDING', stream, group, '-', '+', count)) do
+            leased[item[1]] = true
+        end
+    end
+    for _, entry in ipairs(redis.call('XRANGE', stream, '-', '+')) do
+        if not leased[entry[1]] then
+            redis.call('XDEL', stream, entry[1])
+            redis.call('HDEL', index, entry[2][2])
+            removed = removed + 1
+        end
+    end
+    redis.call('SET', stream .. ':size', 0)
+end
+
+for _, task_id in ipairs(redis.call('ZRANGE', prefix .. ':scheduled', 0, -1)) do
+    local location = redis.call('HGET', index, task_id)
+    if not location or cleared[string.match(location, '^([^|]*)|')] then
+        redis.call('ZREM', prefix .. ':scheduled', task_id)
+        redis.call('HDEL', prefix .. ':delayed', task_id)
+        redis.call('HDEL', index, task_id)
+        removed = removed + 1
+    end
+end
+return removed
+"""
+
+# ARGV: prefix, group, task_id, priority ('' for any)
+_REMOVE_SCRIPT = """
+local prefix, group, task_id = ARGV[1], ARGV[2], ARGV[3]
+local index = prefix .. ':index'
+local location = redis.call('HGET', index, task_id)
+if not location then
+    return nil
+end
+local priority, entry = string.match(location, '^([^|]*)|(.*)$')
+if ARGV[4] ~= '' and ARGV[4] ~= priority then
+    return nil
+end
+
+if entry == '' then
+    redis.call('ZREM', prefix .. ':scheduled', task_id)
+    redis.call('HDEL', prefix .. ':delayed', task_id)
+else
+    local stream = prefix .. ':' .. priority
+    if redis.call('XPENDING', stream, group, entry, entry, 1)[1] then
+        return nil
+    end
+    if redis.call('XDEL', stream, entry) == 1 then
+        redis.call('DECR', stream .. ':size')
+    end
+end
+redis.call('HDEL', index, task_id)
+return priority
+"""
+
+# ARGV: prefix, group, task_id, priorities... (highest first)
+_LOOKUP_SCRIPT = """
+local prefix, group, task_id = ARGV[1], ARGV[2], ARGV[3]
+local location = redis.call('HGET', prefix .. ':index', task_id)
+if not location then
+    if redis.call('HEXISTS', prefix .. ':dead', task_id) == 1 then
+        return {'dead'}
+    end
+    return nil
+end
+local priority, entry = string.match(location, '^([^|]*)|(.*)$')
+if entry == '' then
+    return {
+        'scheduled', priority, redis.call('HGET', prefix .. ':delayed', task_id),
+        redis.call('ZSCORE', prefix .. ':scheduled', task_id),
+    }
+end
+
+local stream = prefix .. ':' .. priority
+local payload = redis.call('XRANGE', stream, entry, entry)[1][2][4]
+local pending = redis.call('XPENDING', stream, group, entry, entry, 1)[1]
+if pending then
+    return {'processing', priority, payload, pending[2], pending[4], pending[3]}
+end
+
+-- Delivered entries always precede undelivered ones, and every delivered
+-- entry still in the stream is pending
+local position = #redis.call('XRANGE', stream, '-', '(' .. entry) - redis.call('XPENDING', stream, group)[1]
+for i = 4, #ARGV do
+    if ARGV[i] == priority then
+        break
+    end
+    position = position + tonumber(redis.call('GET', prefix .. ':' .. ARGV[i] .. ':size') or 0)
+end
+return {'queued', priority, payload, position}
+"""
+
+
+class StreamQueueService(QueueService):
+    """
+    Generation queue on Redis Streams.
+
+    Same API as the list-based queue, selected with
+    ``queue_backend = "streams"``. Every priority is a stream consumed by
+    one consumer group: workers read new entries with XREADGROUP and ack
+    them with XACK, and an entry whose consumer stops heartbeating for
+    ``visibility_timeout`` is taken over by the next dequeue with
+    XAUTOCLAIM, or dead-lettered after ``max_attempts`` deliveries. The
+    pending entries list makes the work held by each consumer visible in
+    ``get_queue_info``.
+
+    Tasks within a priority are served in arrival order: the fairness
+    settings (``quantum``, ``aging_seconds``, client weights) and the
+    redelivery backoff only apply to the list backend.
+    """
+
+    QUEUE_PREFIX = "queue:stream"
+    GROUP = "workers"
+
+    def __init__(self, *args, **kwargs):
+        """Initialize queue service; takes the same arguments as QueueService."""
+        super().__init__(*args, **kwargs)
+        self._ack_script: Optional[AsyncScript] = None
+        self._heartbeat_script: Optional[AsyncScript] = None
+
+    async def initialize(self):
+        """Initialize queue service and create the consumer groups."""
+        if not self._initialized:
+            await redis_client.initialize()
+            client = redis_client.binary_client
+            self._enqueue_script = client.register_script(_ENQUEUE_SCRIPT)
+            self._dequeue_script = client.register_script(_DEQUEUE_SCRIPT)
+            self._ack_script = client.register_script(_ACK_SCRIPT)
+            self._heartbeat_script = client.register_script(_HEARTBEAT_SCRIPT)
+            self._reap_script = client.register_script(_REAP_SCRIPT)
+            self._clear_script = client.register_script(_CLEAR_SCRIPT)
+            self._remove_script = client.register_script(_REMOVE_SCRIPT)
+            self._lookup_script = client.register_script(_LOOKUP_SCRIPT)
+            for priority in self._priorities():
+                try:
+                    await client.xgroup_create(self._stream(priority), self.GROUP, id="0", mkstream=True)
+                except ResponseError as e:
+                    if "BUSYGROUP" not in str(e):
+                        raise
+            self._initialized = True
+
+    def _stream(self, priority: str) -> str:
+        """Stream key for a priority."""
+        return f"{self.QUEUE_PREFIX}:{priority}"
+
+    async def set_client_weight(self, client_id: str, weight: float) -> bool:
+        """
+        Client weights only apply to the list backend.
+
+        Returns:
+            False
+        """
+        logger.warning("Client weights are not supported by the streams queue backend")
+        return False
+
+    async def enqueue_many(
+        self,
+        tasks: List[Tuple[int, str, Dict[str, Any]]],
+        priority: str = "normal",
+        client_id: str = QueueService.DEFAULT_CLIENT,
+        run_at: Optional[float] = None,
+        delay: Optional[float] = None,
+    ) -> bool:
+        """
+        Append several generation tasks to a priority's stream in a single round trip.
+
+        Args:
+            tasks: (task_id, generation_type, params) tuples
+            priority: Task priority (high, normal, low)
+            client_id: Client that submitted the tasks
+            run_at: Unix time before which the tasks are not served
+            delay: Seconds from now before which the tasks are not served
+
+        Returns:
+            True if all tasks were enqueued
+        """
+        if not tasks:
+            return True
+
+        try:
+            now = time.time()
+            if delay:
+                run_at = max(run_at or 0, now + delay)
+            args: List[Any] = [self.QUEUE_PREFIX, priority, now, run_at or 0]
+            for task_id, generation_type, params in tasks:
+                args.extend([task_id, codec.encode({
+                    "task_id": task_id,
+                    "generation_type": generation_type,
+                    "params": params,
+                    "priority": priority,
+                    "client_id": client_id,
+                })])
+
+            await self._enqueue_script(args=args, client=redis_client.binary_client)
+            if run_at and run_at > now:
+                logger.info(f"Scheduled {len(tasks)} tasks to {priority} stream in {run_at - now:.0f}s")
+            elif len(tasks) > 1:
+                logger.info(f"Enqueued {len(tasks)} tasks to {priority} stream for {client_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Enqueue error: {e}")
+            return False
+
+    async def dequeue(
+        self,
+        timeout: int = 5,
+        priorities: Optional[list[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Dequeue the next task, taking over abandoned entries first.
+
+        The entry stays in the group's pending list until it is acked.
+        Entries are only ever taken by the dequeue script, one at a time
+        in priority order; while idle the consumer waits with a plain
+        XREAD, which consumes nothing, and tries again once any stream
+        grows.
+
+        Args:
+            timeout: Wait timeout in seconds
+            priorities: Priority order (default: high, normal, low)
+
+        Returns:
+            Task data (with its delivery ``attempt``) or None if no task available
+
+        Raises:
+            Exception: If Redis is unreachable, so callers can back off
+        """
+        priorities = priorities or self._priorities()
+
+        try:
+            client = redis_client.binary_client
+            args = [
+                self.QUEUE_PREFIX, self.GROUP, self.consumer_id, 0,
+                int(self.visibility_timeout * 1000), self.max_attempts,
+                self.promote_batch, *priorities,
+            ]
+            deadline = time.monotonic() + timeout
+
+            while True:
+                args[3] = time.time()
+                result = await self._dequeue_script(args=args, client=client)
+
+                if result[0]:
+                    task_data = codec.decode(result[0])
+                    task_data["attempt"] = result[1]
+                    logger.info(f"Dequeued task {task_data['task_id']} (attempt {result[1]})")
+                    return task_data
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if result[1]:
+                    # Nothing ready yet: wake up when the next scheduled task is due
+                    remaining = min(remaining, max(0.05, float(result[1]) - time.time()))
+
+                # Blocking reads cannot run inside a script; wait for entries
+                # appended after the ones the script saw, then let it pick
+                await client.xread(
+                    {self._stream(p): last for p, last in zip(priorities, result[2:], strict=True)},
+                    count=1, block=max(1, int(remaining * 1000)),
+                )
+        except Exception as e:
+            logger.error(f"Dequeue error: {e}")
+            raise
+
+    async def ack(self, task_id: int) -> bool:
+        """
+        Acknowledge a dequeued task and delete its entry.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            True if the entry was still pending
+        """
+        try:
+            acked = await self._ack_script(
+                args=[self.QUEUE_PREFIX, self.GROUP, task_id],
+                client=redis_client.binary_client,
+            )
+            return bool(acked)
+        except Exception as e:
+            logger.error(f"Ack error: {e}")
+            return False
+
+    async def heartbeat(self, task_ids: List[int]) -> bool:
+        """
+        Reset the idle time of entries this consumer is still working on.
+
+        Args:
+            task_ids: IDs of tasks this consumer is handling
+
+        Returns:
+            True if the entries were renewed
+        """
+        if not task_ids:
+            return True
+
+        try:
+            await self._heartbeat_script(
+                args=[self.QUEUE_PREFIX, self.GROUP, self.consumer_id, *task_ids],
+                client=redis_client.binary_client,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Heartbeat error: {e}")
+            return False
+
+    async def reap(self, limit: int = 100) -> Tuple[List[int], List[Dict[str, Any]]]:
+        """
+        Dead-letter idle entries that used up their attempts.
+
+        Idle entries with attempts left stay pending and are claimed by the
+        next dequeue.
+
+        Args:
+            limit: Maximum pending entries to inspect per priority
+
+        Returns:
+            Tuple of (idle task IDs awaiting redelivery, dead-lettered task payloads)
+        """
+        try:
+            client = redis_client.binary_client
+            requeued, dead = await self._reap_script(
+                args=[
+                    self.QUEUE_PREFIX, self.GROUP, int(self.visibility_timeout * 1000),
+                    self.max_attempts, limit, *self._priorities(),
+                ],
+                client=client,
+            )
+            requeued = [int(task_id) for task_id in requeued]
+            dead_tasks = []
+            if dead:
+                payloads = await client.hmget(f"{self.QUEUE_PREFIX}:dead", dead)
+                dead_tasks = [codec.decode(payload) for payload in payloads if payload is not None]
+
+            if requeued:
+                logger.warning(f"{len(requeued)} abandoned tasks awaiting redelivery: {requeued}")
+            for task in dead_tasks:
+                logger.error(f"Task {task['task_id']} dead-lettered after {self.max_attempts} attempts")
+            return requeued, dead_tasks
+        except Exception as e:
+            logger.error(f"Reap error: {e}")
+            return [], []
+
+    async def known_task_ids(self, task_ids: List[int]) -> Optional[Set[int]]:
+        """
+        Find which tasks are queued, scheduled or pending.
+
+        Args:
+            task_ids: Task IDs to check
+
+        Returns:
+            Subset of task_ids the queue still holds, or None on error
+        """
+        if not task_ids:
+            return set()
+
+        try:
+            locations = await redis_client.binary_client.hmget(f"{self.QUEUE_PREFIX}:index", task_ids)
+            return {task_id for task_id, location in zip(task_ids, locations, strict=True) if location is not None}
+        except Exception as e:
+            logger.error(f"Known task lookup error: {e}")
+            return None
+
+    async def clear(self, priority: Optional[str] = None) -> int:
+        """
+        Delete undelivered and scheduled entries; pending ones stay until acked.
+
+        Args:
+            priority: Specific priority stream to clear (None for all)
+
+        Returns:
+            Number of tasks removed
+        """
+        try:
+            total = await self._clear_script(
+                args=[self.QUEUE_PREFIX, self.GROUP, *self._priorities(priority)],
+                client=redis_client.binary_client,
+            )
+            logger.info(f"Cleared {total} tasks from queue")
+            return total
+        except Exception as e:
+            logger.error(f"Clear queue error: {e}")
+            return 0
+
+    async def remove_task(self, task_id: int, priority: Optional[str] = None) -> bool:
+        """
+        Remove a task that has not been delivered yet.
+
+        Args:
+            task_id: Task ID to remove
+            priority: Only remove it from this priority (None for any)
+
+        Returns:
+            True if task was found and removed
+        """
+        try:
+            removed_from = await self._remove_script(
+                args=[self.QUEUE_PREFIX, self.GROUP, task_id, priority or ""],
+                client=redis_client.binary_client,
+            )
+            if removed_from is None:
+                return False
+            logger.info(f"Removed task {task_id} from {removed_from.decode()} stream")
+            return True
+        except Exception as e:
+            logger.error(f"Remove task error: {e}")
+            return False
+
+    async def get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up where a task is in a single round trip.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Task state (queued with position, scheduled, processing or dead), or None if unknown
+        """
+        try:
+            result = await self._lookup_script(
+                args=[self.QUEUE_PREFIX, self.GROUP, task_id, *self._priorities()],
+                client=redis_client.binary_client,
+            )
+        except Exception as e:
+            logger.error(f"Get task error: {e}")
+            return None
+
+        if result is None:
+            return None
+
+        state = result[0].decode()
+        task: Dict[str, Any] = {"task_id": task_id, "state": state}
+        if state == "dead":
+            return task
+
+        task.update(priority=result[1].decode(), client_id=codec.decode(result[2])["client_id"])
+        if state == "queued":
+            task["position"] = result[3]
+        elif state == "scheduled":
+            task.update(run_at=float(result[3]), runs_in=round(max(0.0, float(result[3]) - time.time()), 1))
+        elif state == "processing":
+            task.update(
+                consumer=result[3].decode(),
+                attempt=int(result[4]),
+                lease_expires_in=round(max(0.0, self.visibility_timeout - result[5] / 1000), 1),
+            )
+        return task
+
+    async def get_queue_info(self) -> Dict[str, Any]:
+        """
+        Get information about all streams and their pending entries.
+
+        Returns:
+            Dictionary with queue lengths, scheduled, pending and dead-lettered
+            tasks, and per priority the group's lag and each consumer's
+            pending count and oldest idle time
+        """
+        try:
+            client = redis_client.client
+            priorities = self._priorities()
+            async with client.pipeline(transaction=False) as pipe:
+                for p in priorities:
+                    pipe.get(f"{self._stream(p)}:size")
+                    pipe.xpending_range(self._stream(p), self.GROUP, "-", "+", 1000)
+                pipe.zcard(f"{self.QUEUE_PREFIX}:scheduled")
+                pipe.hlen(f"{self.QUEUE_PREFIX}:dead")
+                *results, scheduled, dead = await pipe.execute()
+
+            info: Dict[str, Any] = {p: int(results[2 * i] or 0) for i, p in enumerate(priorities)}
+            info["total"] = sum(info.values())
+            info["scheduled"] = scheduled
+            info["processing"] = sum(len(pending) for pending in results[1::2])
+            info["dead"] = dead
+            info["backend"] = "streams"
+
+            streams = {}
+            for i, p in enumerate(priorities):
+                consumers: Dict[str, Dict[str, int]] = {}
+                for entry in results[2 * i + 1]:
+                    consumer = consumers.setdefault(entry["consumer"], {"pending": 0, "oldest_idle_ms": 0})
+                    consumer["pending"] += 1
+                    consumer["oldest_idle_ms"] = max(consumer["oldest_idle_ms"], entry["time_since_delivered"])
+                streams[p] = {
+                    "lag": info[p],
+                    "pending": len(results[2 * i + 1]),
+                    "consumers": consumers,
+                }
+            info["streams"] = streams
+            return info
+        except Exception as e:
+            logger.error(f"Get queue info error: {e}")
+            return {}
@@ -0,0 +1,235 @@
+"""WebSocket hub fanning generation progress out to connected clients."""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from backend.services.pubsub_service import PubSubService, pubsub_service
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_TYPES = ("complete", "error")
+
+
+class WebSocketHub:
+    """
+    Routes progress messages to the WebSockets following each generation.
+
+    A socket may follow many generations and a generation may be followed
+    by many sockets. Messages arrive through Redis Pub/Sub, so a socket
+    connected to any API process sees progress published by workers
+    anywhere. The hub subscribes each generation once, on behalf of all
+    its local followers, into a single inbound queue drained by one task.
+
+    A broadcast serializes the message once and queues the same text on
+    every follower's outbox; each socket is written by its own sender, so
+    a slow client only delays itself. An outbox that falls
+    ``SEND_QUEUE_SIZE`` messages behind loses its oldest ones. Followers
+    of a generation are released after its complete or error message.
+    """
+
+    SEND_QUEUE_SIZE = 256
+    MAX_FOLLOWS = 100
+
+    def __init__(self, pubsub: PubSubService = pubsub_service):
+        """
+        Initialize WebSocket hub.
+
+        Args:
+            pubsub: Subscriber delivering progress messages from Redis
+        """
+        self.pubsub = pubsub
+        self._outboxes: Dict[WebSocket, asyncio.Queue] = {}
+        self._follows: Dict[WebSocket, Set[int]] = {}
+        self._followers: Dict[int, Set[WebSocket]] = {}
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._pump: Optional[asyncio.Task] = None
+        self.broadcasts = 0
+        self.dropped = 0
+
+    async def connect(self, websocket: WebSocket):
+        """
+        Accept and register a WebSocket connection.
+
+        Args:
+            websocket: WebSocket connection
+        """
+        await websocket.accept()
+        self._outboxes[websocket] = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
+        self._follows[websocket] = set()
+
+    async def disconnect(self, websocket: WebSocket):
+        """
+        Forget a WebSocket and every generation it follows.
+
+        Args:
+            websocket: WebSocket connection
+        """
+        for generation_id in list(self._follows.get(websocket, ())):
+            await self.unfollow(websocket, generation_id)
+        self._follows.pop(websocket, None)
+        self._outboxes.pop(websocket, None)
+
+    async def follow(self, websocket: WebSocket, generation_id: int) -> bool:
+        """
+        Start sending a generation's messages to a WebSocket.
+
+        Args:
+            websocket: Connected WebSocket
+            generation_id: Generation ID
+
+        Returns:
+            True if the socket now follows the generation, False if it is
+            not connected or already follows MAX_FOLLOWS generations
+        """
+        follows = self._follows.get(websocket)
+        if follows is None:
+            return False
+        if generation_id in follows:
+            return True
+        if len(follows) >= self.MAX_FOLLOWS:
+            return False
+
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._drain())
+
+        follows.add(generation_id)
+        followers = self._followers.setdefault(generation_id, set())
+        followers.add(websocket)
+        if len(followers) == 1:
+            await self.pubsub.subscribe(generation_id, queue=self._inbox)
+        return True
+
+    async def unfollow(self, websocket: WebSocket, generation_id: int):
+        """
+        Stop sending a generation's messages to a WebSocket.
+
+        Args:
+            websocket: WebSocket connection
+            generation_id: Generation ID
+        """
+        self._follows.get(websocket, set()).discard(generation_id)
+        followers = self._followers.get(generation_id)
+        if followers is None:
+            return
+
+        followers.discard(websocket)
+        if not followers:
+            del self._followers[generation_id]
+            await self.pubsub.unsubscribe(generation_id, self._inbox)
+
+    def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """
+        Queue a message for one WebSocket.
+
+        Args:
+            websocket: WebSocket connection
+            message: JSON-compatible message
+        """
+        outbox = self._outboxes.get(websocket)
+        if outbox is not None:
+            self._put(outbox, json.dumps(message, default=str))
+
+    async def broadcast(self, generation_id: int, message: Dict[str, Any]) -> int:
+        """
+        Queue a message for every local follower of a generation.
+
+        Used for messages arriving from Pub/Sub, and directly when they
+        could not be published.
+
+        Args:
+            generation_id: Generation ID
+            message: JSON-compatible message
+
+        Returns:
+            Number of WebSockets the message was queued for
+        """
+        followers = self._followers.get(generation_id)
+        if not followers:
+            return 0
+
+        text = json.dumps(message, default=str)
+        for websocket in followers:
+            self._put(self._outboxes[websocket], text)
+        self.broadcasts += 1
+        sent = len(followers)
+
+        if message.get("type") in TERMINAL_TYPES:
+            # Nothing follows a terminal message: release the subscription
+            for websocket in followers:
+                self._follows[websocket].discard(generation_id)
+            del self._followers[generation_id]
+            await self.pubsub.unsubscribe(generation_id, self._inbox)
+        return sent
+
+    def _put(self, outbox: asyncio.Queue, text: str):
+        """Queue text on an outbox, dropping its oldest message when full."""
+        if outbox.full():
+            outbox.get_nowait()
+            self.dropped += 1
+        outbox.put_nowait(text)
+
+    async def _drain(self):
+        """Broadcast messages arriving from Pub/Sub."""
+        while True:
+            message = await self._inbox.get()
+            try:
+                await self.broadcast(int(message["generation_id"]), message)
+            except Exception as e:
+                logger.error(f"Error broadcasting message: {e}")
+
+    async def serve(self, websocket: WebSocket):
+        """
+        Write a WebSocket's queued messages until it fails or is cancelled.
+
+        Args:
+            websocket: Connected WebSocket
+        """
+        outbox = self._outboxes.get(websocket)
+        if outbox is None:
+            return
+        try:
+            while True:
+                await websocket.send_text(await outbox.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"WebSocket send failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hub statistics.
+
+        Returns:
+            Dictionary with connected sockets, followed generations, follows and message counters
+        """
+        return {
+            "sockets": len(self._outboxes),
+            "generations": len(self._followers),
+            "follows": sum(len(follows) for follows in self._follows.values()),
+            "broadcasts": self.broadcasts,
+            "dropped": self.dropped,
+        }
+
+    async def cleanup(self):
+        """Stop forwarding messages and forget every connection."""
+        if self._pump is not None:
+            self._pump.cancel()
+            try:
+                await self._pump
+            except asyncio.CancelledError:
+                pass
+            self._pump = None
+        for generation_id in list(self._followers):
+            await self.pubsub.unsubscribe(generation_id, self._inbox)
+        self._followers.clear()
+        self._follows.clear()
+        self._outboxes.clear()
+        logger.info("WebSocket hub cleaned up")
+
+
+# Global WebSocket hub instance
+websocket_hub = WebSocketHub()
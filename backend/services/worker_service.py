@@ -0,0 +1,443 @@
+"""Worker service that drains the generation queue with bounded concurrency."""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from backend.api.schemas import GenerationResponse
+from backend.core.config import settings
+from backend.models.database import Generation
+from backend.models.repository import generation_repository
+from backend.services.batch_service import batch_service
+from backend.services.generation_writer import generation_writer
+from backend.services.progress_channel import progress_channel
+from backend.services.queue_service import queue_service
+from backend.services.runware_service import runware_service
+from backend.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerService:
+    """
+    Consumes queued generation tasks and runs them against Runware.
+
+    Tasks are acked once handled. While they run, their leases are renewed
+    by a heartbeat; the same maintenance loop re-queues tasks abandoned by
+    crashed workers and fails the generations of dead-lettered ones.
+    """
+
+    def __init__(self, concurrency: int = settings.max_concurrent_generations):
+        """
+        Initialize worker service.
+
+        Args:
+            concurrency: Maximum number of generations processed at once
+        """
+        self.concurrency = max(1, concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._maintenance: Optional[asyncio.Task] = None
+        self._active: Set[asyncio.Task] = set()
+        self._leased: Set[int] = set()
+        self._running = False
+        self._handlers: Dict[str, Callable[[int, Dict[str, Any]], Awaitable[bool]]] = {
+            "text-to-image": self._run_text_to_image,
+            "image-to-image": self._run_image_to_image,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the dequeue loop is running."""
+        return self._running
+
+    async def start(self):
+        """Start the dequeue loop in the background."""
+        if self._running:
+            return
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._running = True
+        self._runner = asyncio.create_task(self._run())
+        self._maintenance = asyncio.create_task(self._maintain())
+        logger.info(f"Worker started with concurrency {self.concurrency}")
+
+    async def stop(self, timeout: float = settings.worker_shutdown_timeout):
+        """
+        Stop dequeuing and wait for in-flight generations.
+
+        Args:
+            timeout: Seconds to wait for in-flight generations before cancelling them
+        """
+        if not self._running:
+            return
+
+        self._running = False
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+        if self._active:
+            logger.info(f"Waiting for {len(self._active)} in-flight generations...")
+            _, pending = await asyncio.wait(self._active, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        # Heartbeats keep running while in-flight generations finish
+        if self._maintenance:
+            self._maintenance.cancel()
+            try:
+                await self._maintenance
+            except asyncio.CancelledError:
+                pass
+            self._maintenance = None
+
+        logger.info("Worker stopped")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get worker status.
+
+        Returns:
+            Dictionary with running flag, concurrency limit and active task count
+        """
+        return {
+            "running": self._running,
+            "concurrency": self.concurrency,
+            "active": len(self._active),
+        }
+
+    async def _run(self):
+        """Dequeue tasks while a concurrency slot is available, backing off while the queue is down."""
+        failures = 0
+        while self._running:
+            await self._semaphore.acquire()
+            try:
+                task_data = await queue_service.dequeue(timeout=settings.worker_poll_timeout)
+            except asyncio.CancelledError:
+                self._semaphore.release()
+                raise
+            except Exception:
+                self._semaphore.release()
+                failures += 1
+                delay = self._backoff(failures)
+                logger.warning(f"Queue unavailable ({failures} failures in a row), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            failures = 0
+            if task_data is None:
+                self._semaphore.release()
+                continue
+
+            task = asyncio.create_task(self._process(task_data))
+            self._active.add(task)
+            task.add_done_callback(self._on_task_done)
+
+    @staticmethod
+    def _backoff(failures: int) -> float:
+        """Jittered exponential delay after consecutive dequeue failures."""
+        delay = min(settings.worker_backoff_max, settings.worker_backoff_base * 2 ** (failures - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _on_task_done(self, task: asyncio.Task):
+        """Release the concurrency slot held by a finished task."""
+        self._active.discard(task)
+        self._semaphore.release()
+
+    async def _process(self, task_data: Dict[str, Any]):
+        """
+        Run a single dequeued task and ack it.
+
+        The task is only acked once the generation's buffered updates are
+        committed, so a crash in between leads to redelivery rather than
+        a finished generation that recovery would mark failed. A task
+        interrupted by shutdown is not acked either; its lease expires and
+        another worker picks it up.
+
+        Args:
+            task_data: Task payload produced by QueueService.enqueue
+        """
+        generation_id = task_data["task_id"]
+        params = task_data["params"]
+        self._leased.add(generation_id)
+
+        try:
+            succeeded = await self._handle(generation_id, task_data["generation_type"], params)
+            # Keep the lease renewed until the result is durable
+            durable = await generation_writer.commit(generation_id)
+        finally:
+            self._leased.discard(generation_id)
+
+        if not durable:
+            logger.error(f"Generation {generation_id} state was not saved, leaving it for redelivery")
+            return
+
+        if params.get("batch_id"):
+            await batch_service.record(params["batch_id"], generation_id, succeeded)
+        await queue_service.ack(generation_id)
+
+    async def _handle(self, generation_id: int, generation_type: str, params: Dict[str, Any]) -> bool:
+        """
+        Run the handler for a generation type.
+
+        Args:
+            generation_id: Generation ID
+            generation_type: Generation type the handler is registered for
+            params: Generation parameters
+
+        Returns:
+            True if the generation succeeded, False if it failed or has no handler
+        """
+        handler = self._handlers.get(generation_type)
+        try:
+            if handler is None:
+                logger.error(f"No handler for generation type {generation_type} (ID: {generation_id})")
+                return False
+            return await handler(generation_id, params)
+        except asyncio.CancelledError:
+            logger.warning(f"Generation {generation_id} interrupted, leaving it for redelivery")
+            raise
+        except Exception as e:
+            logger.error(f"Unhandled worker error (ID: {generation_id}): {e}", exc_info=True)
+            return False
+
+    async def _maintain(self):
+        """Recover orphaned work, then renew leases and reap expired ones."""
+        await self.recover()
+
+        interval = min(queue_service.visibility_timeout / 3, settings.queue_reap_interval)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await queue_service.heartbeat(list(self._leased))
+                await self._reap()
+            except Exception as e:
+                logger.error(f"Queue maintenance error: {e}")
+
+    async def _reap(self):
+        """Re-queue abandoned tasks and fail the generations of dead-lettered ones."""
+        _, dead = await queue_service.reap()
+        for task_data in dead:
+            generation_id = task_data["task_id"]
+            error = f"Abandoned after {queue_service.max_attempts} delivery attempts"
+            await generation_writer.commit(
+                generation_id,
+                status="failed",
+                error_message=error,
+                completed_at=datetime.utcnow(),
+            )
+            await progress_channel.error(generation_id, error)
+            if task_data["params"].get("batch_id"):
+                await batch_service.record(task_data["params"]["batch_id"], generation_id, False)
+
+    async def recover(self) -> List[int]:
+        """
+        Reconcile generations left behind by crashed processes.
+
+        Expired leases are re-queued first. Generations still pending or
+        processing after a full visibility timeout whose task the queue no
+        longer holds can never finish and are marked failed.
+
+        Returns:
+            IDs of generations marked failed
+        """
+        try:
+            await self._reap()
+            cutoff = datetime.utcnow() - timedelta(seconds=queue_service.visibility_timeout)
+            stale = await generation_repository.list_ids_by_status(["pending", "processing"], cutoff)
+
+            known = await queue_service.known_task_ids(stale)
+            if known is None:
+                return []
+
+            orphaned = [generation_id for generation_id in stale if generation_id not in known]
+            if orphaned:
+                await generation_repository.update_many(
+                    orphaned,
+                    status="failed",
+                    error_message="Interrupted before completion, please retry",
+                    completed_at=datetime.utcnow(),
+                )
+                logger.warning(f"Marked {len(orphaned)} orphaned generations as failed: {orphaned}")
+            return orphaned
+        except Exception as e:
+            logger.error(f"Recovery error: {e}")
+            return []
+
+    def _progress_callback(self, generation_id: int) -> Callable[[float, str], None]:
+        """Build a progress callback for the Runware service."""
+        return lambda p, m: progress_channel.progress(generation_id, p, m)
+
+    async def _complete(self, generation: Generation, **fields: Any) -> Dict[str, Any]:
+        """
+        Persist a generation's completion and build its response payload.
+
+        Args:
+            generation: Detached snapshot loaded when the task started
+            **fields: Result columns to persist
+
+        Returns:
+            Completion data for WebSocket and Pub/Sub subscribers
+
+        Raises:
+            RuntimeError: If the completed row could not be written
+        """
+        # Reference stored outputs before the row points at them
+        hashes = fields.get("output_hashes") or []
+        await storage_service.claim_references(hashes)
+
+        fields.update(status="completed", completed_at=datetime.utcnow())
+        # Commit before announcing, so clients reacting to "complete" read the finished row
+        if not await generation_writer.commit(generation.id, **fields):
+            await storage_service.release_references(hashes)
+            raise RuntimeError("Failed to save the generation result")
+
+        for name, value in fields.items():
+            setattr(generation, name, value)
+        return GenerationResponse.from_orm(generation).dict()
+
+    async def _run_text_to_image(self, generation_id: int, params: Dict[str, Any]) -> bool:
+        """
+        Run a text-to-image generation.
+
+        Returns:
+            True if the generation completed
+        """
+        generation = await generation_repository.get(generation_id)
+        if generation is None:
+            logger.warning(f"Generation {generation_id} no longer exists, skipping")
+            return False
+        if generation.status in ("completed", "failed"):
+            logger.info(f"Generation {generation_id} already {generation.status}, skipping redelivery")
+            return generation.status == "completed"
+
+        generation_writer.update(generation_id, status="processing")
+        output_hashes: List[str] = []
+
+        try:
+            logger.info(f"Starting text-to-image generation (ID: {generation_id})")
+            progress_channel.progress(generation_id, 10.0, "Initializing...")
+
+            results = await runware_service.text_to_image(
+                prompt=params["prompt"],
+                negative_prompt=params.get("negative_prompt"),
+                width=params["width"],
+                height=params["height"],
+                steps=params["steps"],
+                guidance_scale=params["guidance_scale"],
+                seed=params.get("seed"),
+                model=params.get("model"),
+                num_images=params["num_images"],
+                progress_callback=self._progress_callback(generation_id),
+            )
+
+            first_result = results[0]
+
+            output_hashes = [r["sha256"] for r in results if r.get("sha256")]
+            # _complete claims the pins, or releases them if it fails
+            hashes, output_hashes = output_hashes, []
+            completion_data = await self._complete(
+                generation,
+                output_path=first_result["output_path"],
+                output_url=first_result["image_url"],
+                output_hashes=hashes,
+                processing_time=first_result.get("processing_time", 0),
+                seed=first_result["seed"],
+            )
+            await progress_channel.complete(generation_id, completion_data)
+
+            logger.info(f"Text-to-image generation completed (ID: {generation_id})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Text-to-image generation failed (ID: {generation_id}): {str(e)}")
+            # Outputs ingested for this generation are not referenced by it
+            await storage_service.release_pins(output_hashes)
+
+            await generation_writer.commit(
+                generation_id,
+                status="failed",
+                error_message=str(e),
+                completed_at=datetime.utcnow(),
+            )
+
+            await progress_channel.error(generation_id, str(e))
+            return False
+
+    async def _run_image_to_image(self, generation_id: int, params: Dict[str, Any]) -> bool:
+        """
+        Run an image-to-image generation.
+
+        Returns:
+            True if the generation completed
+        """
+        generation = await generation_repository.get(generation_id)
+        if generation is None:
+            logger.warning(f"Generation {generation_id} no longer exists, skipping")
+            return False
+        if generation.status in ("completed", "failed"):
+            logger.info(f"Generation {generation_id} already {generation.status}, skipping redelivery")
+            return generation.status == "completed"
+
+        generation_writer.update(generation_id, status="processing")
+        output_hashes: List[str] = []
+
+        try:
+            logger.info(f"Starting image-to-image generation (ID: {generation_id})")
+            progress_channel.progress(generation_id, 10.0, "Initializing...")
+
+            result = await runware_service.image_to_image(
+                prompt=params["prompt"],
+                image_url=params["image_url"],
+                negative_prompt=params.get("negative_prompt"),
+                strength=params["strength"],
+                steps=params["steps"],
+                guidance_scale=params["guidance_scale"],
+                seed=params.get("seed"),
+                model=params.get("model"),
+                progress_callback=self._progress_callback(generation_id),
+            )
+
+            output_hashes = [result["sha256"]] if result.get("sha256") else []
+            # _complete claims the pins, or releases them if it fails
+            hashes, output_hashes = output_hashes, []
+            completion_data = await self._complete(
+                generation,
+                output_path=result["output_path"],
+                output_url=result["image_url"],
+                output_hashes=hashes,
+                processing_time=result.get("processing_time", 0),
+                seed=result["seed"],
+            )
+            await progress_channel.complete(generation_id, completion_data)
+
+            logger.info(f"Image-to-image generation completed (ID: {generation_id})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Image-to-image generation failed (ID: {generation_id}): {str(e)}")
+            # Outputs ingested for this generation are not referenced by it
+            await storage_service.release_pins(output_hashes)
+
+            await generation_writer.commit(
+                generation_id,
+                status="failed",
+                error_message=str(e),
+                completed_at=datetime.utcnow(),
+            )
+
+            await progress_channel.error(generation_id, str(e))
+            return False
+
+
+# Global worker service instance
+worker_service = WorkerService()
@@ -0,0 +1,27 @@
+"""Shared pytest configuration for backend tests."""
+
+import os
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time: point them at a throwaway directory so
+# tests never touch the real database, storage or Runware API.
+_tmpdir = Path(tempfile.mkdtemp(prefix="runware_tests_"))
+os.environ.setdefault("RUNWARE_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir / 'test.db'}")
+os.environ.setdefault("STORAGE_PATH", str(_tmpdir / "generated"))
+
+
+import fakeredis  # noqa: E402
+import pytest_asyncio  # noqa: E402
+
+from backend.core.redis_client import redis_client  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def fake_redis(monkeypatch):
+    """Point the shared Redis client at an in-memory server."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_client, "_client", fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(redis_client, "_binary_client", fakeredis.FakeAsyncRedis(server=server))
+    yield server
@@ -0,0 +1,78 @@
+"""Tests for cost-weighted admission control."""
+
+import httpx
+import pytest
+
+from backend.core.config import settings
+from backend.main import app
+from backend.models.database import init_db
+from backend.services.admission_service import AdmissionService, admission_service
+from backend.services.queue_service import queue_service
+
+
+def test_generation_cost_scales_with_work_and_model():
+    """Cost is pixels x steps x images relative to a default generation, times the model factor."""
+    service = AdmissionService(model_factors={"runware:100@1": 2.5})
+
+    assert service.generation_cost({"width": 512, "height": 512, "steps": 25}) == 1
+    assert service.generation_cost({"width": 2048, "height": 2048, "steps": 150, "num_images": 4}) == 384
+    assert service.generation_cost({"steps": 25, "model": "runware:100@1"}) == 2.5
+
+
+@pytest.mark.asyncio
+async def test_generation_budgets_are_per_client(fake_redis):
+    """Expensive generations drain the client's bucket and leave other clients alone."""
+    service = AdmissionService(burst=10, refill_per_minute=60)
+
+    assert (await service.admit_generation("client", 8))[0]
+    allowed, retry_after = await service.admit_generation("client", 4)
+    assert not allowed and 1 < retry_after <= 2
+    assert (await service.admit_generation("other", 4))[0]
+
+    assert await AdmissionService(enabled=False).admit_generation("client", 1000) == (True, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_endpoints_answer_429_with_retry_after(fake_redis, monkeypatch):
+    """A generation over budget is refused before anything is stored; reads are not charged."""
+    monkeypatch.setattr(admission_service, "generations", AdmissionService(burst=400).generations)
+    assert (await admission_service.admit_generation("admission-test", 60))[0]
+    headers = {"X-Client-ID": "admission-test"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/api/generate/text-to-image",
+            json={"prompt": "a lighthouse", "width": 2048, "height": 2048, "steps": 150, "num_images": 4},
+            headers=headers,
+        )
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert "costs 384" in response.json()["detail"]
+
+
+        assert [
+            (await client.get("/api/generate/batch/unknown", headers=headers)).status_code for _ in range(3)
+        ] == [404] * 3
+
+
+@pytest.mark.asyncio
+async def test_full_size_batch_is_admitted_and_charged_in_full(fake_redis, monkeypatch):
+    """A batch at batch_max_size costing more than the burst gets in on a full budget, then the client waits."""
+    init_db()
+    await queue_service.initialize()
+    monkeypatch.setattr(admission_service, "generations", AdmissionService(burst=400).generations)
+    headers = {"X-Client-ID": "batch-test"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/api/generate/batch",
+            json={"prompts": ["a harbour at dusk"] * settings.batch_max_size, "width": 1024, "height": 1024},
+            headers=headers,
+        )
+        assert response.status_code == 202
+        assert response.json()["total"] == settings.batch_max_size
+
+        response = await client.post("/api/generate/text-to-image", json={"prompt": "one more"}, headers=headers)
+        assert response.status_code == 429
+        # 4 * batch_max_size units charged against a 400-unit budget refilled at 100 per minute
+        assert int(response.headers["Retry-After"]) >= (4 * settings.batch_max_size - 400) / 100 * 60
@@ -0,0 +1,59 @@
+"""Tests for the canonical cache key and the in-process cache tier."""
+
+from unittest.mock import patch
+
+from backend.services.cache_service import CacheService, LocalCache
+
+
+def test_equivalent_requests_share_a_key():
+    """Whitespace and explicit defaults do not change the key."""
+    service = CacheService()
+
+    explicit = service.build_generation_key(
+        "text-to-image",
+        "a  red\tfox ",
+        {"seed": 7, "width": 512, "height": 512, "steps": 25, "guidance_scale": 7.5,
+         "model": "runware:100@1", "num_images": 1, "negative_prompt": ""},
+    )
+    implicit = service.build_generation_key("text-to-image", "a red fox", {"seed": 7})
+
+    assert explicit == implicit
+    assert explicit != service.build_generation_key("text-to-image", "a red fox", {"seed": 8})
+
+
+def test_random_seed_is_not_cacheable():
+    """Requests without a seed get no key."""
+    service = CacheService()
+
+    assert service.build_generation_key("text-to-image", "a red fox", {"seed": None}) is None
+
+
+def test_local_cache_evicts_least_recently_used_by_size():
+    """Entries beyond the byte budget evict the least recently used first."""
+    cache = LocalCache(max_entries=10, max_bytes=100, ttl=60)
+
+    cache.set("a", 1, size=40)
+    cache.set("b", 2, size=40)
+    assert cache.get("a") == 1
+    cache.set("c", 3, size=40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 80
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_local_cache_expires_entries():
+    """Entries are dropped once their TTL passes."""
+    cache = LocalCache(max_entries=10, max_bytes=100, ttl=5)
+
+    with patch("backend.services.cache_service.time.monotonic", return_value=100.0):
+        cache.set("a", 1, size=1)
+    with patch("backend.services.cache_service.time.monotonic", return_value=106.0):
+        assert cache.get("a") is None
+
+    assert cache.get_stats()["entries"] == 0
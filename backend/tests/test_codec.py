@@ -0,0 +1,88 @@
+"""Tests for the Redis value codec."""
+
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend.api.schemas import GenerationResponse
+from backend.core.codec import MAGIC, Codec
+
+RESULT = [
+    {
+        "image_url": "https://im.runware.ai/image/ws/0.5/ii/abc.png",
+        "output_path": "/data/objects/ab/cd/abcd.png",
+        "sha256": "ab" * 32,
+        "seed": 42,
+        "width": 512,
+        "height": 512,
+        "steps": 25,
+        "guidance_scale": 7.5,
+    }
+] * 8
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd", "lz4"])
+def test_round_trip(serializer, compression):
+    """Every serializer/compression pair decodes back to the input."""
+    codec = Codec(serializer=serializer, compression=compression, compress_threshold=64)
+
+    encoded = codec.encode(RESULT)
+
+    assert encoded[0] == MAGIC
+    assert codec.decode(encoded) == RESULT
+
+
+def test_small_values_are_not_compressed():
+    """Values under the threshold skip compression."""
+    codec = Codec(serializer="msgpack", compression="zstd", compress_threshold=1024)
+
+    encoded = codec.encode({"task_id": 1})
+
+    assert encoded[3] == 0
+    assert codec.decode(encoded) == {"task_id": 1}
+
+
+def test_reads_legacy_json():
+    """Plain JSON written before the codec existed still decodes."""
+    codec = Codec(serializer="msgpack", compression="zstd")
+
+    assert codec.decode(json.dumps(RESULT)) == RESULT
+    assert codec.decode(json.dumps(RESULT).encode()) == RESULT
+
+
+@pytest.mark.parametrize("serializer", ["legacy", "json", "msgpack"])
+def test_encodes_completion_payloads(serializer):
+    """Completion payloads carry datetimes, written as ISO strings by every serializer."""
+    created_at = datetime(2024, 5, 1, 12, 0, 0)
+    completed_at = datetime(2024, 5, 1, 12, 0, 7, 250000)
+    generation = SimpleNamespace(
+        id=7, generation_type="text_to_image", status="completed", output_path=RESULT[0]["output_path"],
+        output_url=RESULT[0]["image_url"], prompt="a lighthouse", parameters={"steps": 25},
+        created_at=created_at, completed_at=completed_at, processing_time=7.25, error_message=None,
+    )
+    payload = {"type": "complete", "generation_id": 7, "data": GenerationResponse.from_orm(generation).dict()}
+    codec = Codec(serializer=serializer, compression="zstd", compress_threshold=64)
+
+    decoded = codec.decode(codec.encode(payload))
+
+    assert decoded["data"]["created_at"] == created_at.isoformat()
+    assert decoded["data"]["completed_at"] == completed_at.isoformat()
+    assert decoded["data"]["output_url"] == RESULT[0]["image_url"]
+
+
+def test_legacy_writer_emits_plain_json():
+    """The legacy serializer stays readable by nodes without the codec."""
+    codec = Codec(serializer="legacy", compression="zstd")
+
+    assert json.loads(codec.encode(RESULT)) == RESULT
+
+
+def test_rejects_unknown_version():
+    """Values from a newer codec version fail loudly."""
+    codec = Codec()
+
+    with pytest.raises(ValueError):
+        codec.decode(bytes((MAGIC, 99, 1, 0)) + b"{}")
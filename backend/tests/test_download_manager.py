@@ -0,0 +1,68 @@
+"""Tests for the shared download manager."""
+
+import asyncio
+import hashlib
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from backend.services.download_manager import DownloadManager
+
+
+@pytest_asyncio.fixture
+async def image_server():
+    """Serve fake images with a fixed per-request delay."""
+
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return web.Response(body=b"png:" + request.match_info["name"].encode())
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_batch_downloads_run_in_parallel_on_one_session(image_server, tmp_path):
+    """Four downloads take roughly one download's time and share a session."""
+    manager = DownloadManager(max_connections=8, max_concurrent=4, timeout=10)
+
+    start = time.perf_counter()
+    downloads = await asyncio.gather(*(
+        manager.download(f"{image_server}/img{i}", tmp_path / f"img{i}.png")
+        for i in range(4)
+    ))
+    elapsed = time.perf_counter() - start
+
+    session = await manager._get_session()
+    await manager.close()
+
+    assert elapsed < 0.6
+    assert [d.path.read_bytes() for d in downloads] == [f"png:img{i}".encode() for i in range(4)]
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_streamed_download_reports_checksum_and_leaves_no_temp_files(
+    image_server, tmp_path
+):
+    """Content is hashed while streaming and renamed into place atomically."""
+    manager = DownloadManager(chunk_size=2)
+
+    downloaded = await manager.download(f"{image_server}/big", tmp_path / "big.png")
+    with pytest.raises(Exception, match="HTTP 404"):
+        await manager.download(f"{image_server}/missing/path", tmp_path / "missing.png")
+    await manager.close()
+
+    content = b"png:big"
+    assert downloaded.size == len(content)
+    assert downloaded.sha256 == hashlib.sha256(content).hexdigest()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["big.png"]
@@ -0,0 +1,134 @@
+"""Tests for the write-behind generation state writer."""
+
+import asyncio
+
+import pytest
+
+from backend.models.database import init_db
+from backend.models.repository import generation_repository
+from backend.services.generation_writer import GenerationStateWriter
+
+
+@pytest.mark.asyncio
+async def test_updates_are_coalesced_into_one_flush():
+    """Several status changes for many jobs land in a single transaction."""
+    init_db()
+    ids = []
+    for i in range(3):
+        generation = await generation_repository.create(
+            generation_type="text-to-image",
+            prompt=f"writer test {i}",
+            parameters={},
+            status="pending",
+            output_path="",
+        )
+        ids.append(generation.id)
+
+    writer = GenerationStateWriter(flush_interval=60)
+    for generation_id in ids:
+        writer.update(generation_id, status="processing")
+    writer.update(ids[0], status="completed", output_path="/tmp/a.png")
+    writer.update(ids[1], status="failed", error_message="boom")
+    # Rows deleted while buffered are skipped silently
+    writer.update(999_999, status="completed")
+
+    assert await writer.flush() == 4
+    assert writer.get_stats()["flushes"] == 1
+    assert writer.get_stats()["buffered"] == 0
+
+    first = await generation_repository.get(ids[0])
+    second = await generation_repository.get(ids[1])
+    third = await generation_repository.get(ids[2])
+    assert (first.status, first.output_path) == ("completed", "/tmp/a.png")
+    assert (second.status, second.error_message) == ("failed", "boom")
+    assert third.status == "processing"
+
+    assert await writer.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_row_is_isolated_and_dropped():
+    """A row that breaks every batch is retried a bounded number of times, then dropped alone."""
+    init_db()
+    good, bad, later = [
+        (await generation_repository.create(
+            generation_type="text-to-image",
+            prompt=f"poison test {i}",
+            parameters={},
+            status="pending",
+            output_path="",
+        )).id
+        for i in range(3)
+    ]
+
+    writer = GenerationStateWriter(flush_interval=0.01, max_retries=2)
+    writer.update(good, status="processing")
+    # SQLite cannot bind a dict to a text column: every batch containing it fails
+    writer.update(bad, error_message={"not": "text"})
+
+    assert await writer.flush() == 0
+    assert writer.get_stats()["buffered"] == 2
+
+    # Out of retries: both rows are written one at a time and only the bad one is lost
+    assert await writer.commit(later, status="completed") is True
+
+    stats = writer.get_stats()
+    assert (stats["buffered"], stats["dropped"]) == (0, 1)
+    assert (await generation_repository.get(good)).status == "processing"
+    assert (await generation_repository.get(later)).status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_commit_reports_dropped_updates():
+    """commit() waits for the write and returns False when the update is given up."""
+    init_db()
+    generation = await generation_repository.create(
+        generation_type="text-to-image",
+        prompt="commit test",
+        parameters={},
+        status="pending",
+        output_path="",
+    )
+
+    writer = GenerationStateWriter(flush_interval=0.01, max_retries=2)
+    assert await writer.commit(generation.id, status="completed") is True
+    assert (await generation_repository.get(generation.id)).status == "completed"
+    assert await writer.commit(generation.id, error_message={"not": "text"}) is False
+
+
+@pytest.mark.asyncio
+async def test_commit_waits_for_a_flush_in_progress():
+    """A bare commit() does not report success while another flush is still writing the row."""
+    init_db()
+    generation = await generation_repository.create(
+        generation_type="text-to-image",
+        prompt="in-flight test",
+        parameters={},
+        status="pending",
+        output_path="",
+    )
+
+    writer = GenerationStateWriter(flush_interval=60)
+    writer.update(generation.id, status="completed")
+
+    writing = asyncio.Event()
+    release = asyncio.Event()
+    write = writer._write
+
+    async def slow_write(batch):
+        writing.set()
+        await release.wait()
+        await write(batch)
+
+    writer._write = slow_write
+    flush = asyncio.create_task(writer.flush())
+    await writing.wait()
+
+    commit = asyncio.create_task(writer.commit(generation.id))
+    await asyncio.sleep(0.01)
+    assert not commit.done()
+
+    release.set()
+    assert await commit is True
+    assert await flush == 1
+    assert (await generation_repository.get(generation.id)).status == "completed"
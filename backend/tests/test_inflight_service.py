@@ -0,0 +1,132 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from backend.core.codec import codec
+from backend.core.redis_client import redis_client
+from backend.services.inflight_service import InflightService
+from backend.services.pubsub_service import PubSubService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_call_and_progress():
+    """Duplicates attach to the leader's result and progress stream."""
+    service = InflightService()
+    calls = 0
+    seen = {i: [] for i in range(5)}
+
+    async def factory(progress):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        progress(50.0, "halfway")
+        await asyncio.sleep(0.01)
+        return [{"image_url": "https://example.com/a.png"}]
+
+    results = await asyncio.gather(*(
+        service.run("key", factory, progress_callback=lambda p, m, i=i: seen[i].append(p))
+        for i in range(5)
+    ))
+
+    assert calls == 1
+    assert all(result == results[0] for result in results)
+    assert all(progress == [50.0] for progress in seen.values())
+    assert service.get_stats()["local_followers"] == 4
+    assert service.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_leader_failure_propagates_to_followers():
+    """Followers see the leader's error and a later call runs again."""
+    service = InflightService()
+
+    async def failing(progress):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("runware down")
+
+    outcomes = await asyncio.gather(
+        service.run("key", failing),
+        service.run("key", failing),
+        return_exceptions=True,
+    )
+    assert [str(o) for o in outcomes] == ["runware down", "runware down"]
+
+    async def succeeding(progress):
+        return "ok"
+
+    assert await service.run("key", succeeding) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_leader_publishes_remote_events_in_order(fake_redis):
+    """Progress for remote followers is published before the result, never after."""
+    service = InflightService()
+    pubsub = redis_client.binary_client.pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe(f"{service.CHANNEL_PREFIX}:key")
+
+    async def factory(progress):
+        for value in (10.0, 20.0, 30.0):
+            progress(value, "working")
+        await asyncio.sleep(0.01)
+        progress(90.0, "almost")
+        await asyncio.sleep(0.01)
+        progress(95.0, "finishing")
+        return "done"
+
+    assert await service.run("key", factory) == "done"
+
+    received = []
+    while not received or received[-1]["type"] != "complete":
+        message = await pubsub.get_message(timeout=1)
+        if message:
+            received.append(codec.decode(message["data"]))
+    await pubsub.aclose()
+
+    # Progress already superseded when the publisher reaches it is skipped
+    assert [(event["type"], event.get("progress")) for event in received] == [
+        ("progress", 30.0), ("progress", 90.0), ("complete", None),
+    ]
+    assert received[-1]["result"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_remote_followers_share_the_pubsub_connection(fake_redis):
+    """Followers on another node wait through the shared subscriber, not a connection each."""
+    leader_node = InflightService()
+    pubsub = PubSubService()
+    follower_node = InflightService(pubsub=pubsub)
+    started = asyncio.Event()
+    calls = 0
+
+    async def leader(progress):
+        started.set()
+        await asyncio.sleep(0.1)
+        progress(50.0, "halfway")
+        await asyncio.sleep(0.05)
+        return "shared"
+
+    async def duplicate(progress):
+        nonlocal calls
+        calls += 1
+        return "duplicate"
+
+    seen = []
+    running = asyncio.create_task(leader_node.run("key", leader))
+    await started.wait()
+    followers = [
+        asyncio.create_task(follower_node.run(
+            "key", duplicate, progress_callback=lambda p, m: seen.append(p),
+        ))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    assert pubsub.get_stats()["watchers"] == 1
+
+    assert await running == "shared"
+    assert await asyncio.gather(*followers) == ["shared"] * 3
+    assert calls == 0 and seen == [50.0] * 3
+    assert follower_node.get_stats()["remote_followers"] == 1
+    assert pubsub.get_stats()["channels"] == 0
+    await pubsub.cleanup()
@@ -0,0 +1,60 @@
+"""Tests for the coalescing progress channel."""
+
+import asyncio
+
+import pytest
+
+from backend.core.redis_client import redis_client
+from backend.services import progress_channel as progress_module
+from backend.services.progress_channel import ProgressChannel
+from backend.services.pubsub_service import PubSubService
+
+
+@pytest.mark.asyncio
+async def test_bursts_coalesce_and_terminal_events_keep_order(fake_redis):
+    """Only the latest progress is published, terminal events flush at once, late progress is dropped."""
+    pubsub = PubSubService()
+    first = await pubsub.subscribe(1)
+    second = await pubsub.subscribe(2)
+    channel = ProgressChannel(interval=60)
+
+    for progress in (10.0, 20.0, 30.0):
+        channel.progress(1, progress, f"{progress}%")
+    channel.progress(2, 50.0, "Halfway")
+    assert await channel.flush() == 2
+
+    channel.progress(1, 80.0, "Almost")
+    await channel.complete(1, {"ok": True})
+    channel.progress(1, 20.0, "Late")
+    await channel.flush()
+
+    received = [await asyncio.wait_for(first.get(), 1) for _ in range(2)]
+    assert [(event["type"], event.get("progress")) for event in received] == [("progress", 30.0), ("complete", None)]
+    assert received[1]["data"] == {"ok": True}
+    assert (await asyncio.wait_for(second.get(), 1))["progress"] == 50.0
+    await asyncio.sleep(0.05)
+    assert first.empty()
+
+    stats = channel.get_stats()
+    assert (stats["events"], stats["coalesced"], stats["late"], stats["published"]) == (7, 3, 1, 3)
+    await pubsub.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_events_reach_local_websockets_without_redis(monkeypatch):
+    """When publishing fails, events are broadcast to this process's sockets."""
+    monkeypatch.setattr(redis_client, "_binary_client", None)
+    broadcasts = []
+
+    async def broadcast(generation_id, message):
+        broadcasts.append((generation_id, message["type"]))
+        return 1
+
+    monkeypatch.setattr(progress_module.websocket_hub, "broadcast", broadcast)
+    channel = ProgressChannel(interval=60)
+
+    channel.progress(3, 40.0, "Working")
+    await channel.error(3, "boom")
+
+    assert broadcasts == [(3, "error")]
+    assert channel.get_stats()["errors"] == 1
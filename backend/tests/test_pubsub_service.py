@@ -0,0 +1,61 @@
+"""Tests for the multiplexed Pub/Sub subscriber."""
+
+import asyncio
+
+import pytest
+
+from backend.core.codec import codec
+from backend.core.redis_client import redis_client
+from backend.services.pubsub_service import PubSubService
+
+
+async def publish(generation_id: int, **event):
+    """Publish an event on a generation's progress channel."""
+    await redis_client.binary_client.publish(f"generation:progress:{generation_id}", codec.encode(event))
+
+
+@pytest.mark.asyncio
+async def test_one_subscriber_fans_out_to_every_watcher(fake_redis):
+    """Watchers of a generation each get its messages; others get nothing."""
+    service = PubSubService()
+    first = await service.subscribe(1)
+    second = await service.subscribe(1)
+    other = await service.subscribe(2)
+
+    await publish(1, type="progress", progress=50)
+    assert await asyncio.wait_for(first.get(), 1) == {"type": "progress", "progress": 50}
+    assert await asyncio.wait_for(second.get(), 1) == {"type": "progress", "progress": 50}
+    assert other.empty()
+
+    assert service.get_stats() == {
+        "channels": 2, "watchers": 3, "connected": True, "delivered": 2, "dropped": 0,
+    }
+
+    await service.unsubscribe(1, first)
+    await publish(1, type="complete")
+    assert await asyncio.wait_for(second.get(), 1) == {"type": "complete"}
+    assert first.empty()
+
+    await service.unsubscribe(1, second)
+    await service.unsubscribe(2)
+    assert service.get_stats()["channels"] == 0
+    await service.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_slow_watchers_lose_the_oldest_updates(fake_redis, monkeypatch):
+    """A full watcher queue keeps the newest messages."""
+    monkeypatch.setattr(PubSubService, "QUEUE_SIZE", 2)
+    service = PubSubService()
+    queue = await service.subscribe(7)
+
+    for progress in (10, 20, 30):
+        await publish(7, progress=progress)
+    listened = asyncio.create_task(service.listen_once(8, timeout=1))
+    await asyncio.sleep(0.05)
+    await publish(8, progress=99)
+
+    assert await listened == {"progress": 99}
+    assert [(await queue.get())["progress"] for _ in range(2)] == [20, 30]
+    assert service.dropped == 1
+    await service.cleanup()
@@ -0,0 +1,164 @@
+"""Tests for the fair generation queue."""
+
+import pytest
+
+from backend.core.redis_client import redis_client
+from backend.services.queue_service import QueueService
+
+
+async def drain(service, count):
+    """Dequeue up to count tasks and return (client_id, task_id) pairs."""
+    order = []
+    for _ in range(count):
+        task = await service.dequeue(timeout=0)
+        if task is None:
+            break
+        order.append((task["client_id"], task["task_id"]))
+    return order
+
+
+@pytest.mark.asyncio
+async def test_clients_take_turns(fake_redis):
+    """A client with a deep backlog does not delay another client's first task."""
+    service = QueueService(aging_seconds=0)
+    await service.initialize()
+
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(100)], client_id="heavy")
+    await service.enqueue(1000, "text-to-image", {}, client_id="light")
+    await service.enqueue(1001, "text-to-image", {}, client_id="light")
+
+    order = await drain(service, 4)
+
+    assert order == [("heavy", 0), ("light", 1000), ("heavy", 1), ("light", 1001)]
+    assert await service.get_length() == 98
+
+
+@pytest.mark.asyncio
+async def test_weights_and_costs_set_the_share(fake_redis):
+    """Weighted clients get proportionally more turns; a 1024x1024 task costs four."""
+    service = QueueService(aging_seconds=0, client_weights={"pro": 3})
+    await service.initialize()
+
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(30)], client_id="pro")
+    await service.enqueue_many([(100 + i, "text-to-image", {}) for i in range(30)], client_id="free")
+    await service.enqueue_many(
+        [(200 + i, "text-to-image", {"width": 1024, "height": 1024}) for i in range(5)],
+        client_id="big",
+    )
+
+    # Eight full rounds: 3 + 1 tasks per round, plus a large task every fourth round
+    order = await drain(service, 34)
+    served = [client for client, _ in order]
+
+    assert (served.count("pro"), served.count("free"), served.count("big")) == (24, 8, 2)
+
+
+@pytest.mark.asyncio
+async def test_priority_and_aging(fake_redis):
+    """High priority goes first until a lower priority has waited too long."""
+    service = QueueService(aging_seconds=60)
+    await service.initialize()
+
+    await service.enqueue(1, "text-to-image", {}, priority="low")
+    await service.enqueue_many([(10 + i, "text-to-image", {}) for i in range(3)], priority="high")
+
+    assert (await service.dequeue(timeout=0))["task_id"] == 10
+
+    await redis_client.client.set(f"{service.QUEUE_PREFIX}:low:served", 0)
+    assert (await service.dequeue(timeout=0))["task_id"] == 1
+    assert (await service.dequeue(timeout=0))["task_id"] == 11
+
+
+@pytest.mark.asyncio
+async def test_remove_and_clear(fake_redis):
+    """Removed and cleared tasks are never dequeued and counters stay accurate."""
+    service = QueueService()
+    await service.initialize()
+
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(3)], client_id="a")
+    await service.enqueue(3, "image-to-image", {}, priority="low", client_id="b")
+
+    assert await service.remove_task(1)
+    assert not await service.remove_task(42)
+    assert await service.get_queue_info() == {
+        "high": 0, "normal": 2, "low": 1, "total": 3, "clients": 2, "scheduled": 0, "processing": 0, "dead": 0,
+    }
+
+    assert await service.clear("low") == 1
+    assert [task_id for _, task_id in await drain(service, 5)] == [0, 2]
+    assert await service.get_length() == 0
+
+
+@pytest.mark.asyncio
+async def test_abandoned_tasks_are_redelivered_then_dead_lettered(fake_redis):
+    """Unacked tasks come back after their lease expires, up to max_attempts."""
+    service = QueueService(visibility_timeout=0, max_attempts=2, retry_delay=0)
+    await service.initialize()
+    await service.enqueue(1, "text-to-image", {}, client_id="a")
+    await service.enqueue(2, "text-to-image", {}, client_id="a")
+
+    first = await service.dequeue(timeout=0)
+    assert (first["task_id"], first["attempt"]) == (1, 1)
+    assert await service.reap() == ([1], [])
+    assert await service.known_task_ids([1, 2, 3]) == {1, 2}
+
+    # Redelivered behind the client's later tasks once its backoff passed
+    second = await service.dequeue(timeout=0)
+    assert await service.ack(second["task_id"])
+    third = await service.dequeue(timeout=0)
+    assert (second["task_id"], third["task_id"], third["attempt"]) == (2, 1, 2)
+    requeued, dead = await service.reap()
+    assert requeued == [] and [task["task_id"] for task in dead] == [1]
+    assert [task["task_id"] for task in await service.get_dead_letters()] == [1]
+
+    assert await service.reap() == ([], [])
+    assert await service.known_task_ids([1, 2]) == set()
+    assert (await service.get_queue_info())["dead"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_and_cancel_use_the_index(fake_redis):
+    """Lookups report position; cancelled tasks are skipped without a list scan."""
+    service = QueueService(aging_seconds=0)
+    await service.initialize()
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(5)], client_id="heavy")
+    await service.enqueue_many([(10, "text-to-image", {}), (11, "text-to-image", {})], client_id="light")
+    await service.enqueue(20, "text-to-image", {}, priority="high")
+
+    task = await service.get_task(11)
+    assert (task["state"], task["client_id"], task["client_position"]) == ("queued", "light", 1)
+    # The high-priority task, then two turns each of heavy and light
+    assert task["position"] == 4
+
+    assert await service.remove_task(3)
+    assert not await service.remove_task(3)
+    assert not await service.remove_task(10, priority="high")
+    assert await service.get_task(3) is None
+    assert await service.get_length() == 7
+
+    first = await service.dequeue(timeout=0)
+    assert (await service.get_task(first["task_id"]))["state"] == "processing"
+
+    served = [task_id for _, task_id in await drain(service, 10)]
+    assert served == [0, 10, 1, 11, 2, 4]
+    assert await service.get_length() == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduled_tasks_wait_until_due(fake_redis):
+    """Delayed tasks are promoted by dequeue once due and can be cancelled before."""
+    service = QueueService()
+    await service.initialize()
+    await service.enqueue_many([(1, "text-to-image", {}), (2, "text-to-image", {})], delay=3600)
+    await service.enqueue(3, "text-to-image", {})
+
+    assert (await service.get_task(1))["state"] == "scheduled"
+    assert (await service.get_queue_info())["scheduled"] == 2
+    assert (await service.dequeue(timeout=0))["task_id"] == 3
+    assert await service.dequeue(timeout=0) is None
+
+    assert await service.remove_task(2)
+    await redis_client.client.zadd(f"{service.QUEUE_PREFIX}:scheduled", {1: 0})
+    assert (await service.dequeue(timeout=0))["task_id"] == 1
+    assert await service.get_length() == 0
+    assert (await service.get_queue_info())["scheduled"] == 0
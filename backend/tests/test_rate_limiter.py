@@ -0,0 +1,156 @@
+"""Tests for rate limiting."""
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.client_identity import client_identity
+from backend.core.rate_limit import LocalRateLimiter, RateLimiter
+from backend.core.redis_client import redis_client
+from backend.middleware.rate_limiter import RateLimiterMiddleware, parse_limits
+
+
+@pytest.mark.asyncio
+async def test_gcra_limits_every_window_in_one_script(fake_redis):
+    """A burst up to the limit passes; a refused request does not use up the other window."""
+    limiter = RateLimiter("rate_limit", [("minute", 3, 60.0), ("hour", 5, 3600.0)])
+
+    results = [await limiter.hit("client:GET:/api/x") for _ in range(4)]
+    assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+    _, retry_after, window = results[-1]
+    assert window == "minute" and 0 < retry_after <= 20
+
+    assert 0 < await redis_client.client.pttl("rate_limit:hour:client:GET:/api/x") <= 3 * 720000
+
+    # The refused request was not counted against the hour
+    await redis_client.client.delete("rate_limit:minute:client:GET:/api/x")
+    assert [(await limiter.hit("client:GET:/api/x"))[0] for _ in range(3)] == [True, True, False]
+    assert (await limiter.hit("other:GET:/api/x"))[0]
+
+
+@pytest.mark.asyncio
+async def test_costs_are_charged_in_full(fake_redis):
+    """A request of cost c uses c tokens; one above the limit needs a full bucket and leaves a debt."""
+    limiter = RateLimiter("admission", [("generate", 10, 60.0)])
+
+    assert (await limiter.hit("client", 6))[0]
+    allowed, retry_after, _ = await limiter.hit("client", 6)
+    assert not allowed and 6 < retry_after <= 12
+    assert not (await limiter.hit("client", 50))[0]
+
+    assert (await limiter.hit("other", 50))[0]
+    allowed, retry_after, _ = await limiter.hit("other", 1)
+    # 40 tokens of debt plus the one requested refill at 10 per minute
+    assert not allowed and 240 < retry_after <= 246
+
+    local = LocalRateLimiter([(10, 60.0)])
+    assert local.hit("other", 50)[0]
+    allowed, retry_after, _ = local.hit("other", 1)
+    assert not allowed and 240 < retry_after <= 246
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_buckets_without_redis(monkeypatch):
+    """Without Redis each process limits with token buckets and retries Redis later."""
+    monkeypatch.setattr(redis_client, "_client", None)
+    limiter = RateLimiter("rate_limit", [("minute", 2, 60.0), ("hour", 100, 3600.0)])
+
+    results = [await limiter.hit("client:GET:/api/x") for _ in range(3)]
+
+    assert [allowed for allowed, _, _ in results] == [True, True, False]
+    assert results[-1][2] == "minute" and 0 < results[-1][1] <= 30
+    assert limiter._redis_retry_at > 0
+
+
+def test_local_limiter_refills_and_bounds_keys():
+    """Buckets refill over time and only the most recent keys are kept."""
+    limiter = LocalRateLimiter([(1, 0.01)], max_keys=2)
+
+    assert limiter.hit("a")[0]
+    assert not limiter.hit("a")[0]
+    limiter._buckets["a"][0].updated -= 0.01
+    assert limiter.hit("a")[0]
+
+    limiter.hit("b")
+    limiter.hit("c")
+    assert list(limiter._buckets) == ["b", "c"]
+
+
+def build_app(**kwargs) -> FastAPI:
+    """A small app behind the rate limiter."""
+    app = FastAPI()
+    app.add_middleware(RateLimiterMiddleware, **kwargs)
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    @app.get("/api/history/{generation_id}")
+    async def history(generation_id: int):
+        return {"id": generation_id}
+
+    @app.post("/api/history/{generation_id}")
+    async def update(generation_id: int):
+        return {"id": generation_id}
+
+    return app
+
+
+def test_rejected_requests_get_retry_after(monkeypatch):
+    """The middleware answers 429 with Retry-After once a window is used up."""
+    monkeypatch.setattr(redis_client, "_client", None)
+
+    with TestClient(build_app(default="1/minute,10/hour")) as client:
+        assert client.get("/api/history/1").status_code == 200
+        response = client.get("/api/history/1")
+        # The default policy counts each endpoint separately
+        assert client.get("/api/history/2").status_code == 200
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "60"
+    assert response.json() == {"error": "Rate limit exceeded: too many requests per minute"}
+
+
+def test_policies_pick_the_most_specific_rule(fake_redis):
+    """Exempt routes skip Redis; a named rule shares one budget across its routes."""
+    app = build_app(
+        default="100/minute",
+        policies={
+            "* /health": "exempt",
+            "GET /api/history*": "2/minute",
+            "* /api/*": "exempt",
+        },
+    )
+
+    with TestClient(app) as client:
+        assert all(client.get("/health").status_code == 200 for _ in range(5))
+        assert [client.get(f"/api/history/{i}").status_code for i in range(3)] == [200, 200, 429]
+        assert client.post("/api/history/1").status_code == 200
+
+    keys = fakeredis.FakeRedis(server=fake_redis, decode_responses=True).keys("*")
+    assert keys == ["rate_limit:minute:testclient:GET /api/history*"]
+
+
+def test_identity_headers_are_only_trusted_from_proxies(monkeypatch):
+    """Clients cannot choose their identity; trusted proxies can vouch for one."""
+    monkeypatch.setattr("backend.core.client_identity.settings.trusted_proxies", ["10.0.0.0/8"])
+
+    def scope(peer, **headers):
+        encoded = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+        return {"type": "http", "client": (peer, 5000), "headers": encoded}
+
+    assert client_identity(scope("203.0.113.7", x_client_id="admin", x_forwarded_for="1.2.3.4")) == "203.0.113.7"
+    assert client_identity(scope("10.0.0.2", x_client_id="team-a")) == "team-a"
+    # A spoofed leftmost entry is skipped: the nearest untrusted hop is who the proxy saw
+    assert client_identity(scope("10.0.0.2", x_forwarded_for="1.2.3.4, 198.51.100.9, 10.0.0.3")) == "198.51.100.9"
+    assert client_identity(scope("10.0.0.2")) == "10.0.0.2"
+
+
+def test_parse_limits():
+    """Limit specifications accept plural units and reject malformed input."""
+    assert parse_limits("60/minute, 1000/hours") == [("minute", 60.0, 60.0), ("hour", 1000.0, 3600.0)]
+    with pytest.raises(ValueError):
+        parse_limits("60/fortnight")
+    with pytest.raises(ValueError):
+        parse_limits("many/minute")
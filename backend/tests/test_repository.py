@@ -0,0 +1,59 @@
+"""Tests for the async generation repository."""
+
+import pytest
+
+from backend.models.database import init_db
+from backend.models.repository import generation_repository
+
+
+@pytest.mark.asyncio
+async def test_generation_crud_roundtrip():
+    """Records can be created, updated, listed and deleted without a sync session."""
+    init_db()
+
+    generation = await generation_repository.create(
+        generation_type="text-to-image",
+        prompt="a lighthouse at dusk",
+        parameters={"width": 512, "height": 512},
+        status="pending",
+        output_path="",
+    )
+    assert generation.id is not None
+
+    updated = await generation_repository.update(generation.id, status="completed")
+    assert updated.status == "completed"
+
+    total, items = await generation_repository.list_history(search="lighthouse")
+    assert total == 1
+    assert items[0].id == generation.id
+
+    assert await generation_repository.delete(generation.id) is True
+    assert await generation_repository.get(generation.id) is None
+    assert await generation_repository.update(generation.id, status="failed") is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_and_update():
+    """Batches are inserted and failed together."""
+    init_db()
+
+    generations = await generation_repository.create_many([
+        {
+            "generation_type": "text-to-image",
+            "prompt": f"catalog item {i}",
+            "parameters": {"batch_id": "b1"},
+            "status": "pending",
+            "output_path": "",
+        }
+        for i in range(3)
+    ])
+    ids = [generation.id for generation in generations]
+    assert len(set(ids)) == 3
+    assert [generation.prompt for generation in generations] == [f"catalog item {i}" for i in range(3)]
+
+    assert await generation_repository.update_many(ids, status="failed") == 3
+    total, _ = await generation_repository.list_history(status="failed", search="catalog item")
+    assert total == 3
+
+    for generation_id in ids:
+        await generation_repository.delete(generation_id)
@@ -0,0 +1,190 @@
+"""Tests for the adaptive limiter and circuit breaker."""
+
+import asyncio
+
+import pytest
+
+from backend.core.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    Hedger,
+    OverloadedError,
+    RetryPolicy,
+    RetryRule,
+)
+
+
+@pytest.mark.asyncio
+async def test_limiter_grows_on_success_and_halves_on_failure():
+    """Fast successes raise the limit; a failure cuts it multiplicatively."""
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=8, latency_target=1.0)
+
+    for _ in range(8):
+        async with limiter.acquire():
+            pass
+    grown = limiter.limit
+    assert grown > 5
+
+    with pytest.raises(ValueError):
+        async with limiter.acquire():
+            raise ValueError("boom")
+
+    assert limiter.limit == pytest.approx(grown * 0.5)
+    assert limiter.get_stats()["decreases"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_sheds_when_no_slot_frees_up():
+    """Callers beyond the limit are rejected after the queue timeout."""
+    limiter = AdaptiveLimiter(
+        initial_limit=1, min_limit=1, max_limit=1, latency_target=10.0, queue_timeout=0.01
+    )
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.acquire():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError):
+        async with limiter.acquire():
+            pass
+
+    release.set()
+    await holder
+    assert limiter.get_stats()["rejected"] == 1
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_then_recovers_through_half_open():
+    """Consecutive failures open the circuit; a successful probe closes it."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            async with breaker.guard():
+                raise ConnectionError("down")
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        async with breaker.guard():
+            pass
+
+    await asyncio.sleep(0.06)
+    assert breaker.state == "half_open"
+    async with breaker.guard():
+        pass
+
+    assert breaker.state == "closed"
+    assert breaker.get_stats()["opened"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_probe_must_reach_the_service():
+    """Shed or cancelled probes free their slot without closing the circuit."""
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=0.01, is_failure=lambda e: not isinstance(e, OverloadedError)
+    )
+    with pytest.raises(ConnectionError):
+        async with breaker.guard():
+            raise ConnectionError("down")
+    await asyncio.sleep(0.02)
+
+    with pytest.raises(OverloadedError):
+        async with breaker.guard():
+            raise OverloadedError("no slot")
+    assert breaker.state == "half_open"
+
+    async def probe():
+        async with breaker.guard():
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert breaker.state == "half_open"
+
+    async with breaker.guard():
+        pass
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_breaker_ignores_errors_that_are_not_failures():
+    """Errors rejected by the predicate never open the circuit."""
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, is_failure=lambda e: not isinstance(e, ValueError)
+    )
+
+    with pytest.raises(ValueError):
+        async with breaker.guard():
+            raise ValueError("bad prompt")
+
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_respects_rules_and_idempotency():
+    """Ambiguous errors are retried only for idempotent calls."""
+    policy = RetryPolicy(
+        rules=[
+            RetryRule((ConnectionRefusedError,), retry=True),
+            RetryRule((TimeoutError,), retry=True, idempotent_only=True),
+        ],
+        max_attempts=3,
+        base_delay=0,
+    )
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionRefusedError()
+        return "ok"
+
+    assert await policy.call(flaky) == "ok"
+    assert attempts == 3
+
+    async def times_out():
+        raise TimeoutError()
+
+    assert policy.should_retry(TimeoutError(), idempotent=True)
+    assert not policy.should_retry(TimeoutError(), idempotent=False)
+    assert not policy.should_retry(ValueError(), idempotent=True)
+    with pytest.raises(TimeoutError):
+        await policy.call(times_out, idempotent=True)
+    assert policy.get_stats() == {"retries": 4, "exhausted": 1}
+
+
+def test_retry_backoff_is_jittered_and_capped():
+    """Delays stay below the exponential cap and max_delay."""
+    policy = RetryPolicy(rules=[], base_delay=1.0, max_delay=4.0)
+
+    for attempt in range(1, 8):
+        delay = policy.backoff(attempt)
+        assert 0 <= delay <= min(4.0, 2 ** (attempt - 1))
+
+
+def test_hedger_waits_for_samples_and_respects_budget():
+    """Hedging starts after enough samples and never exceeds the budget."""
+    hedger = Hedger(budget=0.1, min_samples=10)
+
+    assert hedger.delay() is None
+    for latency in range(1, 21):
+        hedger.record(float(latency))
+
+    assert hedger.delay() == 20.0
+    granted = sum(hedger.try_acquire() for _ in range(5))
+    for _ in range(28):
+        hedger.delay()
+    granted += sum(hedger.try_acquire() for _ in range(5))
+
+    assert granted == 3
+    assert hedger.get_stats()["hedges"] <= 0.1 * hedger.get_stats()["requests"]
@@ -0,0 +1,81 @@
+"""Tests for the Runware connection pool."""
+
+import asyncio
+
+import pytest
+
+from backend.services.runware_pool import NoConnectionError, RunwarePool
+
+
+class FakeClient:
+    """Minimal client with a controllable connection state."""
+
+    def __init__(self, fail_connect=False):
+        self.fail_connect = fail_connect
+        self.open = False
+
+    async def connect(self):
+        if self.fail_connect:
+            raise ConnectionError("refused")
+        self.open = True
+
+    async def disconnect(self):
+        self.open = False
+
+    def connected(self):
+        return self.open
+
+
+@pytest.mark.asyncio
+async def test_dispatches_to_least_loaded_connection():
+    """Concurrent requests spread across connections by in-flight count."""
+    pool = RunwarePool(api_key="key", size=3, client_factory=lambda api_key: FakeClient())
+    await pool.start()
+    release = asyncio.Event()
+    used = []
+
+    async def request():
+        async with pool.acquire() as connection:
+            used.append(connection.index)
+            await release.wait()
+
+    tasks = [asyncio.create_task(request()) for _ in range(6)]
+    await asyncio.sleep(0)
+    assert [c["in_flight"] for c in pool.get_stats()["connections"]] == [2, 2, 2]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert sorted(used) == [0, 0, 1, 1, 2, 2]
+    assert pool.get_stats()["in_flight"] == 0
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_dead_connections_are_skipped_and_reconnected():
+    """Closed members get no traffic and are replaced in the background."""
+    pool = RunwarePool(api_key="key", size=2, client_factory=lambda api_key: FakeClient())
+    await pool.start()
+    pool.connections[0].client.open = False
+
+    async with pool.acquire() as connection:
+        assert connection.index == 1
+
+    await pool._reconnect(pool.connections[0])
+    stats = pool.get_stats()
+    assert stats["connected"] == 2
+    assert stats["connections"][0]["reconnects"] == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_fails_when_no_connection_is_open():
+    """With every member down the caller gets an error instead of hanging."""
+    pool = RunwarePool(
+        api_key="key", size=2, client_factory=lambda api_key: FakeClient(fail_connect=True)
+    )
+    assert await pool.start() == 0
+
+    with pytest.raises(NoConnectionError):
+        async with pool.acquire():
+            pass
+    await pool.close()
@@ -0,0 +1,58 @@
+"""Tests for Runware request dispatch in RunwareService."""
+
+import asyncio
+
+import pytest
+from runware import IImageInference
+
+from backend.services.runware_pool import RunwarePool
+from backend.services.runware_service import RunwareService
+
+
+class SlowFirstClient:
+    """Client whose first connection answers slowly."""
+
+    created = 0
+
+    def __init__(self):
+        self.index = SlowFirstClient.created
+        SlowFirstClient.created += 1
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    def connected(self):
+        return True
+
+    async def imageInference(self, requestImage):
+        await asyncio.sleep(1.0 if self.index == 0 else 0.01)
+        return [f"image-from-{self.index}"]
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_on_another_connection():
+    """A request past the p95 latency is duplicated and the faster answer wins."""
+    SlowFirstClient.created = 0
+    service = RunwareService(api_key="key")
+    service.pool = RunwarePool(api_key="key", size=2, client_factory=lambda api_key: SlowFirstClient())
+    await service.pool.start()
+    service.hedger.budget = 1.0
+    for _ in range(service.hedger.min_samples):
+        service.hedger.record(0.05)
+
+    request = IImageInference(positivePrompt="a red fox", model="runware:100@1")
+    # Occupy connection 1 so the primary goes to the slow connection 0
+    service.pool.connections[1].in_flight += 1
+    task = asyncio.create_task(service._infer_hedged(request))
+    await asyncio.sleep(0)
+    service.pool.connections[1].in_flight -= 1
+
+    assert await asyncio.wait_for(task, timeout=0.5) == ["image-from-1"]
+    stats = service.get_stats()["hedging"]
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+    assert service.pool.get_stats()["in_flight"] == 0
+    await service.pool.close()
@@ -0,0 +1,42 @@
+"""Tests for API request schemas."""
+
+import pytest
+from pydantic import ValidationError
+
+from backend.api.schemas import BatchGenerationRequest
+
+
+def test_batch_expands_prompts_seeds_and_grid():
+    """Every prompt is generated for every seed and grid combination."""
+    batch = BatchGenerationRequest(
+        prompts=["a red fox", "a blue whale"],
+        seeds=[1, 2],
+        grid={"steps": [20, 30], "width": [512, 768, 1024]},
+        guidance_scale=5.0,
+    )
+
+    items = batch.expand()
+
+    assert batch.size == len(items) == 24
+    assert {(i.prompt, i.seed, i.steps, i.width) for i in items} == {
+        (p, s, st, w)
+        for p in ("a red fox", "a blue whale")
+        for s in (1, 2)
+        for st in (20, 30)
+        for w in (512, 768, 1024)
+    }
+    assert all(i.guidance_scale == 5.0 for i in items)
+
+
+def test_batch_rejects_unknown_grid_parameter():
+    """Grid axes are limited to generation parameters."""
+    with pytest.raises(ValidationError):
+        BatchGenerationRequest(prompts=["a red fox"], grid={"prompt": ["x"]})
+
+
+def test_batch_items_are_validated():
+    """Grid values go through the same validation as single requests."""
+    batch = BatchGenerationRequest(prompts=["a red fox"], grid={"steps": [0]})
+
+    with pytest.raises(ValidationError):
+        batch.expand()
@@ -0,0 +1,79 @@
+"""Tests for the source image registry."""
+
+import hashlib
+
+import pytest
+
+from backend.services.download_manager import DownloadedFile, DownloadManager
+from backend.services.source_image_service import SourceImageService
+
+
+class FakeUploader:
+    """Records uploads and returns a UUID per call."""
+
+    def __init__(self):
+        self.uploads = []
+
+    async def __call__(self, path):
+        self.uploads.append(path)
+        return f"uuid-{len(self.uploads)}"
+
+
+@pytest.mark.asyncio
+async def test_local_file_is_identified_by_content(tmp_path):
+    """Copies of the same picture resolve to the same hash and upload the file."""
+    data = b"\x89PNG" + b"\0" * 1024
+    first, second = tmp_path / "a.png", tmp_path / "b.png"
+    first.write_bytes(data)
+    second.write_bytes(data)
+    upload = FakeUploader()
+    service = SourceImageService()
+
+    source_a = await service.resolve(str(first), upload, DownloadManager())
+    source_b = await service.resolve(str(second), upload, DownloadManager())
+
+    assert source_a.sha256 == source_b.sha256 == hashlib.sha256(data).hexdigest()
+    assert source_a.image_uuid == "uuid-1"
+    assert not source_a.cached
+    assert upload.uploads == [str(first), str(second)]
+
+
+class ChangingDownloads:
+    """Serves whatever content the URL currently points at."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def download(self, url, output_path):
+        output_path.write_bytes(self.content)
+        return DownloadedFile(output_path, len(self.content), hashlib.sha256(self.content).hexdigest())
+
+
+@pytest.mark.asyncio
+async def test_urls_are_hashed_on_every_use(fake_redis):
+    """A URL whose image changed resolves to the new content; unchanged content reuses the upload."""
+    upload = FakeUploader()
+    downloads = ChangingDownloads(b"old image")
+    service = SourceImageService()
+    url = "https://example.com/source.png"
+
+    first = await service.resolve(url, upload, downloads)
+    again = await service.resolve(url, upload, downloads)
+    downloads.content = b"new image"
+    changed = await service.resolve(url, upload, downloads)
+
+    assert first.sha256 == again.sha256 == hashlib.sha256(b"old image").hexdigest()
+    assert again.cached and again.image_uuid == first.image_uuid
+    assert changed.sha256 == hashlib.sha256(b"new image").hexdigest()
+    assert (changed.cached, changed.image_uuid) == (False, "uuid-2")
+
+
+@pytest.mark.asyncio
+async def test_missing_source_is_rejected():
+    """Paths that do not exist and are not URLs fail before any upload."""
+    upload = FakeUploader()
+
+    with pytest.raises(ValueError):
+        await SourceImageService().resolve("/does/not/exist.png", upload, DownloadManager())
+
+    assert upload.uploads == []
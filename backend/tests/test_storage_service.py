@@ -0,0 +1,100 @@
+"""Tests for content-addressed media storage."""
+
+import hashlib
+
+import pytest
+
+from backend.models.database import init_db
+from backend.services.cache_service import cache_service
+from backend.services.download_manager import DownloadedFile
+from backend.services.runware_service import RunwareService
+from backend.services.storage_service import StorageService
+
+
+async def _fake_download(storage: StorageService, content: bytes) -> DownloadedFile:
+    """Write content to a storage temp path as the download manager would."""
+    path = await storage.temp_path()
+    path.write_bytes(content)
+    return DownloadedFile(path=path, size=len(content), sha256=hashlib.sha256(content).hexdigest())
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_stored_once_and_reclaimed_on_last_release(tmp_path):
+    """Duplicates share one sharded file that is deleted with its last reference."""
+    init_db()
+    storage = StorageService(root=tmp_path)
+    content = b"identical image bytes"
+
+    first = await storage.ingest(await _fake_download(storage, content))
+    second = await storage.ingest(await _fake_download(storage, content))
+
+    assert first.path == second.path
+    assert first.path.relative_to(tmp_path).parts[:3] == ("objects", first.sha256[:2], first.sha256[2:4])
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    # Each ingest pinned the object; completions take those pins over
+    await storage.claim_references([first.sha256])
+    await storage.claim_references([second.sha256])
+
+    assert await storage.release_references([first.sha256]) == 0
+    assert first.path.exists()
+
+    assert await storage.release_references([second.sha256]) == 1
+    assert not first.path.exists()
+
+
+@pytest.mark.asyncio
+async def test_ingested_object_survives_release_before_completion(tmp_path):
+    """A file ingested for a running generation is kept when another generation releases it."""
+    init_db()
+    storage = StorageService(root=tmp_path)
+    content = b"shared between a finished and a running generation"
+
+    finished = await storage.ingest(await _fake_download(storage, content))
+    await storage.claim_references([finished.sha256])
+
+    # A second generation produces the same bytes but has not completed yet
+    running = await storage.ingest(await _fake_download(storage, content))
+    assert await storage.release_references([finished.sha256]) == 0
+    assert running.path.exists()
+
+    # Shared results (cache hits) get their own reference on top of the pin
+    await storage.claim_references([running.sha256, running.sha256])
+    assert await storage.release_references([running.sha256, running.sha256]) == 1
+    assert not running.path.exists()
+    assert list(running.path.parent.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_cached_results_pointing_at_deleted_files_are_dropped(fake_redis, tmp_path):
+    """A cache hit whose file was reclaimed is treated as a miss and evicted."""
+    path = tmp_path / "kept.png"
+    path.write_bytes(b"image")
+    await cache_service.set("generation:test", [{"output_path": str(path)}])
+    service = RunwareService(api_key="key")
+
+    assert await service._cached("generation:test") == [{"output_path": str(path)}]
+
+    path.unlink()
+    assert await service._cached("generation:test") is None
+    assert await cache_service.get("generation:test") is None
+
+
+@pytest.mark.asyncio
+async def test_released_pins_leave_other_references_alone(tmp_path):
+    """A failed generation drops only its own pin; claimed references keep the file."""
+    init_db()
+    storage = StorageService(root=tmp_path)
+    content = b"produced by a failed and a finished generation"
+
+    finished = await storage.ingest(await _fake_download(storage, content))
+    await storage.claim_references([finished.sha256])
+    failed = await storage.ingest(await _fake_download(storage, content))
+
+    assert await storage.release_pins([failed.sha256]) == 0
+    # Nothing left to unpin: a repeated release is a no-op
+    assert await storage.release_pins([failed.sha256]) == 0
+    assert finished.path.exists()
+
+    assert await storage.release_references([finished.sha256]) == 1
+    assert not finished.path.exists()
@@ -0,0 +1,142 @@
+"""Tests for the Redis Streams queue backend."""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.core.codec import codec
+from backend.core.redis_client import redis_client
+from backend.services.stream_queue_service import _ENQUEUE_SCRIPT, StreamQueueService
+
+
+@pytest.mark.asyncio
+async def test_priorities_are_served_in_order_and_acked(fake_redis):
+    """Higher priorities go first, each stream in arrival order, and acks delete entries."""
+    service = StreamQueueService()
+    await service.initialize()
+    await service.initialize()
+
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(3)], client_id="a")
+    await service.enqueue(10, "text-to-image", {}, priority="high", client_id="b")
+
+    served = [(await service.dequeue(timeout=0)) for _ in range(4)]
+    assert [task["task_id"] for task in served] == [10, 0, 1, 2]
+    assert (served[0]["client_id"], served[0]["attempt"]) == ("b", 1)
+    assert await service.dequeue(timeout=0) is None
+    assert await service.known_task_ids([0, 10, 99]) == {0, 10}
+
+    assert await service.ack(10)
+    assert not await service.ack(10)
+    assert await redis_client.client.xlen(f"{service.QUEUE_PREFIX}:high") == 0
+    assert await service.get_length() == 0
+
+
+@pytest.mark.asyncio
+async def test_blocked_dequeue_wakes_for_new_entries_and_takes_only_one(fake_redis):
+    """A waiting consumer takes one entry when streams grow; the rest stay queued for anyone."""
+    service = StreamQueueService(consumer_id="worker-1")
+    other = StreamQueueService(consumer_id="worker-2")
+    await service.initialize()
+    await other.initialize()
+    await service.enqueue(1, "text-to-image", {})
+    assert (await service.dequeue(timeout=0))["task_id"] == 1
+
+    started = time.monotonic()
+    waiting = asyncio.create_task(service.dequeue(timeout=5))
+    await asyncio.sleep(0.1)
+    assert not waiting.done()
+    # Fill two streams in one transaction, so the woken reader finds entries in both
+    async with redis_client.binary_client.pipeline(transaction=True) as pipe:
+        for task_id, priority in ((2, "low"), (3, "low"), (4, "high")):
+            payload = codec.encode({
+                "task_id": task_id, "generation_type": "text-to-image", "params": {},
+                "priority": priority, "client_id": "a",
+            })
+            pipe.eval(_ENQUEUE_SCRIPT, 0, service.QUEUE_PREFIX, priority, time.time(), 0, task_id, payload)
+        await pipe.execute()
+
+    served = await asyncio.wait_for(waiting, 5)
+    assert time.monotonic() - started < 4
+    assert served["task_id"] == 4
+    left = {2, 3, 4} - {served["task_id"]}
+    assert {(await service.get_task(task_id))["state"] for task_id in left} == {"queued"}
+
+    # Nothing was held back locally: the rest can be cancelled or served elsewhere
+    assert await other.remove_task(3)
+    assert (await other.dequeue(timeout=0))["task_id"] == (left - {3}).pop()
+    assert await service.dequeue(timeout=0) is None
+
+
+@pytest.mark.asyncio
+async def test_idle_entries_are_claimed_then_dead_lettered(fake_redis):
+    """An entry nobody acks is taken over by the next dequeue, up to max_attempts."""
+    service = StreamQueueService(visibility_timeout=0, max_attempts=2, consumer_id="worker-1")
+    other = StreamQueueService(visibility_timeout=0, max_attempts=2, consumer_id="worker-2")
+    await service.initialize()
+    await other.initialize()
+    await service.enqueue(1, "text-to-image", {})
+
+    assert (await service.dequeue(timeout=0))["attempt"] == 1
+    assert await service.reap() == ([1], [])
+
+    claimed = await other.dequeue(timeout=0)
+    assert (claimed["task_id"], claimed["attempt"]) == (1, 2)
+    assert (await other.get_task(1))["consumer"] == "worker-2"
+
+    requeued, dead = await service.reap()
+    assert requeued == [] and [task["task_id"] for task in dead] == [1]
+    assert [task["task_id"] for task in await service.get_dead_letters()] == [1]
+    assert await service.get_task(1) == {"task_id": 1, "state": "dead"}
+    assert await other.dequeue(timeout=0) is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_cancel_and_clear(fake_redis):
+    """Undelivered and scheduled entries can be found, cancelled and cleared; pending ones stay."""
+    service = StreamQueueService()
+    await service.initialize()
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(4)], client_id="a")
+    await service.enqueue(10, "text-to-image", {}, priority="high")
+    await service.enqueue(20, "text-to-image", {}, delay=3600)
+
+    first = await service.dequeue(timeout=0)
+    assert first["task_id"] == 10
+    assert (await service.get_task(10))["state"] == "processing"
+    assert not await service.remove_task(10)
+
+    task = await service.get_task(2)
+    assert (task["state"], task["client_id"], task["position"]) == ("queued", "a", 2)
+    assert (await service.get_task(20))["state"] == "scheduled"
+
+    assert await service.remove_task(1)
+    assert not await service.remove_task(0, priority="high")
+    assert (await service.get_task(2))["position"] == 1
+    assert await service.get_length() == 3
+
+    assert await service.clear() == 4
+    assert await service.dequeue(timeout=0) is None
+    assert await service.known_task_ids([10, 20]) == {10}
+
+
+@pytest.mark.asyncio
+async def test_queue_info_reports_pending_entries_per_consumer(fake_redis):
+    """Queue info exposes the group lag and what each consumer holds."""
+    service = StreamQueueService(consumer_id="worker-1")
+    await service.initialize()
+    await service.enqueue_many([(i, "text-to-image", {}) for i in range(3)])
+    await service.enqueue(9, "text-to-image", {}, delay=3600)
+    await service.dequeue(timeout=0)
+
+    info = await service.get_queue_info()
+
+    assert (info["normal"], info["total"], info["scheduled"], info["processing"]) == (2, 2, 1, 1)
+    normal = info["streams"]["normal"]
+    assert (normal["lag"], normal["pending"]) == (2, 1)
+    assert list(normal["consumers"]) == ["worker-1"]
+    assert normal["consumers"]["worker-1"]["pending"] == 1
+
+    # Due scheduled tasks are appended to the stream by the next dequeue
+    await redis_client.client.zadd(f"{service.QUEUE_PREFIX}:scheduled", {9: 0})
+    served = [(await service.dequeue(timeout=0))["task_id"] for _ in range(3)]
+    assert served == [1, 2, 9]
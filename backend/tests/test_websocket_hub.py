@@ -0,0 +1,101 @@
+"""Tests for the WebSocket hub and endpoints."""
+
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.endpoints import websocket
+from backend.core.codec import codec
+from backend.core.redis_client import redis_client
+from backend.services.pubsub_service import PubSubService
+from backend.services.websocket_hub import WebSocketHub
+
+
+class RecordingSocket:
+    """Stand-in WebSocket recording the text sent to it."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+
+async def publish(generation_id: int, **event):
+    """Publish an event on a generation's progress channel."""
+    event["generation_id"] = generation_id
+    await redis_client.binary_client.publish(f"generation:progress:{generation_id}", codec.encode(event))
+
+
+@pytest.mark.asyncio
+async def test_hub_fans_out_from_pubsub_and_releases_finished_generations(fake_redis):
+    """Each socket gets the generations it follows, serialized once per message."""
+    pubsub = PubSubService()
+    hub = WebSocketHub(pubsub)
+    one, both = RecordingSocket(), RecordingSocket()
+    for socket in (one, both):
+        await hub.connect(socket)
+    await hub.follow(one, 1)
+    await hub.follow(both, 1)
+    await hub.follow(both, 2)
+    senders = [asyncio.create_task(hub.serve(socket)) for socket in (one, both)]
+
+    await publish(1, type="progress", progress=50)
+    await publish(2, type="complete", data={"ok": True})
+    await publish(1, type="error", message="boom")
+    for _ in range(100):
+        if len(both.sent) == 3:
+            break
+        await asyncio.sleep(0.01)
+
+    assert [json.loads(text)["type"] for text in one.sent] == ["progress", "error"]
+    assert [(json.loads(text)["generation_id"], json.loads(text)["type"]) for text in both.sent] == [
+        (1, "progress"), (2, "complete"), (1, "error"),
+    ]
+    assert one.sent[0] is both.sent[0]
+
+    # Terminal messages release every follower and the Pub/Sub subscription
+    assert hub.get_stats() == {"sockets": 2, "generations": 0, "follows": 0, "broadcasts": 3, "dropped": 0}
+    assert pubsub.get_stats()["channels"] == 0
+
+    for sender in senders:
+        sender.cancel()
+    await hub.cleanup()
+    await pubsub.cleanup()
+
+
+def test_endpoints_follow_generations(monkeypatch):
+    """The hub endpoint subscribes to many generations; the legacy endpoint to one."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_client, "_binary_client", fakeredis.FakeAsyncRedis(server=server))
+    hub = WebSocketHub(PubSubService())
+    monkeypatch.setattr(websocket, "websocket_hub", hub)
+    app = FastAPI()
+    app.include_router(websocket.router)
+    publisher = fakeredis.FakeRedis(server=server)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as multi, client.websocket_connect("/ws/generation/5") as single:
+            multi.send_text(json.dumps({"action": "subscribe", "generation_ids": [5, 6]}))
+            assert multi.receive_json() == {"type": "subscribed", "generation_ids": [5, 6]}
+
+            for generation_id in (6, 5):
+                publisher.publish(
+                    f"generation:progress:{generation_id}",
+                    codec.encode({"type": "progress", "generation_id": generation_id, "progress": 10}),
+                )
+            assert [multi.receive_json()["generation_id"] for _ in range(2)] == [6, 5]
+            assert single.receive_json() == {"type": "progress", "generation_id": 5, "progress": 10}
+
+            single.send_text("ping")
+            assert single.receive_json() == {"type": "heartbeat", "message": "pong"}
+            multi.send_text(json.dumps({"action": "unsubscribe", "generation_ids": [6]}))
+            assert multi.receive_json() == {"type": "unsubscribed", "generation_ids": [6]}
+            assert hub.get_stats()["follows"] == 2
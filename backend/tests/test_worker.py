@@ -0,0 +1,217 @@
+"""Tests for the queue worker service."""
+
+import asyncio
+import hashlib
+from collections import Counter
+
+import pytest
+
+from backend.core.config import settings
+from backend.models.database import AsyncSessionLocal, StoredObject, init_db
+from backend.models.repository import generation_repository
+from backend.services.batch_service import batch_service
+from backend.services.download_manager import DownloadedFile
+from backend.services.generation_writer import generation_writer
+from backend.services.queue_service import queue_service
+from backend.services.storage_service import storage_service
+from backend.services.worker_service import WorkerService
+
+
+@pytest.mark.asyncio
+async def test_worker_enforces_concurrency_limit(monkeypatch):
+    """The worker never runs more generations than its concurrency limit."""
+    pending = [
+        {"task_id": i, "generation_type": "text-to-image", "params": {}}
+        for i in range(10)
+    ]
+    running = 0
+    peak = 0
+    processed = []
+
+    async def fake_dequeue(timeout=5, priorities=None):
+        if pending:
+            return pending.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def fake_handler(generation_id, params):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        processed.append(generation_id)
+
+    monkeypatch.setattr(
+        "backend.services.worker_service.queue_service.dequeue", fake_dequeue
+    )
+
+    worker = WorkerService(concurrency=3)
+    worker._handlers["text-to-image"] = fake_handler
+
+    await worker.start()
+    for _ in range(100):
+        if len(processed) == 10:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert sorted(processed) == list(range(10))
+    assert peak == 3
+    assert worker.get_status()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_backs_off_while_queue_is_down(monkeypatch):
+    """Dequeue errors are retried with growing delays instead of a busy loop."""
+    attempts = 0
+
+    async def failing_dequeue(timeout=5, priorities=None):
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr("backend.services.worker_service.queue_service.dequeue", failing_dequeue)
+    monkeypatch.setattr(settings, "worker_backoff_base", 0.02)
+    monkeypatch.setattr(settings, "worker_backoff_max", 1.0)
+
+    worker = WorkerService(concurrency=2)
+    await worker.start()
+    await asyncio.sleep(0.3)
+    await worker.stop()
+
+    # 0.01-0.02s, then 0.02-0.04s, ... : at most 5 attempts fit in 0.3s
+    assert 2 <= attempts <= 5
+    assert worker._semaphore._value == 2
+    assert [WorkerService._backoff(n) <= 1.0 for n in range(1, 20)] == [True] * 19
+
+
+@pytest.mark.asyncio
+async def test_recover_fails_only_orphaned_generations(fake_redis, monkeypatch):
+    """Stale rows the queue no longer holds are failed; queued ones are left alone."""
+    init_db()
+    monkeypatch.setattr(queue_service, "visibility_timeout", 0)
+    await queue_service.initialize()
+
+    orphan, queued = await generation_repository.create_many([
+        {"generation_type": "text-to-image", "prompt": "lost", "parameters": {}, "status": "processing", "output_path": ""},
+        {"generation_type": "text-to-image", "prompt": "waiting", "parameters": {}, "status": "pending", "output_path": ""},
+    ])
+    await queue_service.enqueue(queued.id, "text-to-image", {})
+
+    failed = await WorkerService().recover()
+    assert orphan.id in failed and queued.id not in failed
+    assert (await generation_repository.get(orphan.id)).status == "failed"
+    assert (await generation_repository.get(queued.id)).status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_task_is_not_acked_before_its_result_is_committed(fake_redis, monkeypatch):
+    """A worker killed between the handler returning and the flush leaves the task for redelivery."""
+    init_db()
+    monkeypatch.setattr(queue_service, "visibility_timeout", 0)
+    monkeypatch.setattr(generation_writer, "_pending", {})
+    await queue_service.initialize()
+
+    (generation,) = await generation_repository.create_many([
+        {"generation_type": "text-to-image", "prompt": "crash", "parameters": {}, "status": "pending", "output_path": ""},
+    ])
+    await queue_service.enqueue(generation.id, "text-to-image", {})
+    task_data = await queue_service.dequeue(timeout=0)
+
+    flushing = asyncio.Event()
+
+    async def stalled_write(batch):
+        flushing.set()
+        await asyncio.sleep(60)
+
+    async def handler(generation_id, params):
+        generation_writer.update(generation_id, status="completed")
+        return True
+
+    monkeypatch.setattr(generation_writer, "_write", stalled_write)
+    worker = WorkerService()
+    worker._handlers["text-to-image"] = handler
+
+    process = asyncio.create_task(worker._process(task_data))
+    await asyncio.wait_for(flushing.wait(), 1)
+    process.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await process
+
+    requeued, _ = await queue_service.reap()
+    assert requeued == [generation.id]
+    assert (await generation_repository.get(generation.id)).status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_redelivered_batch_items_are_counted_once(fake_redis, monkeypatch):
+    """A task redelivered after a crash before its ack does not finish its batch twice."""
+    init_db()
+    await queue_service.initialize()
+    (generation,) = await generation_repository.create_many([
+        {"generation_type": "text-to-image", "prompt": "redelivered", "parameters": {}, "status": "pending", "output_path": ""},
+    ])
+    await batch_service.create("redelivery", 2)
+    await queue_service.enqueue(generation.id, "text-to-image", {"batch_id": "redelivery"})
+    task_data = await queue_service.dequeue(timeout=0)
+
+    async def crash(task_id):
+        raise asyncio.CancelledError()
+
+    async def handler(generation_id, params):
+        return True
+
+    worker = WorkerService()
+    worker._handlers["text-to-image"] = handler
+    ack = queue_service.ack
+    monkeypatch.setattr(queue_service, "ack", crash)
+    with pytest.raises(asyncio.CancelledError):
+        await worker._process(task_data)
+    monkeypatch.setattr(queue_service, "ack", ack)
+
+    # Redelivered and finished again, then reported failed by a late reaper
+    await worker._process(task_data)
+    await batch_service.record("redelivery", generation.id, False)
+
+    batch = await batch_service.get("redelivery")
+    assert (batch["completed"], batch["failed"], batch["finished"]) == (1, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_releases_its_stored_outputs(fake_redis, monkeypatch, tmp_path):
+    """Outputs ingested for a generation whose result cannot be saved are not kept referenced."""
+    init_db()
+    monkeypatch.setattr(storage_service, "root", tmp_path)
+    monkeypatch.setattr(storage_service, "_pins", Counter())
+    (generation,) = await generation_repository.create_many([
+        {"generation_type": "text-to-image", "prompt": "unsaved", "parameters": {}, "status": "pending", "output_path": ""},
+    ])
+
+    content = b"image whose generation failed"
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    async def text_to_image(**kwargs):
+        path = await storage_service.temp_path()
+        path.write_bytes(content)
+        stored = await storage_service.ingest(DownloadedFile(path=path, size=len(content), sha256=sha256))
+        return [{"output_path": str(stored.path), "image_url": "https://example.com/a.png", "sha256": sha256, "seed": 1}]
+
+    commit = generation_writer.commit
+
+    async def failing_commit(generation_id, **fields):
+        if fields.get("status") == "completed":
+            return False
+        return await commit(generation_id, **fields)
+
+    monkeypatch.setattr("backend.services.worker_service.runware_service.text_to_image", text_to_image)
+    monkeypatch.setattr(generation_writer, "commit", failing_commit)
+
+    params = {"prompt": "unsaved", "width": 512, "height": 512, "steps": 4, "guidance_scale": 7.0, "num_images": 1}
+    assert await WorkerService()._run_text_to_image(generation.id, params) is False
+
+    async with AsyncSessionLocal() as session:
+        stored = await session.get(StoredObject, sha256)
+    assert stored is None or stored.ref_count == 0
+    assert not storage_service.object_path(sha256).exists()
+    assert (await generation_repository.get(generation.id)).status == "failed"
@@ -0,0 +1,69 @@
+"""Standalone generation worker process.
+
+Run with ``python -m backend.worker`` to drain the generation queue outside
+the API process. Set ``WORKER_ENABLED=false`` on the API side when using
+dedicated worker processes.
+"""
+
+import asyncio
+import logging
+import signal
+
+from backend.core.redis_client import redis_client
+from backend.models.database import close_db, init_db
+from backend.services.cache_service import cache_service
+from backend.services.generation_writer import generation_writer
+from backend.services.progress_channel import progress_channel
+from backend.services.queue_service import queue_service
+from backend.services.runware_service import runware_service
+from backend.services.worker_service import worker_service
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Run the worker until SIGINT/SIGTERM."""
+    logger.info("Starting Runware Generator worker...")
+
+    init_db()
+    await redis_client.initialize()
+    await cache_service.initialize()
+    await queue_service.initialize()
+    await runware_service.initialize()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Signal handlers are not available on Windows event loops
+            pass
+
+    await generation_writer.start()
+    await progress_channel.start()
+    await worker_service.start()
+
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("Shutting down worker...")
+        await worker_service.stop()
+        await progress_channel.stop()
+        await generation_writer.stop()
+        await runware_service.close()
+        await redis_client.close()
+        await close_db()
+        logger.info("Worker shutdown complete")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass